@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""Failover latency: data-plane outage and reprovisioning time of an L2VPN.
+
+Each repetition creates an L2VPN between two hosts (h1 on Ampath1 and h6 on
+Tenet01 by default, as test_20), starts a timestamped ping stream between
+them every --interval seconds (tests/probes.py), brings down an interface
+on the path (Ampath1-eth40 by default, as test_20::test_020) and records:
+
+- outage: the longest time without ping replies after the failure, and
+  the probes lost
+- path: the time until the SDX-Controller reports the L2VPN up on a new
+  current_path
+- evcs: for each OXP whose EVCs changed, the time until they differ from
+  before the failure and are all active; evcs is the slowest OXP
+
+Then the interface is brought back up and the L2VPN removed. The result
+(one JSON line) has the distribution of each time over the repetitions.
+Run it in the mininet container, on a clean stack:
+
+    docker compose exec mininet python3 -m benchmarks.failover --repetitions 20
+"""
+import argparse
+import json
+import sys
+import time
+
+from tests.stats import summary
+from tests.waiters import OXPS
+
+
+def evc_signature(evcs):
+    """What defines the EVCs of an OXP: their ids, UNIs and paths."""
+    return sorted(
+        json.dumps([
+            evc_id,
+            evc.get("uni_a", {}).get("interface_id"),
+            evc.get("uni_z", {}).get("interface_id"),
+            [link.get("id") for link in evc.get("current_path", [])],
+        ])
+        for evc_id, evc in evcs.items()
+    )
+
+
+def watch_failover(service_id, first_path, baseline, failed_at, timeout):
+    """Poll the L2VPN and the EVCs until the new path and EVCs exist.
+
+    Returns the time of the new path and the time each OXP got new active
+    EVCs, relative to `failed_at` (time.time()).
+    """
+    from tests.waiters import get_evcs, get_l2vpn
+
+    path_at, evcs_at = None, {}
+    deadline = failed_at + timeout
+    while time.time() < deadline:
+        try:
+            l2vpn = get_l2vpn(service_id)
+            evcs = {oxp: get_evcs(oxp) for oxp in OXPS}
+        except Exception:
+            time.sleep(0.05)
+            continue
+        now = time.time() - failed_at
+        if path_at is None and l2vpn.get("status") == "up" and l2vpn.get("current_path") != first_path:
+            path_at = now
+        for oxp in OXPS:
+            if oxp in evcs_at:
+                continue
+            if evc_signature(evcs[oxp]) != baseline[oxp] and all(evc.get("active") for evc in evcs[oxp].values()):
+                evcs_at[oxp] = now
+        # the EVCs may become active shortly after the L2VPN is up
+        if path_at is not None and now - path_at > 2:
+            break
+        time.sleep(0.05)
+    return path_at, evcs_at
+
+
+def repetition(net, hosts, vlan, fail_intf, interval, timeout):
+    import requests
+
+    from tests.probes import PingProbe
+    from tests.topologies.converter import port_id
+    from tests.waiters import (
+        API_URL,
+        WaitTimeout,
+        get_evcs,
+        wait_l2vpn,
+        wait_l2vpns,
+        wait_ping,
+        wait_port_status,
+    )
+
+    host_a, host_z = hosts
+    net.add_host_vlan(host_a, vlan, 1)
+    address = net.add_host_vlan(host_z, vlan, 2)
+    payload = {
+        "name": f"Failover L2VPN {vlan}",
+        "endpoints": [{"port_id": net.host_port(host), "vlan": str(vlan)} for host in hosts],
+    }
+    response = requests.post(API_URL, json=payload)
+    assert response.status_code == 201, response.text
+    service_id = response.json()["service_id"]
+    node_name, _, _ = fail_intf.partition("-")
+    switch = net.net.get(node_name)
+    fail_port = port_id(switch, switch.intf(fail_intf))
+    probe = None
+    try:
+        first_path = wait_l2vpn(service_id, "up", timeout=timeout)["current_path"]
+        wait_ping(host_a, address, timeout=timeout)
+        baseline = {oxp: evc_signature(get_evcs(oxp)) for oxp in OXPS}
+        probe = PingProbe(host_a, address, interval).start()
+        time.sleep(1)
+        failed_at = time.time()
+        switch.intf(fail_intf).ifconfig("down")
+        path_at, evcs_at = watch_failover(service_id, first_path, baseline, failed_at, timeout)
+        try:
+            wait_ping(host_a, address, timeout=max(timeout - (time.time() - failed_at), 1))
+        except WaitTimeout:
+            pass
+        time.sleep(1)
+        probe.stop()
+        return {
+            "vlan": vlan,
+            **probe.outage(failed_at),
+            "path_s": path_at,
+            "evcs_s": max(evcs_at.values(), default=None),
+            "evcs_per_oxp_s": evcs_at,
+        }
+    finally:
+        if probe and probe.stopped_at is None:
+            probe.stop()
+        switch.intf(fail_intf).ifconfig("up")
+        wait_port_status(fail_port, "up", timeout=timeout)
+        requests.delete(f"{API_URL}/{service_id}")
+        wait_l2vpns(lambda l2vpns: service_id not in l2vpns, timeout=timeout, desc=f"{service_id} to be removed")
+        for host in hosts:
+            net.remove_host_vlan(host, vlan)
+
+
+def run(repetitions, hosts=("h1", "h6"), fail_intf="Ampath1-eth40", interval=0.01, first_vlan=100,
+        timeout=120, topology="simple3oxps"):
+    from tests.helpers import NetworkTest
+    from tests.waiters import wait_topology_up
+
+    net = NetworkTest(OXPS, topology)
+    try:
+        net.wait_switches_connect()
+        net.run_setup_topo()
+        wait_topology_up()
+        nodes = net.net.get(*hosts)
+        runs = [
+            repetition(net, nodes, first_vlan + i, fail_intf, interval, timeout)
+            for i in range(repetitions)
+        ]
+    finally:
+        net.stop()
+    recovered = [r for r in runs if r["recovered"]]
+    return {
+        "repetitions": repetitions,
+        "hosts": list(hosts),
+        "failure": fail_intf,
+        "interval": interval,
+        "recovered": len(recovered),
+        "outage_s": summary([r["outage_s"] for r in recovered]),
+        "lost": summary([r["lost"] for r in recovered]),
+        "path_s": summary([r["path_s"] for r in runs if r["path_s"] is not None]),
+        "evcs_s": summary([r["evcs_s"] for r in runs if r["evcs_s"] is not None]),
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=10, help="Failovers to measure. Default: 10")
+    parser.add_argument("--hosts", default="h1,h6", help="The two hosts of the L2VPN. Default: h1,h6")
+    parser.add_argument("--fail", default="Ampath1-eth40",
+                        help="Switch interface to bring down. Default: Ampath1-eth40")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between probes. Default: 0.01")
+    parser.add_argument("--first-vlan", type=int, default=100, help="VLAN of the first repetition. Default: 100")
+    parser.add_argument("--timeout", type=int, default=120, help="Seconds to wait for the failover. Default: 120")
+    parser.add_argument("--topology", default="simple3oxps", help="Topology to build. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    args = parser.parse_args()
+
+    hosts = args.hosts.split(",")
+    if len(hosts) != 2:
+        parser.error("--hosts must name two hosts")
+    result = run(
+        args.repetitions, hosts, args.fail, args.interval, args.first_vlan, args.timeout, args.topology
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0 if result["recovered"] == args.repetitions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
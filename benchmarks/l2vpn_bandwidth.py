@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+"""Data-plane throughput of bandwidth-constrained L2VPNs, with iperf3.
+
+The links between switches are limited to the capacity of their port type
+(NetworkTest.shape_links(), 10GE is 10 Mbit/s with the default --scale
+1000). --count L2VPNs are created between two hosts (h1 and h8 by default),
+each on its own VLAN with qos_metrics.min_bw --min-bw (Gbit/s, as in the
+SDX API, so 5 is 5 Mbit/s at the default scale): they share the links of
+their path. Then a UDP iperf3 test runs at once on every L2VPN, offering
+--offer times the requested rate, and the rate, jitter and loss received
+on each of them are compared with the requested rate. L2VPNs the
+controller rejects (admission control) are reported and not tested.
+
+Run it in the mininet container, on a clean stack:
+
+    docker compose exec mininet python3 -m benchmarks.l2vpn_bandwidth --count 2 --min-bw 4
+"""
+import argparse
+import json
+import sys
+import time
+
+from tests.stats import summary
+from tests.waiters import OXPS
+
+
+def run(count, min_bw, hosts=("h1", "h8"), scale=1000, offer=1.0, duration=10, first_vlan=100, timeout=120,
+        topology="simple3oxps"):
+    import requests
+
+    from tests.helpers import NetworkTest
+    from tests.probes import Iperf3
+    from tests.waiters import API_URL, wait_l2vpn, wait_l2vpns_removed, wait_ping, wait_topology_up
+
+    net = NetworkTest(OXPS, topology)
+    service_ids, vlans = [], []
+    try:
+        net.wait_switches_connect()
+        net.run_setup_topo()
+        wait_topology_up()
+        rates = net.shape_links(scale)
+        host_a, host_z = net.net.get(*hosts)
+        ports = [net.host_port(host_a), net.host_port(host_z)]
+        requested = min_bw * 1000 / scale
+
+        l2vpns, rejected = [], []
+        for i in range(count):
+            vlan = first_vlan + i
+            payload = {
+                "name": f"Bandwidth L2VPN {i}",
+                "endpoints": [{"port_id": port, "vlan": str(vlan)} for port in ports],
+                "qos_metrics": {"min_bw": {"value": min_bw}},
+            }
+            response = requests.post(API_URL, json=payload)
+            if response.status_code != 201:
+                rejected.append({"vlan": vlan, "status": response.status_code, "text": response.text[:200]})
+                continue
+            service_id = response.json()["service_id"]
+            service_ids.append(service_id)
+            wait_l2vpn(service_id, "up", timeout=timeout)
+            vlans.append(vlan)
+            net.add_host_vlan(host_a, vlan, 1)
+            address = net.add_host_vlan(host_z, vlan, 2)
+            wait_ping(host_a, address, timeout=timeout)
+            l2vpns.append({"service_id": service_id, "vlan": vlan, "address": address})
+
+        tests = [
+            Iperf3(host_a, host_z, l2vpn["address"], requested * offer, duration, 5201 + i).serve()
+            for i, l2vpn in enumerate(l2vpns)
+        ]
+        # let the servers listen, then start the clients together
+        time.sleep(0.5)
+        for test in tests:
+            test.send()
+        for l2vpn, test in zip(l2vpns, tests):
+            l2vpn.update(test.result())
+        received = [l2vpn for l2vpn in l2vpns if "mbps" in l2vpn]
+        return {
+            "count": count,
+            "min_bw": min_bw,
+            "scale": scale,
+            "requested_mbps": requested,
+            "offered_mbps": requested * offer,
+            "link_mbps": rates,
+            "rejected": rejected,
+            "achieved_mbps": summary([l2vpn["mbps"] for l2vpn in received]),
+            "achieved_ratio": summary([l2vpn["mbps"] / requested for l2vpn in received]),
+            "jitter_ms": summary([l2vpn["jitter_ms"] for l2vpn in received]),
+            "lost_percent": summary([l2vpn["lost_percent"] for l2vpn in received]),
+            "l2vpns": l2vpns,
+        }
+    finally:
+        for service_id in service_ids:
+            requests.delete(f"{API_URL}/{service_id}")
+        if service_ids:
+            wait_l2vpns_removed(OXPS, timeout=timeout)
+        for vlan in vlans:
+            for host in net.net.get(*hosts):
+                net.remove_host_vlan(host, vlan)
+        net.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1, help="Concurrent L2VPNs. Default: 1")
+    parser.add_argument("--min-bw", type=float, default=5, help="qos_metrics.min_bw of each L2VPN. Default: 5")
+    parser.add_argument("--hosts", default="h1,h8", help="The two hosts of the L2VPNs. Default: h1,h8")
+    parser.add_argument("--scale", type=float, default=1000,
+                        help="Divide the port capacities by this factor. Default: 1000")
+    parser.add_argument("--offer", type=float, default=1.0,
+                        help="Offered rate, as a multiple of the requested one. Default: 1.0")
+    parser.add_argument("--duration", type=int, default=10, help="Seconds of each iperf3 test. Default: 10")
+    parser.add_argument("--first-vlan", type=int, default=100, help="VLAN of the first L2VPN. Default: 100")
+    parser.add_argument("--timeout", type=int, default=120, help="Seconds to wait for the L2VPNs. Default: 120")
+    parser.add_argument("--topology", default="simple3oxps", help="Topology to build. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    args = parser.parse_args()
+
+    hosts = args.hosts.split(",")
+    if len(hosts) != 2:
+        parser.error("--hosts must name two hosts")
+    result = run(
+        args.count, args.min_bw, hosts, args.scale, args.offer, args.duration, args.first_vlan,
+        args.timeout, args.topology,
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0 if all("mbps" in l2vpn for l2vpn in result["l2vpns"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+#!/usr/bin/python3
+"""Open-loop load on the SDX-Controller L2VPN API, with latency timelines.
+
+Closed-loop tests only send a request once the previous one is answered,
+which hides queueing collapse. This generator sends requests at a fixed
+arrival rate (--arrival constant or poisson) whatever the response times,
+with a mix of operations (--mix, relative weights):
+
+    post      POST /l2vpn/1.0, between two UNIs of the topology on a free VLAN
+    get       GET /l2vpn/1.0/<id> of an L2VPN created by the run
+    list      GET /l2vpn/1.0
+    patch     PATCH /l2vpn/1.0/<id> (renames it)
+    delete    DELETE /l2vpn/1.0/<id>
+    topology  GET /topology
+
+get/patch/delete fall back to list while the run has no L2VPN. Latencies
+are measured from the scheduled arrival time, so client-side queueing is
+accounted for. The result has the latency and errors of each operation
+and a per-second timeline (requests sent/completed, errors, p50/p99),
+written as one JSON line; --report prints the timeline of a results file.
+Run it in the mininet container, with the topology set up:
+
+    docker compose exec mininet python3 -m benchmarks.l2vpn_load --rate 20 --duration 60
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.l2vpn_throughput import endpoint_pairs, uni_ports
+from tests.stats import percentile, summary
+
+DEFAULT_MIX = "post=3,get=3,list=1,patch=1,delete=2,topology=1"
+OPERATIONS = ["post", "get", "list", "patch", "delete", "topology"]
+
+
+def parse_mix(text):
+    mix = {}
+    for item in filter(None, text.split(",")):
+        op, _, weight = item.partition("=")
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation {op!r}, expected one of {OPERATIONS}")
+        mix[op] = float(weight or 1)
+    return mix
+
+
+def arrivals(rate, duration, kind="constant", seed=0):
+    """Yield the send times (seconds from the start) of the requests."""
+    rand = random.Random(seed)
+    t = 0
+    while True:
+        t += rand.expovariate(rate) if kind == "poisson" else 1 / rate
+        if t >= duration:
+            return
+        yield t
+
+
+class VlanPool:
+    """Pick VLANs that are free on both endpoints of an L2VPN."""
+
+    def __init__(self, first, last):
+        self.vlans = range(first, last + 1)
+        self.used = defaultdict(set)
+
+    def acquire(self, ports):
+        for vlan in self.vlans:
+            if all(vlan not in self.used[port] for port in ports):
+                for port in ports:
+                    self.used[port].add(vlan)
+                return vlan
+        return None
+
+    def release(self, ports, vlan):
+        for port in ports:
+            self.used[port].discard(vlan)
+
+
+class LoadGenerator:
+    """Send the requests of the mix and record their latency and errors."""
+
+    def __init__(self, session, pairs, mix, vlans, seed=0):
+        from tests.waiters import API_URL, API_URL_TOPO
+
+        self.api_url = API_URL
+        self.topology_url = API_URL_TOPO
+        self.session = session
+        self.pairs = itertools.cycle(pairs)
+        self.ops = list(mix)
+        self.weights = list(mix.values())
+        self.vlans = vlans
+        self.rand = random.Random(seed)
+        self.l2vpns = {}  # service_id -> (ports, vlan)
+        self.to_clean = {}  # L2VPNs whose DELETE failed, removed by cleanup()
+        self.records = []  # (scheduled second, op, latency, error, completion offset)
+        self.sent = Counter()
+        self.counter = itertools.count()
+
+    def _pick(self):
+        return self.rand.choice(sorted(self.l2vpns)) if self.l2vpns else None
+
+    async def _request(self, method, url, **kwargs):
+        async with self.session.request(method, url, **kwargs) as response:
+            await response.read()
+            return response.status
+
+    async def do_post(self):
+        ports = next(self.pairs)
+        vlan = self.vlans.acquire(ports)
+        if vlan is None:
+            return "no free VLAN"
+        n = next(self.counter)
+        payload = {
+            "name": f"Load L2VPN {n}",
+            "endpoints": [{"port_id": port, "vlan": str(vlan)} for port in ports],
+        }
+        async with self.session.post(self.api_url, json=payload) as response:
+            if response.status != 201:
+                await response.read()
+                self.vlans.release(ports, vlan)
+                return response.status
+            data = await response.json(content_type=None)
+        self.l2vpns[data["service_id"]] = (ports, vlan)
+        return None
+
+    async def do_get(self, service_id):
+        status = await self._request("GET", f"{self.api_url}/{service_id}")
+        return None if status == 200 else status
+
+    async def do_list(self):
+        status = await self._request("GET", self.api_url)
+        return None if status == 200 else status
+
+    async def do_patch(self, service_id):
+        payload = {"name": f"Load L2VPN {next(self.counter)} (patched)"}
+        status = await self._request("PATCH", f"{self.api_url}/{service_id}", json=payload)
+        return None if status in (200, 201) else status
+
+    async def do_delete(self, service_id):
+        # forget it right away, so that no later request picks it
+        ports, vlan = self.l2vpns.pop(service_id)
+        try:
+            status = await self._request("DELETE", f"{self.api_url}/{service_id}")
+        except Exception:
+            self.to_clean[service_id] = (ports, vlan)
+            raise
+        if status == 200:
+            self.vlans.release(ports, vlan)
+            return None
+        self.to_clean[service_id] = (ports, vlan)
+        return status
+
+    async def do_topology(self):
+        status = await self._request("GET", self.topology_url)
+        return None if status == 200 else status
+
+    async def send(self, op, scheduled, start):
+        service_id = None
+        if op in ("get", "patch", "delete"):
+            service_id = self._pick()
+            if service_id is None:
+                op = "list"
+        self.sent[op] += 1
+        try:
+            method = getattr(self, f"do_{op}")
+            error = await (method(service_id) if service_id else method())
+        except Exception as exc:
+            error = type(exc).__name__
+        done = time.monotonic()
+        self.records.append((int(scheduled), op, done - (start + scheduled), error, done - start))
+
+    async def run(self, rate, duration, arrival="constant", seed=0):
+        tasks = []
+        start = time.monotonic()
+        for scheduled in arrivals(rate, duration, arrival, seed):
+            await asyncio.sleep(max(start + scheduled - time.monotonic(), 0))
+            op = self.rand.choices(self.ops, self.weights)[0]
+            tasks.append(asyncio.ensure_future(self.send(op, scheduled, start)))
+        await asyncio.gather(*tasks)
+        return time.monotonic() - start
+
+    async def cleanup(self):
+        """Delete the L2VPNs left, return the ids of those that could not be deleted."""
+        service_ids = [*self.l2vpns, *self.to_clean]
+        statuses = await asyncio.gather(
+            *(self._request("DELETE", f"{self.api_url}/{service_id}") for service_id in service_ids),
+            return_exceptions=True,
+        )
+        self.l2vpns.clear()
+        self.to_clean.clear()
+        # 404: a failed DELETE of the run may have been applied anyway
+        return [sid for sid, status in zip(service_ids, statuses) if status not in (200, 404)]
+
+
+def timeline(records, duration):
+    """Per second of schedule: requests sent and completed, errors, latency percentiles."""
+    completed = Counter(int(r[4]) for r in records)
+    seconds = []
+    # under overload, responses keep completing after the last request is sent
+    for second in range(max([int(duration), *completed]) + 1):
+        sent = [r for r in records if r[0] == second]
+        latencies = [r[2] for r in sent]
+        seconds.append({
+            "second": second,
+            "sent": len(sent),
+            "completed": completed[second],
+            "errors": sum(1 for r in sent if r[3] is not None),
+            "p50": percentile(latencies, 50) if latencies else None,
+            "p99": percentile(latencies, 99) if latencies else None,
+        })
+    return seconds
+
+
+async def _main(rate, duration, mix, arrival, vlans, pairs, timeout, seed, cleanup):
+    from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+    from tests.waiters import get_topology
+
+    candidates = endpoint_pairs(uni_ports(get_topology()), pairs)
+    connector = TCPConnector(limit=0)
+    async with ClientSession(connector=connector, timeout=ClientTimeout(total=timeout)) as session:
+        load = LoadGenerator(session, candidates, mix, VlanPool(*vlans), seed)
+        elapsed = await load.run(rate, duration, arrival, seed)
+        not_removed = await load.cleanup() if cleanup else None
+    by_op = defaultdict(list)
+    for record in load.records:
+        by_op[record[1]].append(record)
+    return {
+        "rate": rate,
+        "duration": duration,
+        "arrival": arrival,
+        "mix": mix,
+        "elapsed": elapsed,
+        "sent": sum(load.sent.values()),
+        "not_removed": not_removed,
+        "operations": {
+            op: {
+                "latency_s": summary([r[2] for r in records]),
+                "errors": dict(Counter(str(r[3]) for r in records if r[3] is not None)),
+            }
+            for op, records in sorted(by_op.items())
+        },
+        "timeline": timeline(load.records, duration),
+    }
+
+
+def run(rate, duration, mix=DEFAULT_MIX, arrival="constant", vlans=(100, 3999), pairs="any",
+        timeout=60, seed=0, cleanup=True):
+    return asyncio.run(
+        _main(rate, duration, parse_mix(mix), arrival, vlans, pairs, timeout, seed, cleanup)
+    )
+
+
+def report(path):
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    for res in results:
+        print(f"rate={res['rate']}/s {res['arrival']} duration={res['duration']}s mix={res['mix']}")
+        header = f"{'second':>6} {'sent':>5} {'done':>5} {'errors':>6} {'p50 ms':>8} {'p99 ms':>8}"
+        print(header)
+        print("-" * len(header))
+        for sec in res["timeline"]:
+            p50 = f"{sec['p50'] * 1000:8.1f}" if sec["p50"] is not None else f"{'-':>8}"
+            p99 = f"{sec['p99'] * 1000:8.1f}" if sec["p99"] is not None else f"{'-':>8}"
+            print(f"{sec['second']:>6} {sec['sent']:>5} {sec['completed']:>5} {sec['errors']:>6} {p50} {p99}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load. Default: 60")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="constant",
+                        help="Inter-arrival times. Default: constant")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights. Default: {DEFAULT_MIX}")
+    parser.add_argument("--vlans", default="100-3999", help="VLAN range of the L2VPNs. Default: 100-3999")
+    parser.add_argument("--pairs", choices=["inter", "intra", "any"], default="any",
+                        help="Domains of the endpoints. Default: any")
+    parser.add_argument("--timeout", type=float, default=60, help="Request timeout in seconds. Default: 60")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the arrivals and choices. Default: 0")
+    parser.add_argument("--keep", action="store_true", help="Do not remove the L2VPNs at the end")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    parser.add_argument("--report", metavar="FILE", help="Print the timelines of a results file and exit")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.report)
+        return 0
+    if not args.rate:
+        parser.error("--rate is required")
+    first, _, last = args.vlans.partition("-")
+    result = run(
+        args.rate, args.duration, args.mix, args.arrival, (int(first), int(last or first)),
+        args.pairs, args.timeout, args.seed, cleanup=not args.keep,
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
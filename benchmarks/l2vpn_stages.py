@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""Per-stage provisioning latency of L2VPNs, from the POST to the first ping.
+
+Create --runs L2VPNs one after the other between two hosts of the topology
+(h1 and h8 by default, as in test_05), each on its own VLAN, and trace them
+with tests/l2vpn_tracer.py: controller accept, connection messages per OXP
+(if the RabbitMQ firehose is on), EVC creation/activation and OVS flows per
+OXP, status up and the first successful ping between the hosts. Each
+L2VPN is removed before the next one. The result (one JSON line) has the
+p50/p95 of each stage, relative to the POST, and the trace of each run.
+
+Run it in the mininet container, on a clean stack:
+
+    docker compose exec mq1 rabbitmqctl trace_on   # optional, queued stages
+    docker compose exec mininet python3 -m benchmarks.l2vpn_stages --runs 20 --output stages.json
+
+On the host, container logs can then be added to the traces and reported:
+
+    docker compose logs --timestamps --no-color > logs.txt
+    python3 -m benchmarks.l2vpn_stages --report stages.json --logs logs.txt
+"""
+import argparse
+import json
+import sys
+
+from tests.stats import summary
+from tests.waiters import OXPS
+
+
+def stage_summary(traces):
+    stages = {}
+    for trace in traces:
+        for stage, offset in trace["stages_s"].items():
+            stages.setdefault(stage, []).append(offset)
+    stats = {stage: summary(offsets) for stage, offsets in stages.items()}
+    return dict(sorted(stats.items(), key=lambda item: item[1]["p50"]))
+
+
+def run(runs, hosts=("h1", "h8"), first_vlan=100, timeout=120, topology="simple3oxps"):
+    import requests
+
+    from tests.helpers import NetworkTest
+    from tests.l2vpn_tracer import L2VPNTracer
+    from tests.waiters import API_URL, WaitTimeout, wait_l2vpns, wait_topology_up, wait_until
+
+    if first_vlan + runs - 1 > 4094:
+        raise ValueError("Not enough VLANs: every run uses its own VLAN")
+    net = NetworkTest(OXPS, topology)
+    tracer = None
+    try:
+        net.wait_switches_connect()
+        net.run_setup_topo()
+        wait_topology_up()
+        host_a, host_z = net.net.get(*hosts)
+        ports = [net.host_port(host_a), net.host_port(host_z)]
+        tracer = L2VPNTracer().start()
+        failures = []
+        for i in range(runs):
+            vlan = first_vlan + i
+            net.add_host_vlan(host_a, vlan, 1)
+            address = net.add_host_vlan(host_z, vlan, 2)
+            payload = {
+                "name": f"Stages L2VPN {i}",
+                "endpoints": [{"port_id": port, "vlan": str(vlan)} for port in ports],
+            }
+            service_id = tracer.post(payload)
+            try:
+                tracer.wait(service_id, timeout=timeout)
+                wait_until(
+                    lambda: host_a.cmd(f"ping -c1 -W1 {address}"),
+                    lambda output: ", 0% packet loss," in output,
+                    timeout=timeout,
+                    interval=0.1,
+                    max_interval=0.1,
+                    desc=f"{host_a.name} -> {host_z.name} on VLAN {vlan}",
+                )
+                tracer.mark(service_id, "ping")
+            except WaitTimeout as exc:
+                failures.append({"service_id": service_id, "error": str(exc)[:200]})
+            requests.delete(f"{API_URL}/{service_id}")
+            wait_l2vpns(lambda l2vpns: service_id not in l2vpns, timeout=timeout, desc=f"{service_id} to be removed")
+            for host in (host_a, host_z):
+                net.remove_host_vlan(host, vlan)
+        traces = tracer.stop()
+        tracer = None
+        return {
+            "runs": runs,
+            "endpoints": ports,
+            "failures": failures,
+            "stages_s": stage_summary(traces),
+            "traces": traces,
+        }
+    finally:
+        if tracer:
+            tracer.stop()
+        net.stop()
+
+
+def report(path, logs=None):
+    from tests.l2vpn_tracer import merge_logs
+
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    for res in results:
+        stages = res["stages_s"]
+        if logs:
+            stages = stage_summary([merge_logs(trace, logs) for trace in res["traces"]])
+        print(f"runs={res['runs']} failures={len(res['failures'])} {' - '.join(res['endpoints'])}")
+        header = f"{'stage':<24} {'count':>5} {'p50 s':>8} {'p95 s':>8} {'max s':>8}"
+        print(header)
+        print("-" * len(header))
+        for stage, stats in stages.items():
+            print(f"{stage:<24} {stats['count']:>5} {stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['max']:>8.3f}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="L2VPNs to provision. Default: 10")
+    parser.add_argument("--hosts", default="h1,h8", help="The two hosts to connect. Default: h1,h8")
+    parser.add_argument("--first-vlan", type=int, default=100, help="VLAN of the first run. Default: 100")
+    parser.add_argument("--timeout", type=int, default=120, help="Seconds to wait for each stage. Default: 120")
+    parser.add_argument("--topology", default="simple3oxps", help="Topology to build. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    parser.add_argument("--report", metavar="FILE", help="Print the stages of a results file and exit")
+    parser.add_argument("--logs", help="With --report, `docker compose logs --timestamps` output to merge")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.report, args.logs)
+        return 0
+    hosts = args.hosts.split(",")
+    if len(hosts) != 2:
+        parser.error("--hosts must name two hosts")
+    result = run(args.runs, hosts, args.first_vlan, args.timeout, args.topology)
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+"""L2VPN creation throughput: POST latency and time to up of N L2VPNs.
+
+Submit --count L2VPN requests to /SDX-Controller/l2vpn/1.0 from --concurrency
+workers, each L2VPN between two UNIs of the controller topology (ports with
+no NNI) on its own VLAN. A watcher polls the L2VPN list and the mef_eline
+EVCs of the OXPs and records, relative to the POST of each L2VPN:
+
+- post: the POST response time (201 expected)
+- up: when the L2VPN status becomes "up"
+- evcs: when an EVC tagged with its VLAN exists on the OXP of each endpoint
+
+The result (one JSON line) has the throughput (L2VPNs up per second, from
+the first POST to the last up) and the p50/p95/p99 of each latency. By
+default the benchmark builds the topology (run it in the mininet container,
+on a clean stack) and removes the L2VPNs at the end:
+
+    docker compose exec mininet python3 -m benchmarks.l2vpn_throughput --count 100 --concurrency 10
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.stats import summary
+from tests.waiters import OXPS
+
+
+def uni_ports(topology):
+    """Return the id of the ports of a topology that are up and have no NNI."""
+    return sorted(
+        port["id"]
+        for node in topology["nodes"]
+        for port in node["ports"]
+        if not port.get("nni") and port.get("status", "up") == "up"
+    )
+
+
+def port_domain(port_id):
+    """urn:sdx:port:ampath.net:Ampath1:50 -> ampath.net"""
+    return port_id.split(":")[3]
+
+
+def endpoint_pairs(ports, mode="inter"):
+    """Return the UNI pairs L2VPNs are created on: inter-domain, intra-domain or any."""
+    pairs = []
+    for port_a, port_z in itertools.combinations(ports, 2):
+        same = port_domain(port_a) == port_domain(port_z)
+        if mode == "any" or (mode == "intra") == same:
+            pairs.append((port_a, port_z))
+    if not pairs:
+        raise ValueError(f"No {mode} UNI pair in the topology")
+    return pairs
+
+
+def has_evc_tag(evcs, vlan):
+    return any(
+        evc.get(uni, {}).get("tag", {}).get("value") == vlan
+        for evc in evcs.values()
+        for uni in ("uni_a", "uni_z")
+    )
+
+
+class Watcher(threading.Thread):
+    """Poll the L2VPNs and EVCs and record when each L2VPN is up / has its EVCs."""
+
+    def __init__(self, oxps, interval=0.2):
+        super().__init__(daemon=True)
+        self.oxps = oxps
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.pending_up = {}
+        self.pending_evcs = {}
+        self.up = {}
+        self.evcs = {}
+        self.errors = {}
+        self.stopped = threading.Event()
+
+    def add(self, service_id, vlan, oxps):
+        with self.lock:
+            self.pending_up[service_id] = True
+            self.pending_evcs[service_id] = (vlan, set(oxps))
+
+    def done(self):
+        return not self.pending_up and not self.pending_evcs
+
+    def run(self):
+        import requests
+
+        from tests.waiters import API_URL, KYTOS_API
+
+        session = requests.Session()
+        while not self.stopped.is_set():
+            start = time.monotonic()
+            try:
+                l2vpns = session.get(API_URL, timeout=30).json()
+                evcs = {
+                    oxp: session.get(f"{KYTOS_API % oxp}/mef_eline/v2/evc/", timeout=30).json()
+                    for oxp in self.oxps
+                }
+            except (requests.RequestException, ValueError):
+                time.sleep(self.interval)
+                continue
+            seen = time.monotonic()
+            with self.lock:
+                for service_id in list(self.pending_up):
+                    status = l2vpns.get(service_id, {}).get("status")
+                    if status == "up":
+                        self.up[service_id] = seen
+                        del self.pending_up[service_id]
+                    elif status == "error":
+                        self.errors[service_id] = status
+                        del self.pending_up[service_id]
+                        self.pending_evcs.pop(service_id, None)
+                for service_id, (vlan, oxps) in list(self.pending_evcs.items()):
+                    oxps -= {oxp for oxp in oxps if has_evc_tag(evcs[oxp], vlan)}
+                    if not oxps:
+                        self.evcs[service_id] = seen
+                        del self.pending_evcs[service_id]
+            time.sleep(max(self.interval - (time.monotonic() - start), 0))
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run(count, concurrency=1, pairs="inter", first_vlan=100, timeout=600, topology=None, cleanup=True):
+    import requests
+
+    from tests.helpers import NetworkTest
+    from tests.topologies.converter import oxp_info
+    from tests.waiters import API_URL, get_topology, wait_l2vpns, wait_topology_up
+
+    if first_vlan + count - 1 > 4094:
+        raise ValueError("Not enough VLANs: every L2VPN uses its own VLAN")
+    net = None
+    posted = {}
+    try:
+        if topology:
+            net = NetworkTest(OXPS, topology)
+            net.wait_switches_connect()
+            net.run_setup_topo()
+            wait_topology_up()
+        domains = {oxp_info(oxp)["domain"]: oxp for oxp in OXPS}
+        candidates = endpoint_pairs(uni_ports(get_topology()), pairs)
+        watcher = Watcher(OXPS)
+        watcher.start()
+        session = requests.Session()
+        post_times, failures = [], []
+
+        def create(i):
+            port_a, port_z = candidates[i % len(candidates)]
+            vlan = first_vlan + i
+            payload = {
+                "name": f"Benchmark L2VPN {i}",
+                "endpoints": [
+                    {"port_id": port_a, "vlan": str(vlan)},
+                    {"port_id": port_z, "vlan": str(vlan)},
+                ],
+            }
+            start = time.monotonic()
+            response = session.post(API_URL, json=payload, timeout=60)
+            elapsed = time.monotonic() - start
+            if response.status_code != 201:
+                failures.append({"index": i, "status": response.status_code, "text": response.text[:200]})
+                return
+            service_id = response.json()["service_id"]
+            posted[service_id] = start
+            post_times.append(elapsed)
+            watcher.add(service_id, vlan, {domains[port_domain(port_a)], domains[port_domain(port_z)]})
+
+        first_post = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(create, range(count)))
+        submit_time = time.monotonic() - first_post
+        deadline = time.monotonic() + timeout
+        while not watcher.done() and time.monotonic() < deadline:
+            time.sleep(0.5)
+        watcher.stop()
+
+        up = [watcher.up[sid] - posted[sid] for sid in watcher.up]
+        last_up = max(watcher.up.values(), default=None)
+        return {
+            "count": count,
+            "concurrency": concurrency,
+            "pairs": pairs,
+            "created": len(posted),
+            "post_failures": failures,
+            "up": len(watcher.up),
+            "errors": len(watcher.errors),
+            "not_up": len(watcher.pending_up),
+            "submit_rate": len(posted) / submit_time if submit_time else None,
+            "throughput": len(watcher.up) / (last_up - first_post) if last_up else None,
+            "latency_s": {
+                "post": summary(post_times),
+                "up": summary(up),
+                "evcs": summary([watcher.evcs[sid] - posted[sid] for sid in watcher.evcs]),
+            },
+        }
+    finally:
+        if cleanup and posted:
+            for service_id in posted:
+                requests.delete(f"{API_URL}/{service_id}")
+            wait_l2vpns(
+                lambda l2vpns: not set(posted) & set(l2vpns),
+                timeout=timeout,
+                desc="benchmark L2VPNs to be removed",
+            )
+        if net:
+            net.stop()
+
+
+def report(path):
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    header = (
+        f"{'count':>6} {'conc':>5} {'up':>5} {'L2VPN/s':>8}"
+        f" {'post p50':>9} {'p99':>7} {'up p50':>8} {'p95':>7} {'p99':>7} {'evcs p50':>9} {'p99':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for res in sorted(results, key=lambda r: (r["count"], r["concurrency"])):
+        lat = {k: v or {} for k, v in res["latency_s"].items()}
+        print(
+            f"{res['count']:>6} {res['concurrency']:>5} {res['up']:>5} {res['throughput'] or 0:>8.2f}"
+            f" {lat['post'].get('p50', 0):>9.3f} {lat['post'].get('p99', 0):>7.3f}"
+            f" {lat['up'].get('p50', 0):>8.2f} {lat['up'].get('p95', 0):>7.2f} {lat['up'].get('p99', 0):>7.2f}"
+            f" {lat['evcs'].get('p50', 0):>9.2f} {lat['evcs'].get('p99', 0):>7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, help="Number of L2VPNs")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent POSTs. Default: 1")
+    parser.add_argument("--pairs", choices=["inter", "intra", "any"], default="inter",
+                        help="Domains of the endpoints. Default: inter")
+    parser.add_argument("--first-vlan", type=int, default=100, help="VLAN of the first L2VPN. Default: 100")
+    parser.add_argument("--timeout", type=int, default=600, help="Seconds to wait for the L2VPNs. Default: 600")
+    parser.add_argument("--topology", default="simple3oxps",
+                        help="Topology to build, or '' to use the running one. Default: simple3oxps")
+    parser.add_argument("--keep", action="store_true", help="Do not remove the L2VPNs at the end")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    parser.add_argument("--report", metavar="FILE", help="Print the table of a results file and exit")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.report)
+        return 0
+    if not args.count:
+        parser.error("--count is required")
+    result = run(
+        args.count, args.concurrency, args.pairs, args.first_vlan, args.timeout,
+        args.topology, cleanup=not args.keep,
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+"""Synthetic SDX-LCs: topology updates published straight to RabbitMQ.
+
+The SDX-Controller consumes the topologies of the SDX-LCs from the queue
+SUB_QUEUE of env/sdx-controller.env (oxp_update). This tool stands for N
+SDX-LCs of synthetic domains (see tests/topologies/synthetic.py), with no
+Kytos nor Mininet behind them:
+
+1. the 2.0.0 topology of every domain is published, at --rate messages/s
+2. --updates incremental updates are published at the same rate, spread
+   over the domains: a UNI port goes down, an intra-domain link is removed
+   or the address of a node changes. As an SDX-LC does, each update is the
+   whole domain topology with a bumped version.
+
+A watcher thread polls GET /SDX-Controller/topology and records when each
+message becomes visible (at the resolution of one poll), and samples the
+queue backlog. Run it in the mininet container, on a clean stack (the
+synthetic domains stay in the controller):
+
+    docker compose exec mininet python3 -m benchmarks.lc_publisher --domains 50 --rate 20
+"""
+import argparse
+import copy
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import pika
+import requests
+
+from tests.stats import summary
+from tests.topologies import synthetic
+from tests.topologies.converter import read_env
+from tests.waiters import API_URL_TOPO, topology_links, topology_ports
+
+KINDS = ["port_down", "link_removed", "metadata"]
+
+
+def now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SyntheticDomain:
+    """The topology an SDX-LC of a synthetic domain would publish."""
+
+    def __init__(self, oxp, topology):
+        self.oxp = oxp
+        self.topology = dict(copy.deepcopy(topology), version=1, timestamp=now())
+
+    def _bump(self):
+        self.topology["version"] += 1
+        self.topology["timestamp"] = now()
+
+    def initial(self):
+        nodes = {node["id"] for node in self.topology["nodes"]}
+        return lambda view: nodes <= set(view["nodes"])
+
+    def port_down(self):
+        for node in self.topology["nodes"]:
+            for port in node["ports"]:
+                if port["status"] == "up" and not port["nni"]:
+                    port["status"] = "down"
+                    port_id = port["id"]
+                    return lambda view: view["ports"].get(port_id, {}).get("status") == "down"
+        return None
+
+    def link_removed(self):
+        if not self.topology["links"]:
+            return None
+        link_id = self.topology["links"].pop(0)["id"]
+        return lambda view: link_id not in view["links"]
+
+    def metadata(self):
+        node = self.topology["nodes"][self.topology["version"] % len(self.topology["nodes"])]
+        version = self.topology["version"] + 1
+        node["location"]["address"] = f"{node['name']}-v{version}"
+        node_id = node["id"]
+
+        # the node may be re-addressed by a later update before a poll sees
+        # this one: any later address also means this update was ingested
+        def check(view):
+            address = view["nodes"].get(node_id, {}).get("location", {}).get("address", "")
+            _, _, seen = address.rpartition("-v")
+            return seen.isdigit() and int(seen) >= version
+
+        return check
+
+    def update(self, kind):
+        """Apply an update of the given kind, return its check or None if not possible."""
+        check = getattr(self, kind)()
+        if check is not None:
+            self._bump()
+        return check
+
+
+class Publisher:
+    """Publish messages on the queue the SDX-Controller consumes."""
+
+    def __init__(self, env):
+        self.queue = env["SUB_QUEUE"]
+        self.connection = pika.BlockingConnection(pika.ConnectionParameters(
+            host=env["MQ_HOST"],
+            port=int(env["MQ_PORT"]),
+            credentials=pika.PlainCredentials(env["MQ_USER"], env["MQ_PASS"]),
+        ))
+        self.channel = self.connection.channel()
+
+    def publish(self, message):
+        self.channel.basic_publish(exchange="", routing_key=self.queue, body=json.dumps(message))
+
+    def backlog(self):
+        return self.channel.queue_declare(queue=self.queue, passive=True).method.message_count
+
+    def sleep(self, seconds):
+        # keeps serving the heartbeats, unlike time.sleep()
+        self.connection.sleep(max(seconds, 0))
+
+    def close(self):
+        self.connection.close()
+
+
+class Watcher(threading.Thread):
+    """Poll the SDX-Controller topology until the published messages show up."""
+
+    def __init__(self, env, interval=0.1):
+        super().__init__(daemon=True)
+        self.env = env
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.latencies = {}
+        self.seen_at = {}
+        self.backlog = []
+        self.polls = []
+        self.stopped = threading.Event()
+
+    def add(self, key, check, published_at):
+        with self.lock:
+            self.pending[key] = (check, published_at)
+
+    def wait(self, timeout, sleep=time.sleep):
+        """Wait for the pending messages, sleeping with `sleep` (e.g. Publisher.sleep)."""
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            sleep(self.interval)
+        return not self.pending
+
+    def run(self):
+        mq = Publisher(self.env)
+        session = requests.Session()
+        try:
+            while not self.stopped.is_set():
+                start = time.monotonic()
+                try:
+                    topology = session.get(API_URL_TOPO, timeout=30).json()
+                except (requests.RequestException, ValueError):
+                    mq.sleep(self.interval)
+                    continue
+                seen = time.monotonic()
+                self.polls.append(seen - start)
+                view = {
+                    "nodes": {node["id"]: node for node in topology.get("nodes", [])},
+                    "ports": topology_ports(topology) if "nodes" in topology else {},
+                    "links": topology_links(topology) if "links" in topology else {},
+                }
+                with self.lock:
+                    for key, (check, published_at) in list(self.pending.items()):
+                        if check(view):
+                            self.latencies[key] = seen - published_at
+                            self.seen_at[key] = seen
+                            del self.pending[key]
+                self.backlog.append((seen, mq.backlog()))
+                mq.sleep(self.interval - (time.monotonic() - start))
+        finally:
+            mq.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run(domains, switches=2, shape="ring", rate=10, updates=100, kinds=KINDS, timeout=300, prefix="synth"):
+    env = read_env("sdx-controller")
+    oxps = [
+        SyntheticDomain(oxp, info["topology"])
+        for oxp, info in synthetic.generate(domains, switches, shape, prefix=prefix).items()
+    ]
+    publisher = Publisher(env)
+    watcher = Watcher(env)
+    watcher.start()
+    published = []
+
+    def send(key, domain, check):
+        if published:
+            publisher.sleep(published[-1] + 1 / rate - time.monotonic())
+        publisher.publish(domain.topology)
+        published.append(time.monotonic())
+        watcher.add(key, check, published[-1])
+
+    try:
+        for domain in oxps:
+            send(("initial", domain.oxp), domain, domain.initial())
+        watcher.wait(timeout, publisher.sleep)
+        start = published[-1]
+        for i in range(updates):
+            domain = oxps[i % len(oxps)]
+            # try the kinds in turn, as a domain may run out of links or UNIs
+            for j in range(len(kinds)):
+                kind = kinds[(i // len(oxps) + j) % len(kinds)]
+                check = domain.update(kind)
+                if check is not None:
+                    send((kind, i), domain, check)
+                    break
+        publish_time = published[-1] - start if updates else 0
+        watcher.wait(timeout, publisher.sleep)
+    finally:
+        watcher.stop()
+        publisher.close()
+
+    by_kind = {}
+    for (kind, _), latency in watcher.latencies.items():
+        by_kind.setdefault(kind, []).append(latency)
+    update_seen = [t for (kind, _), t in watcher.seen_at.items() if kind != "initial"]
+    return {
+        "domains": domains,
+        "switches_per_domain": switches,
+        "rate": rate,
+        "published": len(published),
+        "publish_rate": (len(published) - domains) / publish_time if publish_time else None,
+        "ingest_rate": len(update_seen) / (max(update_seen) - start) if update_seen else None,
+        "missing": sorted(f"{kind}:{key}" for kind, key in watcher.pending),
+        "latency_s": {kind: summary(values) for kind, values in sorted(by_kind.items())},
+        "backlog_max": max((count for _, count in watcher.backlog), default=0),
+        "poll_s": summary(watcher.polls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--domains", type=int, default=10, help="Synthetic domains. Default: 10")
+    parser.add_argument("--switches", type=int, default=2, help="Switches per domain. Default: 2")
+    parser.add_argument("--shape", default="ring", help="Intra-domain shape. Default: ring")
+    parser.add_argument("--rate", type=float, default=10, help="Messages per second. Default: 10")
+    parser.add_argument("--updates", type=int, default=100, help="Incremental updates. Default: 100")
+    parser.add_argument("--kinds", default=",".join(KINDS), help=f"Update kinds. Default: {','.join(KINDS)}")
+    parser.add_argument("--timeout", type=int, default=300, help="Seconds to wait for the messages. Default: 300")
+    parser.add_argument("--prefix", default="synth", help="Name prefix of the domains. Default: synth")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    args = parser.parse_args()
+
+    kinds = args.kinds.split(",")
+    if set(kinds) - set(KINDS):
+        parser.error(f"--kinds must be among {KINDS}")
+    result = run(
+        args.domains, args.switches, args.shape, args.rate, args.updates, kinds, args.timeout, args.prefix
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 1 if result["missing"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
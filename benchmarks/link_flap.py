@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Link-flap storm: controller convergence while links keep flapping.
+
+Flap --links (intra- and inter-domain links of simple3oxps by default) at
+--rate flaps per second per link, down for --duty of each period, during
+--duration seconds, and measure with tests/churn.py how the port status
+changes reach Kytos, the SDX-LC and the SDX-Controller: convergence time,
+missed and out of order transitions, and the time to steady state (every
+port up) once the flapping stops. Run it in the mininet container, on a
+clean stack:
+
+    docker compose exec mininet python3 -m benchmarks.link_flap --rate 0.5 --duration 120
+"""
+import argparse
+import json
+import sys
+
+from tests.waiters import OXPS
+
+LINKS = "Ampath1-Ampath2,Sax01-Tenet01"
+
+
+def run(links, rate=1, duty=0.5, duration=30, settle_timeout=300, topology="simple3oxps"):
+    from tests.helpers import NetworkTest
+    from tests.waiters import wait_topology_up
+
+    net = NetworkTest(OXPS, topology)
+    try:
+        net.wait_switches_connect()
+        net.run_setup_topo()
+        wait_topology_up()
+        churn = net.flap_links(links, rate, duty, duration, settle_timeout=settle_timeout)
+        return churn.result()
+    finally:
+        net.stop()
+
+
+def report(path):
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    header = (
+        f"{'rate':>6} {'duty':>5} {'changes':>8} {'hop':<11} {'p50 s':>7} {'p95 s':>7}"
+        f" {'max s':>7} {'missed':>7} {'ooo':>5} {'steady s':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for res in sorted(results, key=lambda r: (r["rate"], r["duty"])):
+        for hop, stats in res["hops"].items():
+            conv = stats["convergence_s"] or {}
+            steady = f"{stats['steady_s']:>9.2f}" if stats["steady_s"] is not None else f"{'never':>9}"
+            print(
+                f"{res['rate']:>6} {res['duty']:>5} {res['transitions']:>8} {hop:<11}"
+                f" {conv.get('p50', 0):>7.2f} {conv.get('p95', 0):>7.2f} {conv.get('max', 0):>7.2f}"
+                f" {stats['missed']:>7} {stats['out_of_order']:>5} {steady}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", default=LINKS, help=f"Links to flap, as node1-node2,... Default: {LINKS}")
+    parser.add_argument("--rate", type=float, default=0.5, help="Flaps per second per link. Default: 0.5")
+    parser.add_argument("--duty", type=float, default=0.5, help="Fraction of each period a link is down. Default: 0.5")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of flapping. Default: 60")
+    parser.add_argument("--settle-timeout", type=float, default=300,
+                        help="Seconds to wait for the steady state. Default: 300")
+    parser.add_argument("--topology", default="simple3oxps", help="Topology to build. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    parser.add_argument("--report", metavar="FILE", help="Print the table of a results file and exit")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.report)
+        return 0
+    if not 0 < args.duty < 1:
+        parser.error("--duty must be between 0 and 1")
+    links = [tuple(link.split("-")) for link in args.links.split(",")]
+    result = run(links, args.rate, args.duty, args.duration, args.settle_timeout, args.topology)
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0 if result["steady"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+"""Mass reprovisioning: recovery of many L2VPNs when a loaded link fails.
+
+Create --count L2VPNs between two UNIs (Ampath1:50 and Tenet03:50 by
+default, as test_05::test_060, whose path crosses Ampath1:40-Sax01:40), on
+VLANs from --first-vlan, wait for them to be up, then take --link down.
+The L2VPNs whose current_path used the link are the affected ones; the
+L2VPN list is polled and, for each of them, the time since the failure is
+recorded when it is first disrupted (status not up), when it is up again
+on a path avoiding the link (recovered) or when it is marked down or in
+error. The run ends when every affected L2VPN is recovered, or once the
+statuses stopped changing for --settle seconds.
+
+The result (one JSON line) has the per-service recovery times, their
+distribution, the controller processing rate (recovered L2VPNs per second
+between the first and the last recovery) and a per-second timeline of the
+recoveries. Run it in the mininet container, on a clean stack:
+
+    docker compose exec mininet python3 -m benchmarks.mass_reprovision --count 300
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.stats import summary
+from tests.waiters import OXPS
+
+PORTS = "urn:sdx:port:ampath.net:Ampath1:50,urn:sdx:port:tenet.ac.za:Tenet03:50"
+
+
+def uses(l2vpn, ports):
+    return any(hop.get("port_id") in ports for hop in l2vpn.get("current_path") or [])
+
+
+def create_l2vpns(ports, count, first_vlan, concurrency, name="Reprovision L2VPN"):
+    """POST the L2VPNs, return their service ids."""
+    import requests
+
+    from tests.waiters import API_URL
+
+    session = requests.Session()
+
+    def create(i):
+        vlan = str(first_vlan + i)
+        payload = {
+            "name": f"{name} {i}",
+            "endpoints": [{"port_id": port, "vlan": vlan} for port in ports],
+        }
+        response = session.post(API_URL, json=payload, timeout=60)
+        assert response.status_code == 201, response.text
+        return response.json()["service_id"]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(create, range(count)))
+
+
+def remove_l2vpns(name, timeout):
+    """Delete the L2VPNs created by create_l2vpns(), even if it failed half way."""
+    import requests
+
+    from tests.waiters import API_URL, get_l2vpns, wait_l2vpns_removed
+
+    created = [
+        service_id for service_id, l2vpn in get_l2vpns().items()
+        if l2vpn.get("name", "").startswith(f"{name} ")
+    ]
+    for service_id in created:
+        requests.delete(f"{API_URL}/{service_id}")
+    if created:
+        wait_l2vpns_removed(OXPS, timeout=timeout)
+
+
+def watch(affected, failed_ports, failed_at, settle, timeout):
+    """Poll the L2VPN list until the affected L2VPNs are recovered or settled."""
+    from tests.waiters import get_l2vpns
+
+    events = {service_id: {} for service_id in affected}
+    last_change = failed_at
+    previous = {}
+    while time.monotonic() - failed_at < timeout:
+        try:
+            l2vpns = get_l2vpns()
+        except Exception:
+            time.sleep(0.1)
+            continue
+        now = time.monotonic()
+        for service_id in affected:
+            l2vpn = l2vpns.get(service_id, {})
+            status = l2vpn.get("status", "removed")
+            state = (status, uses(l2vpn, failed_ports))
+            if previous.get(service_id) != state:
+                previous[service_id] = state
+                last_change = now
+            record = events[service_id]
+            if status != "up":
+                record.setdefault("disrupted", now - failed_at)
+            if status == "up" and not state[1]:
+                record.setdefault("recovered", now - failed_at)
+            elif status in ("down", "error"):
+                record.setdefault(status, now - failed_at)
+            record["final"] = status
+        if all("recovered" in record for record in events.values()):
+            break
+        if now - last_change > settle:
+            break
+        time.sleep(0.1)
+    return events
+
+
+def run(count, ports, link=("Ampath1", "Sax01"), first_vlan=100, concurrency=10, settle=30, timeout=900,
+        topology="simple3oxps"):
+    from tests.churn import find_link
+    from tests.helpers import NetworkTest
+    from tests.topologies.converter import port_id
+    from tests.waiters import get_l2vpns, wait_all_l2vpns, wait_topology_up
+
+    if first_vlan + count - 1 > 4094:
+        raise ValueError("Not enough VLANs: every L2VPN uses its own VLAN")
+    net = NetworkTest(OXPS, topology)
+    try:
+        net.wait_switches_connect()
+        net.run_setup_topo()
+        wait_topology_up()
+        failed = find_link(net.net, *link)
+        failed_ports = {port_id(intf.node, intf) for intf in (failed.intf1, failed.intf2)}
+
+        start = time.monotonic()
+        service_ids = create_l2vpns(ports, count, first_vlan, concurrency)
+        wait_all_l2vpns("up", count=count, timeout=timeout)
+        provisioned = time.monotonic() - start
+        l2vpns = get_l2vpns()
+        affected = [sid for sid in service_ids if uses(l2vpns[sid], failed_ports)]
+
+        failed_at = time.monotonic()
+        net.net.configLinkStatus(*link, "down")
+        events = watch(affected, failed_ports, failed_at, settle, timeout)
+
+        recovered = sorted(record["recovered"] for record in events.values() if "recovered" in record)
+        per_second = Counter(int(t) for t in recovered)
+        return {
+            "count": count,
+            "ports": ports,
+            "link": "-".join(link),
+            "provision_s": provisioned,
+            "affected": len(affected),
+            "recovered": len(recovered),
+            "marked_down": sum(1 for r in events.values() if "recovered" not in r and r.get("final") == "down"),
+            "errors": sum(1 for r in events.values() if "recovered" not in r and r.get("final") == "error"),
+            "unsettled": sum(
+                1 for r in events.values() if "recovered" not in r and r.get("final") not in ("down", "error")
+            ),
+            "disrupted_s": summary([r["disrupted"] for r in events.values() if "disrupted" in r]),
+            "recovery_s": summary(recovered),
+            "all_recovered_s": recovered[-1] if len(recovered) == len(affected) and recovered else None,
+            "rate": (
+                (len(recovered) - 1) / (recovered[-1] - recovered[0])
+                if len(recovered) > 1 and recovered[-1] > recovered[0] else None
+            ),
+            "timeline": [
+                {"second": second, "recovered": per_second[second]}
+                for second in range(int(recovered[-1]) + 1 if recovered else 0)
+            ],
+            "services": events,
+        }
+    finally:
+        net.net.configLinkStatus(*link, "up")
+        remove_l2vpns("Reprovision L2VPN", timeout)
+        net.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="L2VPNs across the link. Default: 100")
+    parser.add_argument("--ports", default=PORTS, help=f"The two UNIs of the L2VPNs. Default: {PORTS}")
+    parser.add_argument("--link", default="Ampath1-Sax01", help="Link to take down. Default: Ampath1-Sax01")
+    parser.add_argument("--first-vlan", type=int, default=100, help="VLAN of the first L2VPN. Default: 100")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent POSTs. Default: 10")
+    parser.add_argument("--settle", type=float, default=30,
+                        help="Stop once no status changed for this many seconds. Default: 30")
+    parser.add_argument("--timeout", type=int, default=900, help="Seconds to wait for each phase. Default: 900")
+    parser.add_argument("--topology", default="simple3oxps", help="Topology to build. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    args = parser.parse_args()
+
+    ports = args.ports.split(",")
+    if len(ports) != 2:
+        parser.error("--ports must name two ports")
+    result = run(
+        args.count, ports, tuple(args.link.split("-")), args.first_vlan, args.concurrency,
+        args.settle, args.timeout, args.topology,
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0 if result["recovered"] == result["affected"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""Topology import scaling: OXP push to SDX-Controller visible time vs size.
+
+For one topology size (run inside the mininet container, on a clean stack):
+build a generated topology, enable it on the Kytos OXPs, then trigger
+POST /api/kytos/sdx/topology/2.0.0 on every OXP and measure how long it
+takes until /SDX-Controller/topology shows all the nodes and links. The
+size of the topology exported by each OXP and the response time of
+GET /SDX-Controller/topology are recorded too. Each run appends one JSON
+line to --output; --report prints the size vs latency table of a results
+file. scripts/bench-topology-import.sh runs it for several sizes,
+restoring a clean checkpoint between them.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from tests.stats import percentile
+from tests.waiters import OXPS
+
+
+def run(size, shape="ring", hosts=1, samples=10, timeout=600):
+    import requests
+
+    from tests.helpers import NetworkTest
+    from tests.topologies.common import expected_topology, provision_topo, push_topology
+    from tests.waiters import API_URL_TOPO, KYTOS_SDX_API
+
+    params = {"switches": size, "shape": shape, "hosts": hosts}
+    start = time.monotonic()
+    net = NetworkTest(OXPS, "generated", params)
+    try:
+        net.wait_switches_connect()
+        build_time = time.monotonic() - start
+
+        controllers = dict(zip(OXPS, net.controllers_ip))
+        metadata = net.net.description["metadata"]
+        start = time.monotonic()
+        provision_topo(controllers, net.net, metadata, push=False)
+        provision_time = time.monotonic() - start
+
+        payloads = {
+            oxp: len(requests.get(f"{KYTOS_SDX_API % oxp}/topology/2.0.0").content)
+            for oxp in OXPS
+        }
+
+        start = time.monotonic()
+        push_topology(controllers, net.net, timeout=timeout, interval=0.05, max_interval=0.5)
+        import_time = time.monotonic() - start
+
+        get_times, get_size = [], 0
+        for _ in range(samples):
+            start = time.monotonic()
+            response = requests.get(API_URL_TOPO)
+            get_times.append(time.monotonic() - start)
+            assert response.ok, response.text
+            get_size = len(response.content)
+
+        switches, links, inter_links = expected_topology(net.net)
+        return {
+            "switches_per_oxp": size,
+            "shape": shape,
+            "nodes": sum(len(sws) for sws in switches.values()),
+            "links": sum(len(l) for l in links.values()) + len(inter_links),
+            "ports": sum(len(sw.intfList()) - 1 for sw in net.net.switches),
+            "oxp_payload_bytes": payloads,
+            "build_s": build_time,
+            "build_phases_s": net.build_times,
+            "provision_s": provision_time,
+            "import_s": import_time,
+            "controller_payload_bytes": get_size,
+            "controller_get_ms": {
+                "median": statistics.median(get_times) * 1000,
+                "p95": percentile(get_times, 95) * 1000,
+            },
+        }
+    finally:
+        net.stop()
+
+
+def report(path):
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    header = (
+        f"{'switches/oxp':>12} {'nodes':>6} {'links':>6} {'ports':>6} {'oxp KB':>8}"
+        f" {'build s':>8} {'import s':>9} {'ctrl KB':>8} {'GET ms':>8} {'GET p95':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for res in sorted(results, key=lambda r: r["nodes"]):
+        print(
+            f"{res['switches_per_oxp']:>12} {res['nodes']:>6} {res['links']:>6} {res['ports']:>6}"
+            f" {sum(res['oxp_payload_bytes'].values()) / 1024:>8.1f}"
+            f" {res['build_s']:>8.2f} {res['import_s']:>9.2f} {res['controller_payload_bytes'] / 1024:>8.1f}"
+            f" {res['controller_get_ms']['median']:>8.1f} {res['controller_get_ms']['p95']:>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, help="Switches per OXP")
+    parser.add_argument("--shape", default="ring", help="Intra-domain shape. Default: ring")
+    parser.add_argument("--hosts", type=int, default=1, help="Hosts per switch. Default: 1")
+    parser.add_argument("--samples", type=int, default=10, help="GET /topology samples. Default: 10")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    parser.add_argument("--report", metavar="FILE", help="Print the table of a results file and exit")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.report)
+        return 0
+    if not args.size:
+        parser.error("--size is required")
+    result = run(args.size, args.shape, args.hosts, args.samples)
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""Mass UNI down: how fast the status of many L2VPNs follows their UNI.
+
+Create --count L2VPNs on consecutive VLANs of one UNI (the port of --intf,
+Tenet01-eth50 by default as test_20::test_030) to --peer, wait for them to
+be up, bring the interface down and poll the L2VPN list until every L2VPN
+is down, then bring it up and poll until they are all up again. For each
+L2VPN the time of its status flip after the port change is recorded, as
+well as when the controller topology shows the new port status.
+
+Flips seen in the same poll form a batch: a few large batches mean the
+controller updates the statuses together, many batches of one mean one by
+one. The result (one JSON line) has, for the down and the up phase, the
+distribution of the flip times, the spread between the first and the last
+flip, the batches and the per-service times. Run it in the mininet
+container, on a clean stack:
+
+    docker compose exec mininet python3 -m benchmarks.uni_down --count 200
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+
+from benchmarks.mass_reprovision import create_l2vpns, remove_l2vpns
+from tests.stats import summary
+from tests.waiters import OXPS
+
+PEER = "urn:sdx:port:ampath.net:Ampath1:50"
+NAME = "UNI down L2VPN"
+
+
+def wait_flips(service_ids, status, since, timeout, port=None, interval=0.1):
+    """Poll the L2VPN list, return when each L2VPN got `status`, relative to `since`.
+
+    If `port` is given, the time its status became `status` in the
+    controller topology is returned too.
+    """
+    from tests.waiters import get_l2vpns, get_topology, topology_ports
+
+    flips, port_at = {}, None
+    while len(flips) < len(service_ids) and time.monotonic() - since < timeout:
+        start = time.monotonic()
+        try:
+            l2vpns = get_l2vpns()
+            if port and port_at is None and topology_ports(get_topology())[port]["status"] == status:
+                port_at = time.monotonic() - since
+        except Exception:
+            time.sleep(interval)
+            continue
+        now = time.monotonic() - since
+        for service_id in service_ids:
+            if service_id not in flips and l2vpns.get(service_id, {}).get("status") == status:
+                flips[service_id] = now
+        time.sleep(max(interval - (time.monotonic() - start), 0))
+    return flips, port_at
+
+
+def phase(service_ids, flips):
+    times = sorted(flips.values())
+    batches = Counter(times)
+    return {
+        "flipped": len(flips),
+        "missing": len(service_ids) - len(flips),
+        "flip_s": summary(times),
+        "spread_s": times[-1] - times[0] if times else None,
+        "batches": len(batches),
+        "largest_batch": max(batches.values(), default=0),
+        "timeline": [{"at_s": at, "flipped": n} for at, n in sorted(batches.items())],
+    }
+
+
+def run(count, intf="Tenet01-eth50", peer=PEER, first_vlan=100, concurrency=10, timeout=600,
+        topology="simple3oxps"):
+    from tests.helpers import NetworkTest
+    from tests.topologies.converter import port_id
+    from tests.waiters import wait_all_l2vpns, wait_topology_up
+
+    if first_vlan + count - 1 > 4094:
+        raise ValueError("Not enough VLANs: every L2VPN uses its own VLAN")
+    net = NetworkTest(OXPS, topology)
+    switch = None
+    try:
+        net.wait_switches_connect()
+        net.run_setup_topo()
+        wait_topology_up()
+        switch = net.net.get(intf.partition("-")[0])
+        uni = port_id(switch, switch.intf(intf))
+        service_ids = create_l2vpns([uni, peer], count, first_vlan, concurrency, NAME)
+        wait_all_l2vpns("up", count=count, timeout=timeout)
+
+        down_at = time.monotonic()
+        switch.intf(intf).ifconfig("down")
+        down, port_down = wait_flips(service_ids, "down", down_at, timeout, uni)
+
+        up_at = time.monotonic()
+        switch.intf(intf).ifconfig("up")
+        up, port_up = wait_flips(service_ids, "up", up_at, timeout, uni)
+
+        return {
+            "count": count,
+            "uni": uni,
+            "peer": peer,
+            "port_down_s": port_down,
+            "port_up_s": port_up,
+            "down": phase(service_ids, down),
+            "up": phase(service_ids, up),
+            "services": {sid: {"down": down.get(sid), "up": up.get(sid)} for sid in service_ids},
+        }
+    finally:
+        if switch:
+            switch.intf(intf).ifconfig("up")
+        remove_l2vpns(NAME, timeout)
+        net.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100, help="L2VPNs on the UNI. Default: 100")
+    parser.add_argument("--intf", default="Tenet01-eth50", help="Interface of the UNI. Default: Tenet01-eth50")
+    parser.add_argument("--peer", default=PEER, help=f"Other endpoint of the L2VPNs. Default: {PEER}")
+    parser.add_argument("--first-vlan", type=int, default=100, help="VLAN of the first L2VPN. Default: 100")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent POSTs. Default: 10")
+    parser.add_argument("--timeout", type=int, default=600, help="Seconds to wait for each phase. Default: 600")
+    parser.add_argument("--topology", default="simple3oxps", help="Topology to build. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the result (JSON line) to this file")
+    args = parser.parse_args()
+
+    result = run(
+        args.count, args.intf, args.peer, args.first_vlan, args.concurrency, args.timeout, args.topology
+    )
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+    return 0 if not result["down"]["missing"] and not result["up"]["missing"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/python3
+"""VLAN pool exhaustion: allocation and release latency vs occupancy of a UNI.
+
+Fill the l2vpn-ptp vlan_range shared by two UNIs (Ampath3:50 and Tenet03:50
+by default, as in test_08) with L2VPNs, one request at a time, of one kind:
+
+    explicit  the next free VLAN on both endpoints ("vlan": "N")
+    any       "vlan": "any" on both endpoints, the controller picks the VLAN
+    range     blocks of --range-size VLANs ("vlan": "N:M")
+
+For each allocation the POST latency and, unless --no-wait, the time until
+the L2VPN is up are recorded with the occupancy of the pool at that time.
+One more request is then sent on the full pool (a rejection is expected).
+The L2VPNs are deleted one at a time, recording the DELETE latency as the
+pool drains and the time until the controller and the OXPs have released
+everything, and the first VLAN is allocated again to check it was freed.
+The result (one JSON line per kind) has the latencies per occupancy decile,
+so a cost growing with occupancy shows up. Run it in the mininet container,
+on a clean stack; --vlans restricts the pool (but "any" requests still get
+VLANs from the whole range), the whole range takes long:
+
+    docker compose exec mininet python3 -m benchmarks.vlan_pool --kinds explicit,any,range --vlans 100-1099
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.mass_reprovision import remove_l2vpns
+from tests.stats import summary
+from tests.waiters import OXPS
+
+PORTS = "urn:sdx:port:ampath.net:Ampath3:50,urn:sdx:port:tenet.ac.za:Tenet03:50"
+KINDS = ["explicit", "any", "range"]
+
+
+def expand(vlan_range):
+    """[[1, 3], [10, 10]] -> [1, 2, 3, 10]"""
+    return [vlan for first, last in vlan_range for vlan in range(first, last + 1)]
+
+
+def pool_vlans(topology, ports, vlans=None):
+    """Return the VLANs available for L2VPNs on all the ports, within `vlans`."""
+    from tests.waiters import topology_ports
+
+    by_id = topology_ports(topology)
+    pool = None
+    for port_id in ports:
+        available = set(expand(by_id[port_id]["services"]["l2vpn_ptp"]["vlan_range"]))
+        pool = available if pool is None else pool & available
+    if vlans:
+        pool &= set(range(vlans[0], vlans[1] + 1))
+    return sorted(pool)
+
+
+def requests_for(kind, pool, range_size=10):
+    """Yield the VLAN value of each request filling the pool, with the VLANs it takes."""
+    if kind == "explicit":
+        for vlan in pool:
+            yield str(vlan), 1
+    elif kind == "any":
+        for _ in pool:
+            yield "any", 1
+    else:
+        # only blocks of consecutive VLANs can be requested as a range
+        block = []
+        for vlan in pool:
+            if block and (vlan != block[-1] + 1 or len(block) == range_size):
+                yield f"{block[0]}:{block[-1]}", len(block)
+                block = []
+            block.append(vlan)
+        if block:
+            yield f"{block[0]}:{block[-1]}", len(block)
+
+
+def by_occupancy(records, key, buckets=10):
+    """Percentiles of `key` per occupancy bucket (fraction of the pool in use)."""
+    result = []
+    for bucket in range(buckets):
+        values = [
+            r[key] for r in records
+            if r.get(key) is not None and min(int(r["occupancy"] * buckets), buckets - 1) == bucket
+        ]
+        stats = summary(values, pcts=(50, 95))
+        result.append({
+            "occupancy": f"{bucket * 100 // buckets}-{(bucket + 1) * 100 // buckets}%",
+            **(stats or {"count": 0}),
+        })
+    return result
+
+
+def payload(name, ports, vlan):
+    return {"name": name, "endpoints": [{"port_id": port, "vlan": vlan} for port in ports]}
+
+
+def fill(session, ports, kind, pool, range_size, wait_up, timeout):
+    """Allocate the whole pool, return the records of the allocations."""
+    from tests.waiters import API_URL, WaitTimeout, wait_l2vpn
+
+    records = []
+    used = 0
+    for i, (vlan, size) in enumerate(requests_for(kind, pool, range_size)):
+        record = {"index": i, "vlan": vlan, "occupancy": used / len(pool)}
+        start = time.monotonic()
+        response = session.post(API_URL, json=payload(f"VLAN pool {kind} {i}", ports, vlan), timeout=60)
+        record["post"] = time.monotonic() - start
+        record["status"] = response.status_code
+        records.append(record)
+        if response.status_code != 201:
+            record["error"] = response.text[:200]
+            continue
+        used += size
+        record["service_id"] = response.json()["service_id"]
+        if wait_up:
+            try:
+                wait_l2vpn(record["service_id"], "up", timeout=timeout, interval=0.05, max_interval=0.5)
+                record["up"] = time.monotonic() - start
+            except WaitTimeout as exc:
+                record["error"] = str(exc)[:200]
+    return records
+
+
+def release(session, records, timeout):
+    """Delete the L2VPNs one at a time, return the DELETE records and the time until all is released."""
+    from tests.waiters import API_URL, wait_l2vpns_removed
+
+    created = [r for r in records if "service_id" in r]
+    deletes = []
+    start = time.monotonic()
+    for i, record in enumerate(created):
+        before = time.monotonic()
+        response = session.delete(f"{API_URL}/{record['service_id']}", timeout=60)
+        deletes.append({
+            "occupancy": 1 - i / len(created),
+            "delete": time.monotonic() - before,
+            "status": response.status_code,
+        })
+    submitted = time.monotonic() - start
+    wait_l2vpns_removed(OXPS, timeout=timeout)
+    return deletes, submitted, time.monotonic() - start
+
+
+def run(kind, ports, vlans=None, range_size=10, wait_up=True, timeout=600, topology="simple3oxps"):
+    import requests
+
+    from tests.helpers import NetworkTest
+    from tests.waiters import API_URL, get_topology, wait_l2vpn, wait_l2vpns_removed, wait_topology_up
+
+    net = None
+    session = requests.Session()
+    try:
+        if topology:
+            net = NetworkTest(OXPS, topology)
+            net.wait_switches_connect()
+            net.run_setup_topo()
+            wait_topology_up()
+        pool = pool_vlans(get_topology(), ports, vlans)
+        if not pool:
+            raise ValueError(f"No VLAN available on all of {ports}")
+
+        start = time.monotonic()
+        records = fill(session, ports, kind, pool, range_size, wait_up, timeout)
+        fill_time = time.monotonic() - start
+        created = [r for r in records if "service_id" in r]
+
+        # the pool is full: the first request again should be rejected
+        vlan, _ = next(requests_for(kind, pool, range_size))
+        extra = session.post(API_URL, json=payload(f"VLAN pool {kind} full", ports, vlan), timeout=60)
+        if extra.status_code == 201:
+            created.append({"service_id": extra.json()["service_id"]})
+
+        deletes, submitted, released = release(session, created, timeout)
+
+        # the VLANs are free again
+        start = time.monotonic()
+        reuse = session.post(API_URL, json=payload(f"VLAN pool {kind} reuse", ports, str(pool[0])), timeout=60)
+        reuse_up = None
+        if reuse.status_code == 201:
+            wait_l2vpn(reuse.json()["service_id"], "up", timeout=timeout)
+            reuse_up = time.monotonic() - start
+            session.delete(f"{API_URL}/{reuse.json()['service_id']}", timeout=60)
+            wait_l2vpns_removed(OXPS, timeout=timeout)
+
+        return {
+            "kind": kind,
+            "ports": ports,
+            "pool_size": len(pool),
+            "range_size": range_size if kind == "range" else None,
+            "requests": len(records),
+            "allocated": len(created),
+            "failed": [r for r in records if r["status"] != 201 or "error" in r][:20],
+            "full_pool_status": extra.status_code,
+            "allocation": {
+                "time_s": fill_time,
+                "post_s": summary([r["post"] for r in records]),
+                "up_s": summary([r["up"] for r in records if "up" in r]),
+                "post_by_occupancy": by_occupancy(records, "post"),
+                "up_by_occupancy": by_occupancy(records, "up"),
+            },
+            "release": {
+                "submit_s": submitted,
+                "released_s": released,
+                "delete_s": summary([d["delete"] for d in deletes]),
+                "delete_by_occupancy": by_occupancy(deletes, "delete"),
+                "errors": sum(1 for d in deletes if d["status"] != 200),
+            },
+            "reuse": {"status": reuse.status_code, "up_s": reuse_up},
+        }
+    finally:
+        # the L2VPNs left if a step failed half way
+        remove_l2vpns(f"VLAN pool {kind}", timeout)
+        if net:
+            net.stop()
+
+
+def report(path):
+    with open(path) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    for res in results:
+        alloc, rel = res["allocation"], res["release"]
+        print(
+            f"{res['kind']}: pool={res['pool_size']} allocated={res['allocated']}/{res['requests']}"
+            f" full pool -> {res['full_pool_status']} reuse -> {res['reuse']['status']}"
+            f" released in {rel['released_s']:.1f}s"
+        )
+        header = f"{'occupancy':>10} {'post p50':>9} {'p95':>7} {'up p50':>8} {'p95':>7} {'delete p50':>11} {'p95':>7}"
+        print(header)
+        print("-" * len(header))
+        rows = zip(alloc["post_by_occupancy"], alloc["up_by_occupancy"], rel["delete_by_occupancy"])
+        for post, up, delete in rows:
+            cells = [
+                f"{stats[pct]:>{width}.3f}" if stats["count"] else f"{'-':>{width}}"
+                for stats, widths in ((post, (9, 7)), (up, (8, 7)), (delete, (11, 7)))
+                for pct, width in zip(("p50", "p95"), widths)
+            ]
+            print(f"{post['occupancy']:>10} {' '.join(cells)}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kinds", default="explicit", help=f"Request kinds, among {','.join(KINDS)}. Default: explicit")
+    parser.add_argument("--ports", default=PORTS, help=f"The two UNIs of the L2VPNs. Default: {PORTS}")
+    parser.add_argument("--vlans", help="Restrict the pool to this VLAN range (e.g. 100-1099)")
+    parser.add_argument("--range-size", type=int, default=10, help="VLANs per range request. Default: 10")
+    parser.add_argument("--no-wait", action="store_true", help="Do not wait for each L2VPN to be up")
+    parser.add_argument("--timeout", type=int, default=600, help="Seconds to wait for the L2VPNs. Default: 600")
+    parser.add_argument("--topology", default="simple3oxps",
+                        help="Topology to build, or '' to use the running one. Default: simple3oxps")
+    parser.add_argument("--output", help="Append the results (JSON lines) to this file")
+    parser.add_argument("--report", metavar="FILE", help="Print the tables of a results file and exit")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.report)
+        return 0
+    kinds = args.kinds.split(",")
+    if set(kinds) - set(KINDS):
+        parser.error(f"--kinds must be among {KINDS}")
+    ports = args.ports.split(",")
+    if len(ports) != 2:
+        parser.error("--ports must name two ports")
+    vlans = None
+    if args.vlans:
+        first, _, last = args.vlans.partition("-")
+        vlans = (int(first), int(last or first))
+    for kind in kinds:
+        result = run(kind, ports, vlans, args.range_size, not args.no_wait, args.timeout, args.topology)
+        line = json.dumps(result, sort_keys=True)
+        print(line)
+        if args.output:
+            with open(args.output, "a") as f:
+                f.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ TESTS=tests/
 #TESTS=tests/test_99_topology_big_changes.py::TestE2ETopologyBigChanges::test_050_del_intra_link_check_topology
 REP=1
 PULL=y
+CHECKPOINT=n
 
 function action_help(){
   test -n "$1" && echo "ERROR: $1"
@@ -14,6 +15,8 @@ function action_help(){
   echo "  -r|--repeat NUMBER    Number of repetitions to be executed. Default: 1"
   echo "  -t|--tests TEST       Test cases to be executed. Default: tests/"
   echo "  --no-pull             Do NOT pull docker images"
+  echo "  --checkpoint          Cold boot only the first repetition and restore a checkpoint"
+  echo "                        of it (see scripts/checkpoint.sh) before the next ones"
   echo "  -h|--help             Show this help message and exit"
   exit 0
 }
@@ -40,6 +43,10 @@ while [[ $# -gt 0 ]]; do
       PULL=n
       shift
       ;;
+    --checkpoint)
+      CHECKPOINT=y
+      shift
+      ;;
     -h|--help)
       action_help
       exit 0
@@ -61,14 +68,21 @@ if [ "$PULL" = "y" ]; then
 fi
 
 for i in $(seq 1 $REP); do
-	docker compose down -v 2>/dev/null
-	docker compose up --pull never -d 2>/dev/null
+	if [ "$CHECKPOINT" = "y" -a $i -gt 1 ]; then
+		./scripts/checkpoint.sh restore clean || exit 1
+	else
+		docker compose down -v 2>/dev/null
+		docker compose up --pull never -d 2>/dev/null
 	
-	#for oxp in ampath tenet sax; do 
-	#	docker compose exec -it $oxp bash -c "apt-get update && apt-get install -y tcpdump; nohup tcpdump -i eth0 -w /captura.pcap & true"
-	#done
+		#for oxp in ampath tenet sax; do 
+		#	docker compose exec -it $oxp bash -c "apt-get update && apt-get install -y tcpdump; nohup tcpdump -i eth0 -w /captura.pcap & true"
+		#done
 	
-	./wait-mininet-ready.sh
+		./wait-mininet-ready.sh
+		if [ "$CHECKPOINT" = "y" ]; then
+			./scripts/checkpoint.sh save clean || exit 1
+		fi
+	fi
 	docker compose exec -it mininet python3 -m pytest $TESTS | tee result-e2e.log
 	
 	for oxp in ampath tenet sax; do
@@ -0,0 +1,67 @@
+#!/bin/bash
+#
+# Run benchmarks/topology_import.py for topologies of increasing size. The
+# stack is brought back to a clean checkpoint (see scripts/checkpoint.sh)
+# before each size, so every run starts with empty OXPs and controller.
+
+SCRIPT_NAME=$0
+SIZES="2 4 8 16 32"
+SHAPE=ring
+OUTPUT=.benchmarks/topology-import-$(date +%Y%m%d-%H%M%S).jsonl
+
+function action_help(){
+  test -n "$1" && echo "ERROR: $1"
+  echo "USAGE: $SCRIPT_NAME [OPTIONS]"
+  echo ""
+  echo "  -s|--sizes \"N N ...\"   Switches per OXP of each run. Default: $SIZES"
+  echo "  --shape SHAPE          Intra-domain shape (ring, mesh, tree, random). Default: $SHAPE"
+  echo "  -o|--output FILE       Results file. Default: .benchmarks/topology-import-<date>.jsonl"
+  echo "  -h|--help              Show this help message and exit"
+  exit 0
+}
+
+while [[ $# -gt 0 ]]; do
+  case $1 in
+    -s|--sizes)
+      test -z "$2" && action_help "missing argument for $1"
+      SIZES=$2
+      shift
+      shift
+      ;;
+    --shape)
+      test -z "$2" && action_help "missing argument for $1"
+      SHAPE=$2
+      shift
+      shift
+      ;;
+    -o|--output)
+      test -z "$2" && action_help "missing argument for $1"
+      OUTPUT=$2
+      shift
+      shift
+      ;;
+    -h|--help)
+      action_help
+      ;;
+    *)
+      action_help "Unknown option provided $1"
+      ;;
+  esac
+done
+
+mkdir -p $(dirname $OUTPUT)
+if ! ./scripts/checkpoint.sh list | grep -q "^clean "; then
+  echo "-> no clean checkpoint: starting a new environment"
+  docker compose down -v 2>/dev/null
+  docker compose up --pull never -d 2>/dev/null
+  ./wait-mininet-ready.sh
+  ./scripts/checkpoint.sh save clean || exit 1
+fi
+
+for size in $SIZES; do
+  echo "-> $size switches per OXP"
+  ./scripts/checkpoint.sh restore clean || exit 1
+  docker compose exec -T mininet python3 -m benchmarks.topology_import --size $size --shape $SHAPE --output $OUTPUT || exit 1
+done
+
+docker compose exec -T mininet python3 -m benchmarks.topology_import --report "$OUTPUT"
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+"""Run the end-to-end tests split across N isolated docker compose stacks.
+
+Each shard gets its own compose project (sdx-e2e-<n>), thus its own network,
+containers and volumes. The test modules are spread across the shards using
+the module durations recorded by previous runs (longest first, each one to
+the least loaded shard), the modules of a shard run in their usual order and
+the pytest results and service logs are collected under .shards/:
+
+    .shards/durations.json      module -> seconds, updated after every run
+    .shards/junit.xml           merged results of all the shards
+    .shards/<n>/result-e2e.log  pytest output of the shard
+    .shards/<n>/*.log           logs of the shard services
+
+Modules are the unit of sharding because the tests of a module depend on
+each other (and test_01 expects a stack where nothing was provisioned yet).
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+BASEDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTDIR = ".shards"
+PROJECT = "sdx-e2e-%d"
+OXPS = ["ampath", "tenet", "sax"]
+DEFAULT_DURATION = 300
+
+
+def compose(shard, *args, **kwargs):
+    cmd = ["docker", "compose", "-p", PROJECT % shard, *args]
+    return subprocess.run(cmd, cwd=BASEDIR, **kwargs)
+
+
+def find_modules(tests):
+    modules = []
+    for path in tests:
+        if os.path.isdir(os.path.join(BASEDIR, path)):
+            pattern = os.path.join(BASEDIR, path, "test_*.py")
+            modules += [os.path.relpath(p, BASEDIR) for p in glob.glob(pattern)]
+        else:
+            modules.append(path)
+    return sorted(set(modules))
+
+
+def load_durations(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def make_shards(modules, durations, count):
+    """Longest processing time first: each module goes to the least loaded shard."""
+    known = [durations[m] for m in modules if m in durations]
+    default = sorted(known)[len(known) // 2] if known else DEFAULT_DURATION
+    weight = {m: durations.get(m, default) for m in modules}
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for module in sorted(modules, key=lambda m: -weight[m]):
+        idx = loads.index(min(loads))
+        shards[idx].append(module)
+        loads[idx] += weight[module]
+    return [(sorted(shard), load) for shard, load in zip(shards, loads) if shard]
+
+
+def wait_mininet_ready(shard, timeout=900):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        logs = compose(shard, "logs", "mininet", "-n", "1", capture_output=True, text=True)
+        if "tail -f /dev/null" in logs.stdout:
+            return
+        time.sleep(2)
+    raise Exception(f"Timeout waiting mininet of shard {shard} to be ready")
+
+
+def collect_logs(shard, outdir):
+    for oxp in OXPS:
+        compose(shard, "cp", f"{oxp}:/var/log/syslog", f"{outdir}/{oxp}.log", capture_output=True)
+        with open(f"{outdir}/{oxp}-lc.log", "w") as f:
+            compose(shard, "logs", f"{oxp}-lc", "-t", stdout=f, stderr=subprocess.STDOUT)
+    with open(f"{outdir}/sdx-controller.log", "w") as f:
+        compose(shard, "logs", "sdx-controller", "-t", stdout=f, stderr=subprocess.STDOUT)
+
+
+def run_shard(shard, modules, keep=False):
+    outdir = os.path.join(BASEDIR, OUTDIR, str(shard))
+    os.makedirs(outdir, exist_ok=True)
+    if os.path.exists(f"{outdir}/junit.xml"):
+        os.remove(f"{outdir}/junit.xml")
+    start = time.monotonic()
+    returncode = 1
+    compose(shard, "down", "-v", capture_output=True)
+    try:
+        compose(shard, "up", "--pull", "never", "-d", capture_output=True, check=True)
+        wait_mininet_ready(shard)
+        print(f"shard {shard}: running {' '.join(modules)}", flush=True)
+        with open(f"{outdir}/result-e2e.log", "w") as f:
+            # the repo is bind mounted in the mininet container, so the
+            # junit file shows up in outdir
+            returncode = compose(
+                shard, "exec", "-T", "mininet", "python3", "-m", "pytest",
+                "-p", "no:cacheprovider",
+                f"--junitxml={OUTDIR}/{shard}/junit.xml",
+                *modules,
+                stdout=f, stderr=subprocess.STDOUT,
+            ).returncode
+        collect_logs(shard, outdir)
+    except Exception as exc:
+        print(f"shard {shard}: {exc}", flush=True)
+    finally:
+        if not keep:
+            compose(shard, "down", "-v", capture_output=True)
+    elapsed = time.monotonic() - start
+    print(f"shard {shard}: exit code {returncode} after {elapsed:.0f}s", flush=True)
+    return returncode
+
+
+def module_of(testcase):
+    """tests.test_05_l2vpn.TestE2EL2VPN -> tests/test_05_l2vpn.py"""
+    parts = testcase.get("classname", "").split(".")
+    while parts and not parts[-1].startswith("test_"):
+        parts.pop()
+    return "/".join(parts) + ".py" if parts else None
+
+
+def merge_results(shards, durations):
+    merged = ET.Element("testsuites")
+    for shard, _ in enumerate(shards):
+        path = os.path.join(BASEDIR, OUTDIR, str(shard), "junit.xml")
+        try:
+            root = ET.parse(path).getroot()
+        except (OSError, ET.ParseError):
+            print(f"shard {shard}: no junit results found at {path}")
+            continue
+        suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+        spent = {}
+        for suite in suites:
+            suite.set("name", f"{suite.get('name', 'pytest')}-shard{shard}")
+            merged.append(suite)
+            for testcase in suite.iter("testcase"):
+                module = module_of(testcase)
+                if module:
+                    spent[module] = spent.get(module, 0) + float(testcase.get("time", 0))
+        durations.update(spent)
+    for attr in ["tests", "failures", "errors", "skipped"]:
+        merged.set(attr, str(sum(int(s.get(attr, 0)) for s in merged)))
+    ET.ElementTree(merged).write(os.path.join(BASEDIR, OUTDIR, "junit.xml"))
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--shards", type=int, default=2, help="Number of stacks. Default: 2")
+    parser.add_argument("-t", "--tests", nargs="+", default=["tests/"], help="Test modules or directories. Default: tests/")
+    parser.add_argument("--no-pull", action="store_true", help="Do NOT pull docker images")
+    parser.add_argument("--keep", action="store_true", help="Do NOT remove the stacks at the end")
+    args = parser.parse_args()
+
+    durations_file = os.path.join(BASEDIR, OUTDIR, "durations.json")
+    durations = load_durations(durations_file)
+    shards = make_shards(find_modules(args.tests), durations, args.shards)
+    for shard, (modules, load) in enumerate(shards):
+        print(f"shard {shard} (~{load:.0f}s): {' '.join(modules)}")
+
+    if not args.no_pull:
+        subprocess.run(["docker", "compose", "pull"], cwd=BASEDIR, check=True)
+
+    with ThreadPoolExecutor(len(shards)) as pool:
+        codes = list(pool.map(lambda s: run_shard(s[0], s[1][0], args.keep), enumerate(shards)))
+
+    merged = merge_results(shards, durations)
+    with open(durations_file, "w") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+    print(
+        "tests={tests} failures={failures} errors={errors} skipped={skipped}".format(**merged.attrib)
+    )
+    return max(codes, default=0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,17 @@
+import sys
+
 from tests.helpers import NetworkTest
+from tests.topologies.common import parse_params
+
+# usage: python3 start-mn.py [TOPO_NAME [key=value,...]]
+topo_name = sys.argv[1] if len(sys.argv) > 1 else "simple3oxps"
+topo_params = parse_params(sys.argv[2]) if len(sys.argv) > 2 else None
 
 with open("/tmp/status", "w") as f:
     f.write("starting")
 print("* Creating network and instantiating nodes...")
-net = NetworkTest(["ampath", "sax", "tenet"])
+net = NetworkTest(["ampath", "sax", "tenet"], topo_name, topo_params)
+print("* Built in " + ", ".join(f"{name} {duration:.2f}s" for name, duration in net.build_times.items()))
 print("* Waiting switches to connect...")
 net.wait_switches_connect()
 print("* Running topology setup...")
@@ -0,0 +1,236 @@
+"""Flap links at a given rate and measure how the status changes propagate.
+
+Each flapped link goes down then up again every 1/rate seconds, staying
+down for `duty` of the period (links are staggered over the period), for
+`duration` seconds, and is left up at the end. Meanwhile the status of the
+ports of the links is polled on each hop of the pipeline:
+
+- kytos       the topology exported by the OXP (/api/kytos/sdx/topology/2.0.0)
+- lc          the topology the SDX-LC received (best effort, if reachable)
+- controller  the aggregate topology of the SDX-Controller
+
+Each status change seen on a hop is matched, in order, to the injected
+change of that port it reflects: the difference is its convergence time.
+Injected changes skipped on a hop are missed (flaps faster than the
+pipeline, or than the polling, are coalesced) and changes back to an older
+state are out of order. Once the flapping stops, the time until each hop shows every
+port up again is the time to steady state.
+
+Usage:
+
+    churn = net.flap_links([("Ampath1", "Ampath2"), ("Sax01", "Tenet01")], rate=0.5, duration=60)
+    result = churn.result()
+"""
+import logging
+import threading
+import time
+
+from tests.stats import summary
+from tests.topo_watcher import get_lc_topology
+from tests.topologies.converter import port_id
+from tests.waiters import get_kytos_sdx_topology, get_topology, topology_ports
+
+logger = logging.getLogger(__name__)
+
+HOPS = ["kytos", "lc", "controller"]
+
+
+def find_link(net, node1, node2):
+    for link in net.links:
+        if {link.intf1.node.name, link.intf2.node.name} == {node1, node2}:
+            return link
+    raise ValueError(f"No link between {node1} and {node2}")
+
+
+def schedule(links, rate, duty, duration):
+    """Return the (time, link index, status) changes of the flaps, by time."""
+    period = 1 / rate
+    events = []
+    for i in range(len(links)):
+        start = i * period / len(links)
+        while start < duration:
+            events.append((start, i, "down"))
+            events.append((min(start + duty * period, duration), i, "up"))
+            start += period
+    return sorted(events)
+
+
+def match(injected, observed):
+    """Match the observed status changes of a port to the injected ones.
+
+    The changes of a port reach each hop in order, and a hop coalescing
+    flaps shows the latest of them, so an observed change is matched to the
+    latest injected change with the same status made before it and after
+    the previous match. The injected changes skipped over are missed.
+    Returns the convergence time of each matched change, the missed
+    injected changes and the out of order observed changes.
+    """
+    latencies, out_of_order = [], []
+    matched = set()
+    last = -1
+    for seen_at, status in observed:
+        j = next(
+            (
+                j for j in reversed(range(last + 1, len(injected)))
+                if injected[j][0] <= seen_at and injected[j][1] == status
+            ),
+            None,
+        )
+        if j is None:
+            out_of_order.append((seen_at, status))
+            continue
+        latencies.append(seen_at - injected[j][0])
+        matched.add(j)
+        last = j
+    missed = [change for j, change in enumerate(injected) if j not in matched]
+    return latencies, missed, out_of_order
+
+
+class LinkChurn:
+    """Flap Mininet links and record the port status changes on each hop."""
+
+    def __init__(self, net, links, rate=1, duty=0.5, duration=30, interval=0.1, settle_timeout=300):
+        self.net = net
+        self.links = [find_link(net, *link) for link in links]
+        self.names = [f"{node1}-{node2}" for node1, node2 in links]
+        self.rate = rate
+        self.duty = duty
+        self.duration = duration
+        self.interval = interval
+        self.settle_timeout = settle_timeout
+        # port id -> (OXP, index of its link)
+        self.ports = {}
+        for i, link in enumerate(self.links):
+            for intf in (link.intf1, link.intf2):
+                self.ports[port_id(intf.node, intf)] = (intf.node.params["oxp"], i)
+        self.oxps = sorted({oxp for oxp, _ in self.ports.values()})
+        self.injected = {port: [] for port in self.ports}
+        self.observed = {(hop, port): [] for hop in HOPS for port in self.ports}
+        self.late = []
+        self.started = None
+        self.stopped_at = None
+        self.steady = {}
+        self.views = {}
+        self.stopped = threading.Event()
+
+    def _fetch(self, hop, oxp=None):
+        try:
+            if hop == "kytos":
+                return topology_ports(get_kytos_sdx_topology(oxp))
+            if hop == "lc":
+                return topology_ports(get_lc_topology(oxp))
+            return topology_ports(get_topology())
+        except Exception as exc:
+            logger.debug("%s %s not available: %s", hop, oxp or "", exc)
+            return None
+
+    def _poll_once(self):
+        views, seen_at = {}, {}
+        for hop in HOPS:
+            for oxp in [None] if hop == "controller" else self.oxps:
+                views[(hop, oxp)] = self._fetch(hop, oxp)
+                seen_at[(hop, oxp)] = time.monotonic()
+        for port, (oxp, _) in self.ports.items():
+            for hop in HOPS:
+                key = (hop, None if hop == "controller" else oxp)
+                view = views[key]
+                if view is None or port not in view:
+                    continue
+                changes = self.observed[(hop, port)]
+                status = view[port]["status"]
+                if (changes[-1][1] if changes else "up") != status:
+                    changes.append((seen_at[key], status))
+        return views
+
+    def _observe(self):
+        while not self.stopped.is_set():
+            start = time.monotonic()
+            views = self.views = self._poll_once()
+            if self.stopped_at is not None:
+                for hop in self._steady(views) - set(self.steady):
+                    self.steady[hop] = time.monotonic() - self.stopped_at
+            self.stopped.wait(max(self.interval - (time.monotonic() - start), 0))
+
+    def _steady(self, views):
+        """Return the hops that show every port up."""
+        steady = set()
+        for hop in HOPS:
+            ok = True
+            for port, (oxp, _) in self.ports.items():
+                view = views[(hop, None if hop == "controller" else oxp)]
+                if view is None:
+                    ok = hop == "lc" and ok
+                    continue
+                ok = ok and view.get(port, {}).get("status") == "up"
+            if ok:
+                steady.add(hop)
+        return steady
+
+    def run(self):
+        events = schedule(self.links, self.rate, self.duty, self.duration)
+        observer = threading.Thread(target=self._observe, daemon=True)
+        self.started = time.monotonic()
+        observer.start()
+        try:
+            for at, i, status in events:
+                delay = self.started + at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -self.interval:
+                    self.late.append(-delay)
+                link = self.links[i]
+                self.net.configLinkStatus(link.intf1.node.name, link.intf2.node.name, status)
+                injected_at = time.monotonic()
+                for intf in (link.intf1, link.intf2):
+                    self.injected[port_id(intf.node, intf)].append((injected_at, status))
+        finally:
+            self.stopped_at = time.monotonic()
+            # make sure the links are left up, even after an error
+            for link in self.links:
+                self.net.configLinkStatus(link.intf1.node.name, link.intf2.node.name, "up")
+        deadline = self.stopped_at + self.settle_timeout
+        while len(self.steady) < len(HOPS) and time.monotonic() < deadline:
+            time.sleep(self.interval)
+        self.stopped.set()
+        observer.join()
+        return self
+
+    def result(self):
+        hops = {}
+        for hop in HOPS:
+            latencies, missed, out_of_order = [], 0, 0
+            per_link = {name: [] for name in self.names}
+            seen = False
+            for port, (_, i) in self.ports.items():
+                observed = self.observed[(hop, port)]
+                seen = seen or bool(observed)
+                lat, miss, ooo = match(self.injected[port], observed)
+                latencies += lat
+                per_link[self.names[i]] += lat
+                missed += len(miss)
+                out_of_order += len(ooo)
+            if hop == "lc" and not seen:
+                # the SDX-LC API is optional
+                continue
+            final = [
+                port for port, (oxp, _) in self.ports.items()
+                if (self.views.get((hop, None if hop == "controller" else oxp)) or {}).get(port, {}).get("status") != "up"
+            ]
+            hops[hop] = {
+                "convergence_s": summary(latencies),
+                "per_link_s": {name: summary(values) for name, values in per_link.items()},
+                "missed": missed,
+                "out_of_order": out_of_order,
+                "steady_s": self.steady.get(hop),
+                "not_up": final,
+            }
+        return {
+            "links": self.names,
+            "rate": self.rate,
+            "duty": self.duty,
+            "duration": self.duration,
+            "transitions": sum(len(changes) for changes in self.injected.values()) // 2,
+            "late_injections": len(self.late),
+            "steady": len(self.steady) == len(HOPS),
+            "hops": hops,
+        }
@@ -1,6 +1,154 @@
+import json
+import os
+
 import pytest
 from datetime import datetime
 
+from tests.helpers import NetworkPool
+from tests.l2vpn_tracer import PROVISIONING_TRACES, L2VPNTracer, format_trace
+from tests.leases import Lease, LeaseManager
+from tests.topo_watcher import PROPAGATION_LAGS, format_lag
+from tests.waiters import wait_topology
+
+# pytest-xdist worker running this session, if any
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--trace-l2vpn",
+        action="store_true",
+        help="record the provisioning stages of every L2VPN created by the tests",
+    )
+    parser.addoption(
+        "--trace-l2vpn-output",
+        metavar="FILE",
+        help="with --trace-l2vpn, append the traces (JSON lines) to FILE",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "fresh_network(setup=True, per_test=False): build a dedicated Mininet "
+        "network for the test class (or for each test, with per_test=True) "
+        "instead of using the shared one; setup=False skips setup_topo",
+    )
+    config.addinivalue_line(
+        "markers",
+        "lease(ports=(), vlans=None, exclusive=False): UNI ports and VLAN range "
+        "(inclusive) the test provisions L2VPNs on, see tests/leases.py",
+    )
+    config.addinivalue_line(
+        "markers",
+        "api_only: the test class only uses the SDX-Controller/Kytos APIs, so "
+        "with pytest-xdist it can run on a worker without the Mininet network",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """With pytest-xdist, run every test needing Mininet on the same worker.
+
+    Only one Mininet network can exist in the mininet container, so those
+    tests form a single xdist group (use --dist loadgroup), while the
+    api_only classes are spread across the other workers.
+    """
+    if XDIST_WORKER is None:
+        return
+    for item in items:
+        if item.get_closest_marker("api_only") is None:
+            item.add_marker(pytest.mark.xdist_group("mininet"))
+
+
+@pytest.fixture(scope="session")
+def lease_manager():
+    return LeaseManager()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def l2vpn_tracer(request):
+    """With --trace-l2vpn, trace the provisioning of the L2VPNs, see tests/l2vpn_tracer.py."""
+    if not request.config.getoption("--trace-l2vpn"):
+        yield None
+        return
+    tracer = L2VPNTracer(discover=True).start()
+    yield tracer
+    traces = tracer.stop()
+    output = request.config.getoption("--trace-l2vpn-output")
+    if output:
+        with open(output, "a") as f:
+            for trace in traces:
+                f.write(json.dumps(trace, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def network_pool():
+    pool = NetworkPool()
+    yield pool
+    pool.discard()
+
+
+def _acquire(request, network_pool, lease_manager, marker):
+    kwargs = marker.kwargs if marker else {}
+    # building or resetting the network affects every test running
+    lease = lease_manager.acquire(Lease(exclusive=True))
+    try:
+        net = network_pool.acquire(fresh=marker is not None, setup=kwargs.get("setup", True))
+    finally:
+        lease_manager.release(lease)
+    request.cls.net = net
+    return net
+
+
+@pytest.fixture(scope="class", autouse=True)
+def network(request, network_pool, lease_manager):
+    """Provide the Mininet network as `net` to the test classes."""
+    marker = request.node.get_closest_marker("fresh_network")
+    if request.cls is None or (marker and marker.kwargs.get("per_test")):
+        yield None
+        return
+    if XDIST_WORKER is not None and request.node.get_closest_marker("api_only"):
+        # the network is set up by the worker running the mininet group
+        wait_topology(lambda topo: topo["links"], timeout=1800, desc="topology to be set up")
+        yield None
+        return
+    net = _acquire(request, network_pool, lease_manager, marker)
+    yield net
+    network_pool.release(net)
+
+
+@pytest.fixture(autouse=True)
+def network_per_test(request, network_pool, lease_manager):
+    marker = request.node.get_closest_marker("fresh_network")
+    if request.cls is None or not (marker and marker.kwargs.get("per_test")):
+        yield None
+        return
+    net = _acquire(request, network_pool, lease_manager, marker)
+    yield net
+    network_pool.release(net)
+
+
+@pytest.fixture(autouse=True)
+def lease(request, lease_manager, network_per_test):
+    """Hold the resources declared by the lease marker while the test runs.
+
+    The L2VPNs inside the lease are removed before and after the test. Tests
+    without the marker hold an exclusive lease and keep managing their
+    L2VPNs themselves (e.g. test_05 builds on the L2VPNs of previous tests).
+    """
+    marker = request.node.get_closest_marker("lease")
+    lease = Lease.from_marker(marker)
+    lease_manager.acquire(lease)
+    try:
+        if marker:
+            lease.cleanup()
+        yield lease
+        if marker:
+            lease.cleanup()
+    finally:
+        lease_manager.release(lease)
+
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -29,3 +177,13 @@ def pytest_terminal_summary(terminalreporter):
                 start = datetime.fromtimestamp(report.start)
                 stop = datetime.fromtimestamp(report.stop)
                 terminalreporter.write_line('{id:20}: {start:%Y-%m-%d,%H:%M:%S.%f} - {stop:%Y-%m-%d,%H:%M:%S.%f}'.format(id=report.nodeid, start=start, stop=stop))
+
+    if PROPAGATION_LAGS:
+        terminalreporter.section('topology propagation lag', sep='-', bold=True)
+        for hops in PROPAGATION_LAGS:
+            terminalreporter.write_line(format_lag(hops))
+
+    if PROVISIONING_TRACES:
+        terminalreporter.section('L2VPN provisioning stages', sep='-', bold=True)
+        for trace in PROVISIONING_TRACES:
+            terminalreporter.write_line(format_trace(trace))
@@ -5,16 +5,41 @@ import requests
 import importlib
 import socket
 
+from tests.churn import LinkChurn
+from tests.topo_watcher import domain_view
+from tests.topologies.common import PORT_SPEEDS, shape_intf
+from tests.topologies.converter import port_id
+from tests.waiters import (
+    API_URL,
+    KYTOS_API,
+    KYTOS_SDX_API,
+    OXPS,
+    get_json,
+    get_kytos_sdx_topology,
+    get_l2vpns,
+    get_topology,
+    topology_ports,
+    wait_l2vpns_removed,
+    wait_l2vpns_settled,
+    wait_topology,
+    wait_topology_up,
+    wait_until,
+)
+
 class NetworkTest:
     def __init__(
         self,
         controllers,
         topo_name="simple3oxps",
+        topo_params=None,
     ):
+        self.controllers = list(controllers)
         self.controllers_ip = []
         for ctl in controllers:
             self.controllers_ip.append(socket.gethostbyname(ctl))
+        start = time.monotonic()
         mininet.clean.cleanup()
+        self.build_times = {"cleanup": time.monotonic() - start}
         try:
             module = importlib.import_module(f"tests.topologies.{topo_name}")
             create_topo = getattr(module, "create_topo")
@@ -24,13 +49,26 @@ class NetworkTest:
             raise ValueError(
                 f"Invalid topology: {topo_name}. Check test/topologies/"
             )
-        self.net = create_topo(*self.controllers_ip)
+        start = time.monotonic()
+        self.net = create_topo(*self.controllers_ip, **(topo_params or {}))
+        # topologies built by build_net() report the duration of each phase
+        self.build_times.update(getattr(self.net, "build_times", {"create_topo": time.monotonic() - start}))
         self.setup_topo = setup_topo
-        self.get_converted_topologies = get_converted_topologies
+        self._get_converted_topologies = get_converted_topologies
+        self.controllers_config = {
+            sw.name: sw.cmd(f"ovs-vsctl get-controller {sw.name}").split()
+            for sw in self.net.switches
+        }
+        self.baseline = {}
+        self.mutated_oxps = set()
+
+    def get_converted_topologies(self):
+        """Return the SDX 2.0.0 topology each OXP is expected to export."""
+        return self._get_converted_topologies(self.net)
 
     def run_setup_topo(self):
         try:
-            self.setup_topo(*self.controllers_ip)
+            self.setup_topo(*self.controllers_ip, net=self.net)
         except Exception as exc:
             self.stop()
             mininet.clean.cleanup()
@@ -53,6 +91,31 @@ class NetworkTest:
                 "up"
             )
 
+    def flap_links(self, links, rate=1, duty=0.5, duration=30, **kwargs):
+        """Flap the links between the (node1, node2) pairs, see tests/churn.py."""
+        return LinkChurn(self.net, links, rate, duty, duration, **kwargs).run()
+
+    def shape_links(self, scale=1000):
+        """Limit the links between switches to the capacity of their port type.
+
+        The type of the ports (10GE, ...) is read from the SDX-Controller
+        topology and the capacities are divided by `scale` (10GE is 10 Mbit/s
+        by default), so that the software data plane can fill them. Returns
+        the rate (Mbit/s) of each link.
+        """
+        ports = topology_ports(get_topology())
+        rates = {}
+        for link in self.net.links:
+            intfs = (link.intf1, link.intf2)
+            if not all(intf.node in self.net.switches for intf in intfs):
+                continue
+            types = [ports.get(port_id(intf.node, intf), {}).get("type") for intf in intfs]
+            mbps = min(PORT_SPEEDS.get(port_type, PORT_SPEEDS["10GE"]) for port_type in types) / scale
+            for intf in intfs:
+                shape_intf(intf, mbps)
+            rates[f"{link.intf1.node.name}-{link.intf2.node.name}"] = mbps
+        return rates
+
     def config_all_ports_up(self):
         for sw in self.net.switches:
             for intf in sw.intfNames():
@@ -67,4 +130,206 @@ class NetworkTest:
         config = node.cmd('ovs-vsctl get-controller', node.name).split()
         node.cmd(f"ovs-vsctl set-controller {node.name} {target}")
         node.cmd(f"ovs-vsctl get-controller {node.name}") 
-        return " ".join(config)
\ No newline at end of file
+        return " ".join(config)
+
+    def restore_controllers(self):
+        """Point every switch back to the controllers it had when created."""
+        changed = False
+        for sw in self.net.switches:
+            target = self.controllers_config[sw.name]
+            if sw.cmd(f"ovs-vsctl get-controller {sw.name}").split() != target:
+                sw.cmd(f"ovs-vsctl set-controller {sw.name} {' '.join(target)}")
+                changed = True
+        if changed:
+            self.wait_switches_connect()
+
+    def host_port(self, host):
+        """Return the SDX port id of the switch port a Mininet host is attached to."""
+        for link in self.net.links:
+            for intf, other in ((link.intf1, link.intf2), (link.intf2, link.intf1)):
+                if intf.node is host:
+                    return port_id(other.node, other)
+        raise ValueError(f"Host {host.name} is not attached to a switch")
+
+    def add_host_vlan(self, host, vlan, n):
+        """Add the sub-interface vlan<vlan> to a host, return its address.
+
+        The address is 10.<vlan / 256>.<vlan % 256>.<n>/24, so that the hosts
+        of an L2VPN on that VLAN (n = 1, 2, ...) share a subnet.
+        """
+        address = f"10.{vlan // 256}.{vlan % 256}.{n}"
+        host.cmd(f"ip link add link {host.intfNames()[0]} name vlan{vlan} type vlan id {vlan}")
+        host.cmd(f"ip link set up vlan{vlan}")
+        host.cmd(f"ip addr add {address}/24 dev vlan{vlan}")
+        return address
+
+    def remove_host_vlan(self, host, vlan):
+        """Delete the sub-interface added by add_host_vlan()."""
+        host.cmd(f"ip link del vlan{vlan}")
+
+    def remove_host_vlans(self):
+        """Delete the VLAN sub-interfaces created on the hosts by the tests."""
+        for host in self.net.hosts:
+            for line in host.cmd("ip -o link show type vlan").splitlines():
+                fields = line.split(":")
+                if len(fields) < 2:
+                    continue
+                host.cmd(f"ip link del {fields[1].strip().split('@')[0]}")
+
+    def kytos_state(self, oxp):
+        """Return the switches, interfaces and links of an OXP as seen by Kytos."""
+        topo_api = f"{KYTOS_API % oxp}/topology/v3"
+        switches = get_json(f"{topo_api}/switches")["switches"]
+        interfaces = {
+            intf_id: intf
+            for switch in switches.values()
+            for intf_id, intf in switch["interfaces"].items()
+        }
+        links = get_json(f"{topo_api}/links")["links"]
+        return {"switches": switches, "interfaces": interfaces, "links": links}
+
+    def snapshot(self):
+        """Record the Kytos state of every OXP as the baseline to restore to."""
+        self.baseline = {oxp: self.kytos_state(oxp) for oxp in self.controllers}
+        self.mutated_oxps = set()
+
+    def kytos_request(self, oxp, method, path, **kwargs):
+        """Change the topology of an OXP through its Kytos API.
+
+        The OXP is recorded as mutated, so that restore_topology() only has
+        to diff and re-push the OXPs a test actually touched.
+        """
+        self.mutated_oxps.add(oxp)
+        return requests.request(method, f"{KYTOS_API % oxp}/topology/v3/{path}", **kwargs)
+
+    def _restore_metadata(self, topo_api, kind, obj_id, expected, current, prune=True):
+        for key in set(current) - set(expected) if prune else ():
+            response = requests.delete(f"{topo_api}/{kind}/{obj_id}/metadata/{key}")
+            assert response.ok, response.text
+        changed = {k: v for k, v in expected.items() if current.get(k) != v}
+        if changed:
+            response = requests.post(f"{topo_api}/{kind}/{obj_id}/metadata", json=changed)
+            assert response.ok, response.text
+
+    def _restore_objects(self, topo_api, kind, baseline, current, prune=True):
+        for obj_id, expected in baseline.items():
+            obj = current[obj_id]
+            if expected["enabled"] and not obj["enabled"]:
+                response = requests.post(f"{topo_api}/{kind}/{obj_id}/enable")
+                assert response.ok, response.text
+            self._restore_metadata(
+                topo_api, kind, obj_id, expected["metadata"], obj["metadata"], prune
+            )
+
+    def restore_oxp(self, oxp):
+        """Undo the changes made to an OXP by diffing it against the baseline."""
+        baseline = self.baseline[oxp]
+        topo_api = f"{KYTOS_API % oxp}/topology/v3"
+
+        # interfaces deleted from Kytos are learned again on a port status change
+        current = self.kytos_state(oxp)
+        missing = set(baseline["interfaces"]) - set(current["interfaces"])
+        for intf_id in missing:
+            name = baseline["interfaces"][intf_id]["name"]
+            node = self.net.get(name.split("-")[0])
+            node.cmd(f"ip link set {name} down")
+            node.cmd(f"ip link set {name} up")
+        if missing:
+            wait_until(
+                lambda: self.kytos_state(oxp)["interfaces"],
+                lambda interfaces: missing <= set(interfaces),
+                desc=f"{oxp} to learn interfaces {missing} again",
+            )
+            current = self.kytos_state(oxp)
+        self._restore_objects(topo_api, "switches", baseline["switches"], current["switches"])
+        self._restore_objects(topo_api, "interfaces", baseline["interfaces"], current["interfaces"])
+
+        # links deleted from Kytos are discovered again through LLDP
+        current = wait_until(
+            lambda: self.kytos_state(oxp),
+            lambda state: set(baseline["links"]) <= set(state["links"]),
+            desc=f"{oxp} to discover links {set(baseline['links'])}",
+        )
+        # Kytos keeps its own bookkeeping in the link metadata, so extra keys stay
+        self._restore_objects(topo_api, "links", baseline["links"], current["links"], prune=False)
+
+        # re-push the topology and wait for the SDX-Controller to converge on it
+        response = requests.post(f"{KYTOS_SDX_API % oxp}/topology/2.0.0")
+        assert response.ok, response.text
+        oxp_topology = get_kytos_sdx_topology(oxp)
+        domain = oxp_topology["id"].split(":")[-1]
+        expected = domain_view(oxp_topology, domain)
+        wait_topology(
+            lambda topo: domain_view(topo, domain) == expected,
+            desc=f"SDX-Controller to converge on the {oxp} topology",
+        )
+
+    def restore_topology(self):
+        """Undo the topology mutations recorded since the last snapshot."""
+        self.config_all_links_up()
+        self.config_all_ports_up()
+        for oxp in sorted(self.mutated_oxps):
+            self.restore_oxp(oxp)
+        self.mutated_oxps = set()
+
+    def reset(self):
+        """Bring the network back to the state right after setup_topo."""
+        wait_l2vpns_settled(raise_on_timeout=False)
+        for service_id in get_l2vpns():
+            response = requests.delete(f"{API_URL}/{service_id}")
+            assert response.status_code == 200, response.text
+        wait_l2vpns_removed()
+        self.restore_controllers()
+        self.restore_topology()
+        self.remove_host_vlans()
+        wait_topology_up()
+
+
+class NetworkPool:
+    """Share a single Mininet network across the test classes.
+
+    Building a NetworkTest (mininet cleanup, OVS bridges, controller attach
+    and setup_topo) is the biggest fixed cost of a test class, so the same
+    network is reused and reset between classes. Only one Mininet network
+    can exist at a time (NetworkTest cleans up any previous one), so
+    acquiring a fresh network discards the shared one, which is rebuilt the
+    next time it is needed.
+    """
+
+    def __init__(self, controllers=OXPS, topo_name="simple3oxps", topo_params=None):
+        self.controllers = controllers
+        self.topo_name = topo_name
+        self.topo_params = topo_params
+        self.shared = None
+
+    def _build(self, setup=True):
+        net = NetworkTest(self.controllers, self.topo_name, self.topo_params)
+        net.wait_switches_connect()
+        if setup:
+            net.run_setup_topo()
+            wait_topology_up()
+            net.snapshot()
+        return net
+
+    def acquire(self, fresh=False, setup=True):
+        if fresh:
+            self.discard()
+            return self._build(setup)
+        if self.shared is not None:
+            try:
+                self.shared.reset()
+                return self.shared
+            except Exception:
+                # a network that cannot be reset is rebuilt from scratch
+                self.discard()
+        self.shared = self._build()
+        return self.shared
+
+    def release(self, net):
+        if net is not self.shared:
+            net.stop()
+
+    def discard(self):
+        if self.shared is not None:
+            self.shared.stop()
+            self.shared = None
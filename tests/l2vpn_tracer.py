@@ -0,0 +1,363 @@
+"""Timestamp each stage of the provisioning of L2VPNs, per OXP.
+
+An L2VPN goes through the SDX-Controller (POST accepted), the RabbitMQ
+`connection` messages to the SDX-LCs, the SDX-LC requests to the Kytos sdx
+napp (OXP_CONNECTION_URL), the mef_eline EVCs, the OpenFlow flows in OVS
+and finally the data plane. The tracer correlates what it can observe from
+the mininet container:
+
+- accepted      POST answered (or, for discovered L2VPNs, first listed)
+- queued/<oxp>  connection message published to the OXP's SDX-LC, from the
+                RabbitMQ firehose (`docker compose exec mq1 rabbitmqctl
+                trace_on`, skipped if not enabled)
+- evc_created/<oxp>  creation_time of the EVC in Kytos: the SDX-LC request
+                reached the OXP
+- evc_seen/<oxp>, evc_active/<oxp>  EVC listed / active in mef_eline
+- flows/<oxp>   flows with the EVC cookie installed in OVS
+- up            L2VPN status up on the SDX-Controller
+- ping          first successful ping: wait_ping() over the host VLAN
+                interface of an L2VPN endpoint (on_ping()), or mark()
+
+Container logs (`docker compose logs --timestamps`) can be merged with
+merge_logs(). EVCs are matched to L2VPNs by name, or else to the oldest
+traced L2VPN without an EVC on that OXP, so stages are exact when L2VPNs
+are provisioned one at a time. Traces of L2VPNs that left the list are
+retired: they are no longer matched nor polled.
+
+Usage:
+
+    tracer = L2VPNTracer()
+    tracer.start()
+    service_id = tracer.post(payload)
+    ...
+    trace = tracer.wait(service_id)
+    tracer.stop()
+"""
+import json
+import logging
+import re
+import shutil
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from tests.topologies.converter import oxp_info, port_id, read_env
+from tests.waiters import (
+    API_URL,
+    DEFAULT_TIMEOUT,
+    OXPS,
+    PING_LISTENERS,
+    get_evcs,
+    get_l2vpns,
+    wait_until,
+)
+
+logger = logging.getLogger(__name__)
+
+# provisioning traces recorded during the test session, reported by conftest
+PROVISIONING_TRACES = []
+
+DOMAIN_RE = re.compile(r"urn:sdx:port:([^:\"]+):")
+DEV_RE = re.compile(r"\bdev (\S+)")
+LINK_RE = re.compile(r"^\d+: ([^:@\s]+)(?:@([^:\s]+))?:")
+VLAN_ID_RE = re.compile(r"\bvlan protocol \S+ id (\d+)")
+LOG_RE = re.compile(r"^(?P<container>\S+)\s+\|\s+(?P<time>\d{4}-\d\d-\d\dT[\d:.]+Z?)\s(?P<line>.*)$")
+
+
+def parse_time(value):
+    """Parse an ISO timestamp (naive ones are UTC) into a POSIX time."""
+    value = value.rstrip("Z")
+    if "." in value:
+        # python < 3.11 only parses up to microseconds
+        head, _, frac = value.partition(".")
+        value = f"{head}.{frac[:6]}"
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class Trace:
+    """The stages of one L2VPN, as POSIX times."""
+
+    def __init__(self, service_id, name=None, posted_at=None):
+        self.service_id = service_id
+        self.name = name
+        self.start = posted_at or time.time()
+        self.stages = {}
+        self.evcs = {}  # oxp -> EVC id
+        self.endpoints = []  # as listed by the SDX-Controller
+        self.status = None
+
+    def mark(self, stage, at=None):
+        """Record a stage, keeping the first time it was seen."""
+        self.stages.setdefault(stage, at or time.time())
+
+    def offsets(self):
+        """Return the time of each stage since the POST, in seconds, by time."""
+        return dict(sorted(
+            ((stage, at - self.start) for stage, at in self.stages.items()),
+            key=lambda item: item[1],
+        ))
+
+    def to_dict(self):
+        return {
+            "service_id": self.service_id,
+            "name": self.name,
+            "start": self.start,
+            "evcs": self.evcs,
+            "stages_s": self.offsets(),
+        }
+
+
+def format_trace(trace):
+    stages = " ".join(f"{stage}=+{offset:.2f}s" for stage, offset in trace["stages_s"].items())
+    return f"{trace['service_id']}: {stages}"
+
+
+class L2VPNTracer:
+    """Poll the SDX-Controller, Kytos, OVS and RabbitMQ for the traced L2VPNs.
+
+    With discover=True, every L2VPN created while the tracer runs is traced.
+    """
+
+    def __init__(self, oxps=OXPS, discover=False, interval=0.2):
+        self.oxps = list(oxps)
+        self.discover = discover
+        self.interval = interval
+        self.domains = {oxp_info(oxp)["domain"]: oxp for oxp in self.oxps}
+        self.traces = {}
+        self.retired = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.threads = []
+        self.known_l2vpns = set()
+        self.known_evcs = {}
+        self.bridges = None
+
+    def start(self):
+        self.known_l2vpns = set(get_l2vpns())
+        self.known_evcs = {oxp: set(get_evcs(oxp)) for oxp in self.oxps}
+        self.threads = [threading.Thread(target=self._poll, daemon=True)]
+        self.threads.append(threading.Thread(target=self._firehose, daemon=True))
+        for thread in self.threads:
+            thread.start()
+        PING_LISTENERS.append(self.on_ping)
+        return self
+
+    def stop(self):
+        if self.on_ping in PING_LISTENERS:
+            PING_LISTENERS.remove(self.on_ping)
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join(timeout=10)
+        traces = [trace.to_dict() for trace in [*self.retired.values(), *self.traces.values()]]
+        PROVISIONING_TRACES.extend(traces)
+        return traces
+
+    def trace(self, service_id, name=None, posted_at=None, accepted_at=None):
+        with self.lock:
+            trace = self.traces.setdefault(service_id, Trace(service_id, name, posted_at))
+            trace.mark("accepted", accepted_at)
+        return trace
+
+    def post(self, payload):
+        """Create an L2VPN and trace it, return its service_id."""
+        posted_at = time.time()
+        response = requests.post(API_URL, json=payload)
+        assert response.status_code == 201, response.text
+        service_id = response.json()["service_id"]
+        self.trace(service_id, payload.get("name"), posted_at, time.time())
+        return service_id
+
+    def _get(self, service_id):
+        return self.traces.get(service_id) or self.retired[service_id]
+
+    def mark(self, service_id, stage, at=None):
+        with self.lock:
+            self._get(service_id).mark(stage, at)
+
+    def wait(self, service_id, stages=("up",), timeout=DEFAULT_TIMEOUT):
+        """Wait until the stages were recorded for the L2VPN, return its trace."""
+        wait_until(
+            lambda: set(self._get(service_id).stages),
+            lambda seen: set(stages) <= seen,
+            timeout=timeout,
+            desc=f"L2VPN {service_id} stages {stages}",
+        )
+        return self._get(service_id)
+
+    def on_ping(self, host, address, at):
+        """Mark the ping stage of the up L2VPN whose endpoint the ping went through.
+
+        The endpoint is the switch port of the host interface used to reach
+        `address`, and the VLAN of that interface (untagged if none).
+        """
+        try:
+            dev = DEV_RE.search(host.cmd(f"ip -o route get {address}"))[1]
+            link = host.cmd(f"ip -d -o link show dev {dev}")
+            intf = host.intf(LINK_RE.match(link.strip())[2] or dev)
+            peer = intf.link.intf2 if intf.link.intf1 is intf else intf.link.intf1
+            port = port_id(peer.node, peer)
+        except (TypeError, AttributeError, KeyError) as exc:
+            logger.debug("L2VPN tracer: no endpoint for the ping %s -> %s: %s", host.name, address, exc)
+            return
+        vlan = VLAN_ID_RE.search(link)
+        vlan = vlan[1] if vlan else "untagged"
+        with self.lock:
+            for trace in self.traces.values():
+                if "up" in trace.stages and any(
+                    endpoint.get("port_id") == port and str(endpoint.get("vlan")) == vlan
+                    for endpoint in trace.endpoints
+                ):
+                    trace.mark("ping", at)
+
+    def _match_evc(self, oxp, evc):
+        """Return the trace an EVC belongs to: by name, else the oldest one lacking it."""
+        waiting = sorted(
+            (trace for trace in self.traces.values() if oxp not in trace.evcs),
+            key=lambda trace: trace.start,
+        )
+        name = evc.get("name", "")
+        for trace in waiting:
+            if trace.service_id in name or (trace.name and trace.name in name):
+                return trace
+        # once an L2VPN is up, all its EVCs exist; one in error gets none
+        waiting = [trace for trace in waiting if "up" not in trace.stages and trace.status != "error"]
+        return waiting[0] if waiting else None
+
+    def _flows_installed(self, evc_id):
+        if self.bridges is None:
+            self.bridges = []
+            if shutil.which("ovs-vsctl"):
+                self.bridges = subprocess.run(
+                    ["ovs-vsctl", "list-br"], capture_output=True, text=True
+                ).stdout.split()
+        # mef_eline tags the flows of an EVC with the cookie 0xaa<evc id>
+        cookie = f"cookie=0xaa{evc_id}/-1"
+        for bridge in self.bridges:
+            output = subprocess.run(
+                ["ovs-ofctl", "dump-flows", bridge, cookie], capture_output=True, text=True
+            ).stdout
+            if "cookie=" in output:
+                return True
+        return False
+
+    def _poll_once(self):
+        now = time.time()
+        l2vpns = get_l2vpns()
+        evcs = {oxp: get_evcs(oxp) for oxp in self.oxps}
+        with self.lock:
+            if self.discover:
+                for service_id in set(l2vpns) - self.known_l2vpns - set(self.traces):
+                    trace = self.traces[service_id] = Trace(service_id, l2vpns[service_id].get("name"), now)
+                    trace.mark("accepted", now)
+            for service_id, trace in list(self.traces.items()):
+                if service_id in l2vpns:
+                    trace.endpoints = l2vpns[service_id].get("endpoints") or []
+                    trace.status = l2vpns[service_id].get("status")
+                elif service_id in self.known_l2vpns:
+                    # removed: it must not take the EVCs of later L2VPNs
+                    self.retired[service_id] = self.traces.pop(service_id)
+            self.known_l2vpns |= set(l2vpns)
+            for oxp in self.oxps:
+                new = sorted(
+                    set(evcs[oxp]) - self.known_evcs[oxp],
+                    key=lambda evc_id: evcs[oxp][evc_id].get("creation_time", ""),
+                )
+                for evc_id in new:
+                    evc = evcs[oxp][evc_id]
+                    trace = self._match_evc(oxp, evc)
+                    if trace is None:
+                        continue
+                    self.known_evcs[oxp].add(evc_id)
+                    trace.evcs[oxp] = evc_id
+                    trace.mark(f"evc_seen/{oxp}", now)
+                    if evc.get("creation_time"):
+                        trace.mark(f"evc_created/{oxp}", parse_time(evc["creation_time"]))
+            for service_id, trace in self.traces.items():
+                if l2vpns.get(service_id, {}).get("status") == "up":
+                    trace.mark("up", now)
+            pending = [
+                (trace, oxp, evc_id)
+                for trace in self.traces.values()
+                for oxp, evc_id in trace.evcs.items()
+                if f"flows/{oxp}" not in trace.stages
+            ]
+            for trace in self.traces.values():
+                for oxp, evc_id in trace.evcs.items():
+                    if evcs[oxp].get(evc_id, {}).get("active"):
+                        trace.mark(f"evc_active/{oxp}", now)
+        for trace, oxp, evc_id in pending:
+            if self._flows_installed(evc_id):
+                trace.mark(f"flows/{oxp}")
+
+    def _poll(self):
+        while not self.stopped.is_set():
+            start = time.monotonic()
+            try:
+                self._poll_once()
+            except (requests.RequestException, ValueError, KeyError) as exc:
+                logger.debug("L2VPN tracer poll failed: %s", exc)
+            self.stopped.wait(max(self.interval - (time.monotonic() - start), 0))
+
+    def _on_message(self, body):
+        """Mark the connection messages of the traced L2VPNs (firehose copies)."""
+        text = body.decode(errors="replace")
+        with self.lock:
+            for trace in self.traces.values():
+                if trace.service_id in text or (trace.name and json.dumps(trace.name) in text):
+                    for domain in set(DOMAIN_RE.findall(text)):
+                        if domain in self.domains:
+                            trace.mark(f"queued/{self.domains[domain]}")
+
+    def _firehose(self):
+        try:
+            import pika
+
+            env = read_env("sdx-controller")
+            connection = pika.BlockingConnection(pika.ConnectionParameters(
+                host=env["MQ_HOST"],
+                port=int(env["MQ_PORT"]),
+                credentials=pika.PlainCredentials(env["MQ_USER"], env["MQ_PASS"]),
+            ))
+            channel = connection.channel()
+            queue = channel.queue_declare(queue="", exclusive=True).method.queue
+            channel.queue_bind(queue, "amq.rabbitmq.trace", routing_key="publish.#")
+        except Exception as exc:
+            logger.info("RabbitMQ firehose not available, queued stages are skipped: %s", exc)
+            return
+        try:
+            topology_queue = env["SUB_QUEUE"]
+            while not self.stopped.is_set():
+                for method, properties, body in channel.consume(queue, inactivity_timeout=0.5):
+                    if method is None:
+                        break
+                    routing_keys = (properties.headers or {}).get("routing_keys", [])
+                    # the topologies sent by the SDX-LCs mention every port
+                    if topology_queue not in routing_keys:
+                        self._on_message(body)
+                    channel.basic_ack(method.delivery_tag)
+        finally:
+            connection.close()
+
+
+def merge_logs(trace, path):
+    """Add the first log line of each container mentioning the L2VPN to a trace.
+
+    `trace` is the dict of Trace.to_dict() and `path` has the output of
+    `docker compose logs --timestamps --no-color` (the containers share the
+    clock of the host).
+    """
+    needles = [trace["service_id"]] + ([trace["name"]] if trace["name"] else [])
+    stages = dict(trace["stages_s"])
+    with open(path) as f:
+        for line in f:
+            match = LOG_RE.match(line.rstrip("\n"))
+            if match and any(needle in match["line"] for needle in needles):
+                stages.setdefault(f"log/{match['container']}", parse_time(match["time"]) - trace["start"])
+    trace["stages_s"] = dict(sorted(stages.items(), key=lambda item: item[1]))
+    return trace
@@ -0,0 +1,183 @@
+"""Resource leases to run non-conflicting tests concurrently on one stack.
+
+A test declares the UNI ports and the VLAN range it provisions L2VPNs on:
+
+    @pytest.mark.lease(
+        ports=["urn:sdx:port:ampath.net:Ampath3:50", "urn:sdx:port:tenet.ac.za:Tenet03:50"],
+        vlans=(100, 300),
+    )
+
+Before the test runs, the `lease` fixture (conftest.py) blocks until no other
+test holds a conflicting lease, then removes the L2VPNs left inside the lease.
+After the test, only the L2VPNs inside the lease are removed. Leases are
+shared across processes (e.g. pytest-xdist workers in the mininet container)
+through a lock file.
+
+Tests marked with exclusive=True lease the whole environment: they wait for
+every other test to finish and remove all L2VPNs. Tests without the marker
+also hold an exclusive lease, but leave the L2VPNs alone, as the suites did
+before leases existed. A test that changes the topology, or
+asserts on the total number of L2VPNs/EVCs, must be exclusive. A lease with
+no ports (e.g. for validation tests that are expected to be rejected) only
+conflicts with exclusive leases. L2VPNs with a non-numeric VLAN ("any",
+"all", "untagged") only belong to leases covering all VLANs (vlans=None).
+"""
+import fcntl
+import json
+import os
+import uuid
+
+import requests
+
+from tests.waiters import (
+    API_URL,
+    get_l2vpns,
+    wait_l2vpns,
+    wait_l2vpns_removed,
+    wait_l2vpns_settled,
+    wait_until,
+)
+
+LEASES_FILE = "/tmp/sdx-e2e-leases.json"
+LEASE_TIMEOUT = 1800
+
+
+def _vlan_range(vlan):
+    """Return the (first, last) VLAN of an endpoint, or None if not numeric."""
+    try:
+        first, _, last = str(vlan).partition(":")
+        return int(first), int(last or first)
+    except ValueError:
+        return None
+
+
+class Lease:
+    """Ports and VLAN range (inclusive) used by a test."""
+
+    def __init__(self, ports=(), vlans=None, exclusive=False, owner=None):
+        self.ports = set(ports)
+        self.vlans = tuple(vlans) if vlans is not None else None
+        self.exclusive = exclusive
+        self.owner = owner or uuid.uuid4().hex
+
+    @classmethod
+    def from_marker(cls, marker, owner=None):
+        if marker is None:
+            return cls(exclusive=True, owner=owner)
+        return cls(owner=owner, **marker.kwargs)
+
+    def to_dict(self):
+        return {
+            "ports": sorted(self.ports),
+            "vlans": self.vlans,
+            "exclusive": self.exclusive,
+            "pid": os.getpid(),
+        }
+
+    @classmethod
+    def from_dict(cls, owner, data):
+        return cls(data["ports"], data["vlans"], data["exclusive"], owner)
+
+    def _overlaps(self, vlans):
+        if self.vlans is None or vlans is None:
+            return True
+        return self.vlans[0] <= vlans[1] and vlans[0] <= self.vlans[1]
+
+    def conflicts(self, other):
+        if self.exclusive or other.exclusive:
+            return True
+        return bool(self.ports & other.ports) and self._overlaps(other.vlans)
+
+    def owns(self, l2vpn):
+        """Tell whether an L2VPN has an endpoint inside the lease."""
+        if self.exclusive:
+            return True
+        for endpoint in l2vpn.get("endpoints", []):
+            if endpoint.get("port_id") not in self.ports:
+                continue
+            vlans = _vlan_range(endpoint.get("vlan"))
+            if self.vlans is None or (vlans is not None and self._overlaps(vlans)):
+                return True
+        return False
+
+    def l2vpns(self):
+        """Return the L2VPNs inside the lease."""
+        return {
+            service_id: l2vpn for service_id, l2vpn in get_l2vpns().items()
+            if self.owns(l2vpn)
+        }
+
+    def cleanup(self):
+        """Remove the L2VPNs inside the lease and wait for them to be gone."""
+        if self.exclusive:
+            wait_l2vpns_settled(raise_on_timeout=False)
+        owned = self.l2vpns()
+        for service_id in owned:
+            response = requests.delete(f"{API_URL}/{service_id}")
+            assert response.status_code in [200, 404], response.text
+        if self.exclusive:
+            wait_l2vpns_removed()
+        elif owned:
+            wait_l2vpns(
+                lambda l2vpns: not set(owned) & set(l2vpns),
+                desc=f"L2VPNs {sorted(owned)} to be removed",
+            )
+
+
+class LeaseManager:
+    """Grant leases that do not conflict, across processes.
+
+    The granted leases are kept in a JSON file guarded by flock(). Leases of
+    processes that are gone (e.g. a crashed worker) are dropped.
+    """
+
+    def __init__(self, path=LEASES_FILE):
+        self.path = path
+
+    def _update(self, func):
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self.path) as f:
+                    leases = json.load(f)
+            except (OSError, ValueError):
+                leases = {}
+            leases = {
+                owner: data for owner, data in leases.items()
+                if self._alive(data["pid"])
+            }
+            result = func(leases)
+            with open(self.path, "w") as f:
+                json.dump(leases, f)
+            return result
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def try_acquire(self, lease):
+        def grant(leases):
+            for owner, data in leases.items():
+                if owner != lease.owner and lease.conflicts(Lease.from_dict(owner, data)):
+                    return False
+            leases[lease.owner] = lease.to_dict()
+            return True
+        return self._update(grant)
+
+    def acquire(self, lease, timeout=LEASE_TIMEOUT):
+        wait_until(
+            lambda: self.try_acquire(lease),
+            timeout=timeout,
+            max_interval=1,
+            desc=f"lease on ports={sorted(lease.ports)} vlans={lease.vlans} exclusive={lease.exclusive}",
+        )
+        return lease
+
+    def release(self, lease):
+        self._update(lambda leases: leases.pop(lease.owner, None))
@@ -0,0 +1,151 @@
+"""Data-plane probes between Mininet hosts: ping streams and iperf3 tests.
+
+A probe runs `ping -D` from a host at a short interval (below 0.2s needs
+root, as in the mininet container) and keeps the timestamp of each reply,
+so the duration of a data-plane outage can be measured to the interval:
+
+    probe = PingProbe(h1, "10.20.1.6").start()
+    failed_at = time.time()
+    ... break something, wait for the recovery ...
+    probe.stop()
+    probe.outage(failed_at)
+
+An iperf3 test sends UDP traffic at a given rate and returns what the
+server host received (rate, jitter, loss):
+
+    Iperf3(h1, h8, "10.0.100.2", mbps=5).start().result()
+"""
+import json
+import re
+import signal
+import subprocess
+import tempfile
+import time
+
+REPLY_RE = re.compile(r"^\[(?P<time>[\d.]+)\] .* icmp_seq=(?P<seq>\d+) ")
+
+
+def parse_replies(output):
+    """Return the (time, icmp_seq) of the replies in the output of ping -D."""
+    replies = []
+    for line in output.splitlines():
+        match = REPLY_RE.match(line)
+        if match and "bytes from" in line:
+            replies.append((float(match["time"]), int(match["seq"])))
+    return replies
+
+
+class PingProbe:
+    """Ping an address from a Mininet host every `interval` seconds."""
+
+    def __init__(self, host, address, interval=0.01, timeout=1):
+        self.host = host
+        self.address = address
+        self.interval = interval
+        self.timeout = timeout
+        self.process = None
+        self.output = None
+        self.replies = []
+        self.stopped_at = None
+
+    def start(self):
+        # a pipe nobody reads until stop() fills up in seconds at short
+        # intervals and blocks ping, so the output goes to a file
+        self.output = tempfile.TemporaryFile(mode="w+")
+        self.process = self.host.popen(
+            ["ping", "-D", "-n", "-i", str(self.interval), "-W", str(self.timeout), self.address],
+            stdout=self.output,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return self
+
+    def stop(self):
+        self.stopped_at = time.time()
+        self.process.send_signal(signal.SIGINT)
+        self.process.wait(timeout=30)
+        self.output.seek(0)
+        self.replies = parse_replies(self.output.read())
+        self.output.close()
+        return self.replies
+
+    def outage(self, since):
+        """Return the longest time without replies after `since`, and the probes lost.
+
+        The outage is measured between the last reply before the gap and the
+        first one after it, minus one interval. If the replies had not come
+        back within `timeout` when the probe was stopped, the outage lasts
+        until then.
+        """
+        before = [t for t, _ in self.replies if t <= since]
+        times = before[-1:] + [t for t, _ in self.replies if t > since]
+        if not times or self.stopped_at - times[-1] > self.timeout:
+            start = times[-1] if times else since
+            return {"outage_s": self.stopped_at - start, "recovered": False, "lost": None}
+        gap = max((t2 - t1 for t1, t2 in zip(times, times[1:])), default=0)
+        seqs = [seq for t, seq in self.replies if t >= times[0]]
+        lost = max(seqs) - min(seqs) + 1 - len(set(seqs))
+        return {"outage_s": max(gap - self.interval, 0), "recovered": True, "lost": lost}
+
+
+class Iperf3:
+    """A UDP iperf3 test from a client to a server host, at a given rate.
+
+    The receiver side (the server) reports the achieved rate, the jitter
+    and the loss, as JSON. Several tests can run at once on different ports:
+    serve() all of them, wait for the servers to listen, then send() them
+    all, so that the clients start together.
+    """
+
+    def __init__(self, client, server, address, mbps, duration=10, port=5201):
+        self.client = client
+        self.server = server
+        self.address = address
+        self.mbps = mbps
+        self.duration = duration
+        self.port = port
+        self.processes = []
+
+    def serve(self):
+        """Start the server, send() must follow once it listens."""
+        self.processes = [self.server.popen(
+            ["iperf3", "-s", "-1", "-J", "-B", self.address, "-p", str(self.port)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )]
+        return self
+
+    def send(self):
+        """Start the client."""
+        self.processes.append(self.client.popen(
+            [
+                "iperf3", "-c", self.address, "-p", str(self.port), "-u", "-b", f"{self.mbps}M",
+                "-t", str(self.duration), "-J",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        ))
+        return self
+
+    def start(self):
+        self.serve()
+        # let the server listen before the client connects
+        time.sleep(0.5)
+        return self.send()
+
+    def result(self):
+        """Wait for the test to end, return what the server received."""
+        server, client = self.processes
+        client.communicate(timeout=self.duration + 30)
+        output, _ = server.communicate(timeout=30)
+        try:
+            received = json.loads(output)["end"]["sum"]
+        except (ValueError, KeyError) as exc:
+            return {"error": f"{type(exc).__name__}: {output[-200:]}"}
+        return {
+            "mbps": received["bits_per_second"] / 1e6,
+            "jitter_ms": received["jitter_ms"],
+            "lost_percent": received["lost_percent"],
+        }
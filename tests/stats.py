@@ -0,0 +1,17 @@
+"""Statistics shared by the tests (tests/churn.py) and the benchmarks."""
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def summary(values, pcts=(50, 95, 99)):
+    """Return the count, percentiles and max of a list of latencies (None if empty)."""
+    if not values:
+        return None
+    result = {"count": len(values)}
+    result.update({f"p{pct}": percentile(values, pct) for pct in pcts})
+    result["max"] = max(values)
+    return result
+
@@ -1,6 +1,5 @@
 import json
 import re
-import time
 from datetime import datetime, timedelta
 from pytest_unordered import unordered
 
@@ -8,24 +7,22 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.topo_watcher import TopologyWatcher
+from tests.waiters import (
+    wait_link_status,
+    wait_topology,
+    wait_until,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
 KYTOS_TOPO_API = "http://%s:8181/api/kytos/topology/v3"
 KYTOS_SDX_API  = "http://%s:8181/api/kytos/sdx"
 KYTOS_API = 'http://%s:8181/api/kytos'
 
+@pytest.mark.fresh_network(setup=False)
 class TestE2ETopology:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-
-    @classmethod
-    def teardown_class(cls):
-        cls.net.stop()
-
     def test_010_list_topology(self):
         """Test if the topology was loaded correctly."""
         api_url = SDX_CONTROLLER + '/topology'
@@ -38,8 +35,11 @@ class TestE2ETopology:
         self.net.wait_switches_connect()
         self.net.run_setup_topo()
         
-        # give time so that messages are exchanged between components
-        time.sleep(15)
+        # wait until the SDX-Controller has aggregated the topology of all OXPs
+        wait_topology(
+            lambda topo: len(topo["nodes"]) == 8 and len(topo["links"]) == 10,
+            desc="all OXP topologies aggregated",
+        )
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -76,8 +76,8 @@ class TestE2ETopology:
 
         self.net.net.configLinkStatus('Ampath1', 'Ampath2', 'down')
 
-        # give time so that messages are propagated
-        time.sleep(15)
+        # wait until the change is propagated to the SDX-Controller
+        wait_link_status(link1, "down")
 
         response = requests.get(api_url)
         data = response.json()
@@ -103,8 +103,8 @@ class TestE2ETopology:
    
         self.net.net.configLinkStatus('Sax01', 'Tenet01', 'down')
 
-        # give time so that messages are propagated
-        time.sleep(15)
+        # wait until the change is propagated to the SDX-Controller
+        wait_link_status(link1, "down")
 
         response = requests.get(api_url)
         data = response.json()
@@ -133,13 +133,18 @@ class TestE2ETopology:
         sdx_api = KYTOS_SDX_API % ampath_ctrl
         response = requests.get(f"{sdx_api}/topology/2.0.0")
         oxp_ver1 = response.json()["version"]
+        watcher = TopologyWatcher()
 
         new_metadata = {"lat": "1", "lng": "2", "address": "Miami", "iso3166_2_lvl4": "US-FL"}
         response = requests.post(f"{ampath_topo_api}/switches/{item_to_change_id}/metadata", json=new_metadata)
         assert 200 <= response.status_code < 300, response.text
 
-        # Allow time for OXP process the topology update
-        time.sleep(5)
+        # Wait for the OXP to process the topology update
+        wait_until(
+            lambda: requests.get(f"{ampath_topo_api}/switches").json()["switches"][item_to_change_id]["metadata"],
+            lambda metadata: metadata == new_metadata,
+            desc="Kytos switch metadata update",
+        )
 
         # Force the Kytos SDX controller controller to send the topology to the SDX-LC
         response = requests.post(f"{sdx_api}/topology/2.0.0")
@@ -155,8 +160,8 @@ class TestE2ETopology:
         metadata = ampath_switches[item_to_change_id]['metadata']
         assert metadata == new_metadata, str(metadata)
 
-        # allow some time for SDX-Controller receive the topology update
-        time.sleep(10)
+        # wait for the SDX-Controller to receive the topology update
+        watcher.wait_propagated(ampath_ctrl, oxp_ver2)
 
         api_url = SDX_CONTROLLER + '/topology'
         response = requests.get(api_url)
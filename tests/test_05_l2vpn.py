@@ -1,6 +1,5 @@
 import json
 import re
-import time
 from datetime import datetime, timedelta
 import uuid
 import random
@@ -9,23 +8,23 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.waiters import (
+    count_evcs_with_tag,
+    wait_all_l2vpns,
+    wait_evc_count,
+    wait_evcs,
+    wait_l2vpn,
+    wait_l2vpns_removed,
+    wait_ping,
+    wait_port_status,
+    wait_topology,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
 
 class TestE2EL2VPN:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-
-    @classmethod
-    def teardown_class(cls):
-        cls.net.stop()
-
     @classmethod
     def setup_method(cls):
         cls.net.config_all_links_up()
@@ -60,8 +59,10 @@ class TestE2EL2VPN:
         service_id = data.get("service_id")
         assert service_id != None, str(data)
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(10)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpn(service_id, "up")
+        for oxp in ["ampath", "sax", "tenet"]:
+            wait_evc_count(oxp, 1)
 
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         response = requests.get(api_url)
@@ -118,8 +119,10 @@ class TestE2EL2VPN:
         service_id = data.get("service_id")
         assert service_id != None, str(data)
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(10)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpn(service_id, "up")
+        for oxp in ["ampath", "sax", "tenet"]:
+            wait_evc_count(oxp, 2)
 
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         response = requests.get(api_url)
@@ -160,8 +163,8 @@ class TestE2EL2VPN:
                 found += 1
         assert found == 0, str(evcs)
 
-        # wait a few seconds to allow status change from UNDER_PROVISIONG to UP
-        time.sleep(5)
+        # wait for the status change from UNDER_PROVISIONG to UP
+        wait_all_l2vpns("up")
 
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         response = requests.get(api_url)
@@ -193,8 +196,9 @@ class TestE2EL2VPN:
         assert current_data["endpoints"][0]["vlan"] == "100", str(data)
         assert current_data["endpoints"][1]["vlan"] == "100", str(data)
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(10)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_evcs("ampath", lambda evcs: count_evcs_with_tag(evcs, 100, "uni_a") == 1)
+        wait_evcs("tenet", lambda evcs: count_evcs_with_tag(evcs, 100, "uni_z") == 1)
 
         # make sure OXPs have the new EVCs
 
@@ -242,8 +246,10 @@ class TestE2EL2VPN:
         response = requests.patch(f"{api_url}/{key}", json=payload)
         assert response.status_code == 201, response.text
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(10)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpn(key, "up")
+        wait_evc_count("sax", 2)
+        wait_evc_count("tenet", 1)
 
         response = requests.get(f"{api_url}/{key}")
         data = response.json()[key]
@@ -276,8 +282,8 @@ class TestE2EL2VPN:
             response = requests.delete(f"{api_url}/{key}")
             assert response.status_code == 200, f"{response.text=} previous_data={data}"
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(10)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpns_removed()
 
         # make sure the L2VPNs were deleted from SDX-Controller
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
@@ -314,6 +320,7 @@ class TestE2EL2VPN:
         }
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
+        service_ids = [response.json()["service_id"]]
         h1, h8 = self.net.net.get('h1', 'h8')
         h1.cmd('ip link add link %s name vlan100 type vlan id 100' % (h1.intfNames()[0]))
         h1.cmd('ip link set up vlan100')
@@ -330,6 +337,7 @@ class TestE2EL2VPN:
         }
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
+        service_ids.append(response.json()["service_id"])
         h1.cmd('ip link add link %s name vlan101 type vlan id 101' % (h1.intfNames()[0]))
         h1.cmd('ip link set up vlan101')
         h1.cmd('ip addr add 10.1.2.1/24 dev vlan101')
@@ -345,6 +353,7 @@ class TestE2EL2VPN:
         }
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
+        service_ids.append(response.json()["service_id"])
         h1.cmd('ip link add link %s name vlan102 type vlan id 102' % (h1.intfNames()[0]))
         h1.cmd('ip link set up vlan102')
         h1.cmd('ip addr add 10.1.3.1/24 dev vlan102')
@@ -352,8 +361,11 @@ class TestE2EL2VPN:
         h8.cmd('ip link set up vlan102')
         h8.cmd('ip addr add 10.1.3.8/24 dev vlan102')
 
-        # wait a few seconds to allow OXPs to deploy the L2VPNs
-        time.sleep(10)
+        # wait for the OXPs to deploy the L2VPNs
+        for service_id in service_ids:
+            wait_l2vpn(service_id, "up")
+        for address in ["10.1.1.8", "10.1.2.8", "10.1.3.8"]:
+            wait_ping(h1, address)
 
         # test connectivity
         result_100 = h1.cmd('ping -c4 10.1.1.8')
@@ -363,8 +375,19 @@ class TestE2EL2VPN:
         # set one link to down
         self.net.net.configLinkStatus('Ampath1', 'Sax01', 'down')
 
-        # wait a few seconds for convergency
-        time.sleep(15)
+        # wait for convergency: the L2VPNs are moved away from the link
+        wait_port_status("urn:sdx:port:ampath.net:Ampath1:40", "down")
+        for service_id in service_ids:
+            wait_l2vpn(
+                service_id,
+                "up",
+                check=lambda l2vpn: all(
+                    hop["port_id"] != "urn:sdx:port:ampath.net:Ampath1:40"
+                    for hop in l2vpn["current_path"]
+                ),
+            )
+        for address in ["10.1.1.8", "10.1.2.8", "10.1.3.8"]:
+            wait_ping(h1, address)
 
         # test connectivity again
         result_100_2 = h1.cmd('ping -c4 10.1.1.8')
@@ -422,16 +445,13 @@ class TestE2EL2VPN:
             requests.delete(f"{api_url}/{l2vpn}")
 
         # wait until all L2VPNs are removed
-        for i in range(30):
-            data = requests.get(api_url).json()
-            if len(data) == 0:
-                break
-            time.sleep(2)
-        else:
-            assert False, f"Timeout waiting for L2VPN removal. {data=}"
+        wait_l2vpns_removed()
 
-        # give a few seconds so that SDX-Controller can update link properties
-        time.sleep(10)
+        # wait until SDX-Controller updates link properties
+        wait_topology(
+            lambda topo: all(int(link["residual_bandwidth"]) == 100 for link in topo["links"]),
+            desc="residual bandwidth to be released",
+        )
 
         # case 1: first we make requests that will consume 90% of the link capacity
         for unia, uniz in request_pairs:
@@ -488,16 +508,7 @@ class TestE2EL2VPN:
             count += 1
 
         # wait for all L2VPNs to be UP
-        for i in range(30):
-            data = requests.get(api_url).json()
-            if all([l2vpn["status"] == "up" for l2vpn in data.values()]):
-                break
-            time.sleep(3)
-        else:
-            assert False, f"Timeout waiting for L2VPN converge. {data=}"
-
-        # wait a couple of seconds to SDX-Controller propagate changes
-        time.sleep(10)
+        wait_all_l2vpns("up", timeout=90)
 
         vlan_inc = 0
         for unia, uniz in request_pairs:
@@ -510,8 +521,8 @@ class TestE2EL2VPN:
                 hostZ.cmd(f"ip link add link {hostZ.intfNames()[0]} name vlan{vlan_id} type vlan id {vlan_id}")
                 hostZ.cmd(f"ip link set up vlan{vlan_id}")
                 hostZ.cmd(f"ip addr add 2001:db8:ffff:{vlan_id}::2/64 dev vlan{vlan_id}")
-                # run first ping just to learn mac
-                hostA.cmd(f"ping6 -c1 2001:db8:ffff:{vlan_id}::2 2>&1 >/dev/null")
+                # wait for the first ping (which also learns mac) to succeed
+                wait_ping(hostA, f"2001:db8:ffff:{vlan_id}::2", ping="ping6")
                 # now run ping and collect results
                 ping_result = hostA.cmd(f"ping6 -c4 -i0.2 2001:db8:ffff:{vlan_id}::2")
                 assert ', 0% packet loss,' in ping_result, f"{vlan_id=} {dataA=} {dataZ=} {ping_result=}"
@@ -526,7 +537,7 @@ class TestE2EL2VPN:
             response = requests.delete(f"{api_url}/{key}")
             assert response.status_code == 200, response.text
 
-        time.sleep(3)
+        wait_l2vpns_removed()
 
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         data = requests.get(api_url).json()
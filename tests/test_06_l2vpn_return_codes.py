@@ -8,36 +8,21 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.waiters import (
+    wait_all_l2vpns,
+    wait_evc_count,
+    wait_l2vpn,
+    wait_link_status,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
 
+# L2VPNs are removed before/after each test by the lease fixture; tests
+# expected to be rejected do not provision anything, so they lease nothing
+@pytest.mark.lease(exclusive=True)
 class TestE2EReturnCodes:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-
-    @classmethod
-    def teardown_class(cls):
-        cls.net.stop()
-
-    @classmethod
-    def setup_method(cls):
-        api_url = SDX_CONTROLLER + '/l2vpn/1.0'
-        response = requests.get(api_url)
-        assert response.status_code == 200, response.text
-        response_json = response.json()
-        for l2vpn in response_json:
-            response = requests.delete(api_url+f'/{l2vpn}')
-            assert response.status_code == 200, response.text
-
-        # wait for L2VPN to be actually deleted
-        time.sleep(2)
-
     
     def test_010_create_l2vpn(self):
         """
@@ -57,8 +42,8 @@ class TestE2EReturnCodes:
         assert response.status_code == 201, response.text
         service_id = response.json()["service_id"]
 
-        # allow time for SDX-Controller propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(service_id, "up")
 
         response = requests.get(f"{api_url}/{service_id}")
         assert response.status_code == 200, response.text
@@ -85,8 +70,8 @@ class TestE2EReturnCodes:
         assert response.status_code == 201, response.text
         service_id = response.json()["service_id"]
 
-        # allow time for SDX-Controller propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(service_id, "up")
 
         response = requests.get(f"{api_url}/{service_id}")
         assert response.status_code == 200, response.text
@@ -95,7 +80,7 @@ class TestE2EReturnCodes:
         assert len(data["endpoints"]) == 2, str(data)
         assert len(data["current_path"]) > 0, str(data)
 
-        # allow time for SDX-Controller propagate changes
+        # observe for a while to make sure the L2VPN remains up
         time.sleep(5)
 
         response = requests.get(f"{api_url}/{service_id}")
@@ -105,7 +90,7 @@ class TestE2EReturnCodes:
         assert len(data["endpoints"]) == 2, str(data)
         assert len(data["current_path"]) > 0, str(data)
 
-        # allow time for SDX-Controller propagate changes
+        # observe for a while to make sure the L2VPN remains up
         time.sleep(5)
 
         response = requests.get(f"{api_url}/{service_id}")
@@ -133,8 +118,8 @@ class TestE2EReturnCodes:
         assert response.status_code == 201, response.text
         service_id = response.json()["service_id"]
 
-        # allow time for SDX-Controller propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(service_id, "up")
 
         response = requests.get(f"{api_url}/{service_id}")
         assert response.status_code == 200, response.text
@@ -164,8 +149,10 @@ class TestE2EReturnCodes:
         service_id = data.get("service_id")
         assert service_id != None, str(data)
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(5)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpn(service_id, "up")
+        for oxp in ["ampath", "sax"]:
+            wait_evc_count(oxp, 1)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -216,8 +203,10 @@ class TestE2EReturnCodes:
         service_id = data.get("service_id")
         assert service_id != None, str(data)
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(5)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpn(service_id, "up")
+        for oxp in ["ampath", "sax", "tenet"]:
+            wait_evc_count(oxp, 1)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -300,6 +289,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 422, response.text
 
+    @pytest.mark.lease()
     def test_020_create_l2vpn_with_invalid_vlan_type(self):
         """
         Test the return code for creating a SDX L2VPN with an invalid VLAN type
@@ -316,6 +306,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_021_create_l2vpn_with_vlan_out_of_range(self):
         """
         Test the return code for creating a SDX L2VPN with an out-of-range VLAN
@@ -332,6 +323,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_022_create_l2vpn_with_vlan_negative(self):
         """
         Test the return code for creating a SDX L2VPN with a negative VLAN
@@ -348,6 +340,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_023_create_l2vpn_with_vlan_all(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -365,6 +358,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
     
+    @pytest.mark.lease()
     def test_024_create_l2vpn_with_missing_vlan(self):
         """
         Test the return code for creating a SDX L2VPN with a missing VLAN value
@@ -381,6 +375,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_025_create_l2vpn_with_body_incorrect(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -398,6 +393,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_026_create_l2vpn_with_missing_name(self):
         """
         Test the return code for creating a SDX L2VPN with a missing 'name' field
@@ -413,6 +409,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_027_create_l2vpn_with_non_existent_port(self):
         """
         Test return code for creating L2VPN with a non-existent port ID
@@ -429,6 +426,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_028_create_l2vpn_with_invalid_port_id_format(self):
         """
         Test return code for creating L2VPN with invalid port ID format (incorrect URN format)
@@ -445,6 +443,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_029_create_l2vpn_with_single_endpoint(self):
         """
         Test return code for creating L2VPN with with a single endpoint
@@ -460,6 +459,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_030_create_l2vpn_with_p2mp(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -493,8 +493,7 @@ class TestE2EReturnCodes:
         }
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
-
-        time.sleep(5)
+        wait_l2vpn(response.json()["service_id"], "up")
 
         response = requests.post(api_url, json=payload)
         assert response.status_code == 409, response.text
@@ -520,8 +519,8 @@ class TestE2EReturnCodes:
         assert response.status_code == 201, response.text
         service_id = response.json()["service_id"]
 
-        # give enough time to SDX-Controller to propagate change to OXPs
-        time.sleep(5)
+        # wait until SDX-Controller propagates the change to OXPs
+        wait_l2vpn(service_id, "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -530,6 +529,7 @@ class TestE2EReturnCodes:
         assert service_id in data, str(data)
         assert data[service_id].get("status") == "up", str(data)
 
+    @pytest.mark.lease()
     def test_051_create_l2vpn_with_min_bw_out_of_range(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -551,6 +551,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_052_create_l2vpn_with_min_bw_negative(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -599,8 +600,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(response.json()["service_id"], "up")
 
         payload = {
             "name": "Test L2VPN creation available bw",
@@ -638,8 +639,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(response.json()["service_id"], "up")
 
         payload = {
             "name": "Test L2VPN creation no available bw",
@@ -656,8 +657,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_all_l2vpns("up", count=2)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -688,8 +689,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(response.json()["service_id"], "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -700,6 +701,7 @@ class TestE2EReturnCodes:
             assert len(l2vpn["endpoints"]) == 2, str(l2vpn)
             assert len(l2vpn["current_path"]) > 0, str(l2vpn)
 
+    @pytest.mark.lease()
     def test_056_create_l2vpn_with_max_delay_out_of_range(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -721,6 +723,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
 
+    @pytest.mark.lease()
     def test_057_create_l2vpn_with_max_delay_negative(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -762,8 +765,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(response.json()["service_id"], "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -774,6 +777,7 @@ class TestE2EReturnCodes:
             assert len(l2vpn["endpoints"]) == 2, str(l2vpn)
             assert len(l2vpn["current_path"]) > 0, str(l2vpn)
 
+    @pytest.mark.lease()
     def test_059_create_l2vpn_with_max_number_oxps_out_of_range(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -795,6 +799,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 400, response.text
          
+    @pytest.mark.lease()
     def test_060_create_l2vpn_with_max_number_oxps_negative(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -835,8 +840,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(response.json()["service_id"], "up")
 
         payload = {
             "name": "Test L2VPN creation",
@@ -874,8 +879,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_l2vpn(response.json()["service_id"], "up")
 
         payload = {
             "name": "Test L2VPN creation no available oxps",
@@ -892,8 +897,8 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_all_l2vpns("up", count=2)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -904,6 +909,7 @@ class TestE2EReturnCodes:
             assert len(l2vpn["endpoints"]) == 2, str(l2vpn)
             assert len(l2vpn["current_path"]) > 0, str(l2vpn)
 
+    @pytest.mark.lease()
     def test_070_create_l2vpn_with_impossible_scheduling(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -925,6 +931,7 @@ class TestE2EReturnCodes:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 422, response.text
 
+    @pytest.mark.lease()
     def test_071_create_l2vpn_with_formatting_issue(self):
         """
         Test the return code for creating a SDX L2VPN
@@ -952,17 +959,18 @@ class TestE2EReturnCodes:
         412: No path available between endpoints
         """
 
+        link1 = "urn:sdx:link:tenet.ac.za:Tenet01/2_Tenet03/2"
+
         # set one link to down
         self.net.net.configLinkStatus('Tenet01', 'Tenet03', 'down')
 
-        # wait a few seconds
-        time.sleep(15)
+        # wait for the link status to reach the SDX-Controller
+        wait_link_status(link1, "down")
 
         api_url_topology = SDX_CONTROLLER + '/topology'
         response = requests.get(api_url_topology)
         data = response.json()
         links = {link["id"]: link for link in data["links"]}
-        link1 = "urn:sdx:link:tenet.ac.za:Tenet01/2_Tenet03/2"
         assert links[link1]["status"] == "down", str(links[link1])
         
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
@@ -978,8 +986,8 @@ class TestE2EReturnCodes:
         # set one link to up
         self.net.net.configLinkStatus('Tenet01', 'Tenet03', 'up')
 
-        # wait a few seconds
-        time.sleep(15)
+        # wait for the link status to reach the SDX-Controller
+        wait_link_status(link1, "up")
 
         response = requests.get(api_url_topology)
         data = response.json()
@@ -1,6 +1,5 @@
 import json
 import re
-import time
 from datetime import datetime, timedelta
 import uuid
 
@@ -8,37 +7,33 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.waiters import (
+    count_evcs_with_tag,
+    wait_all_l2vpns,
+    wait_evc_count,
+    wait_evcs,
+    wait_l2vpn,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
-
+UNIS = [
+    "urn:sdx:port:ampath.net:Ampath3:50",
+    "urn:sdx:port:tenet.ac.za:Tenet03:50",
+    "urn:sdx:port:sax.net:Sax01:50",
+]
+
+# tests counting all the L2VPNs/EVCs need an exclusive lease; the others
+# only have the L2VPN of setup_method (VLAN 100) and edits to VLANs up to
+# 500 that must be rejected, so they can run along test_08 (VLANs 600+)
+@pytest.mark.api_only
+@pytest.mark.lease(ports=UNIS, vlans=(100, 500))
 class TestE2EReturnCodesEditL2vpn:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-
-    @classmethod
-    def teardown_class(cls):
-        cls.net.stop()
    
     @classmethod
     def setup_method(cls):
-        # give enough time so that previous L2VPN gets created or topology update gets sent
-        time.sleep(3)
-
-        api_url = SDX_CONTROLLER + '/l2vpn/1.0'
-        response = requests.get(api_url)
-        assert response.status_code == 200, response.text
-        response_json = response.json()
-        for l2vpn in response_json:
-            response = requests.delete(api_url+f'/{l2vpn}')
-        # wait for the L2VPNs to be deleted
-        time.sleep(2)
-
+        # L2VPNs of the previous tests were removed by the lease fixture
         # Create an L2VPN to edit later
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         cls.payload = {
@@ -53,14 +48,9 @@ class TestE2EReturnCodesEditL2vpn:
         cls.key = response.json()["service_id"]
 
         # wait until status changes for UNDER_PROVISIONING to UP
-        for i in range(30):
-            data = requests.get(api_url).json()
-            if data[cls.key]["status"] == "up":
-                break
-            time.sleep(2)
-        else:
-            assert False, f"Timeout waiting for L2VPN to become up: {data=}"
+        wait_l2vpn(cls.key, "up")
 
+    @pytest.mark.lease(exclusive=True)
     def test_010_edit_l2vpn_vlan(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -73,8 +63,9 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=self.payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_evcs("ampath", lambda evcs: count_evcs_with_tag(evcs, 200) == 1)
+        wait_l2vpn(self.key, "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -85,6 +76,7 @@ class TestE2EReturnCodesEditL2vpn:
             assert len(l2vpn["endpoints"]) == 2, str(l2vpn)
             assert len(l2vpn["current_path"]) > 0, str(l2vpn)
 
+    @pytest.mark.lease(exclusive=True)
     def test_011_edit_l2vpn_port_id(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -96,8 +88,9 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=self.payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes (path no longer uses ampath)
+        wait_evc_count("ampath", 0)
+        wait_l2vpn(self.key, "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -264,6 +257,7 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{key}", json=self.payload)
         assert response.status_code == 404, response.text
 
+    @pytest.mark.lease(exclusive=True)
     def test_050_edit_l2vpn_conflict(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -281,8 +275,8 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_all_l2vpns("up", count=2)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -299,6 +293,7 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=self.payload)
         assert response.status_code == 409, response.text
 
+    @pytest.mark.lease(exclusive=True)
     def test_060_edit_l2vpn_with_min_bw(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -320,8 +315,9 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_evcs("ampath", lambda evcs: count_evcs_with_tag(evcs, 300) == 1)
+        wait_l2vpn(self.key, "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -332,6 +328,7 @@ class TestE2EReturnCodesEditL2vpn:
             assert len(l2vpn["endpoints"]) == 2, str(l2vpn)
             assert len(l2vpn["current_path"]) > 0, str(l2vpn)
 
+    @pytest.mark.lease(exclusive=True)
     def test_061_edit_l2vpn_with_max_delay(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -353,8 +350,9 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_evcs("ampath", lambda evcs: count_evcs_with_tag(evcs, 300) == 1)
+        wait_l2vpn(self.key, "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -365,6 +363,7 @@ class TestE2EReturnCodesEditL2vpn:
             assert len(l2vpn["endpoints"]) == 2, str(l2vpn)
             assert len(l2vpn["current_path"]) > 0, str(l2vpn)
 
+    @pytest.mark.lease(exclusive=True)
     def test_062_edit_l2vpn_with_max_number_oxps(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -386,8 +385,9 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_evcs("ampath", lambda evcs: count_evcs_with_tag(evcs, 300) == 1)
+        wait_l2vpn(self.key, "up")
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
@@ -464,6 +464,7 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.patch(f"{api_url}/{self.key}", json=payload)
         assert response.status_code == 400, response.text
     
+    @pytest.mark.lease(exclusive=True)
     def test_066_edit_l2vpn_with_no_available_bw(self):
         """
         Test the return code for editing a SDX L2VPN
@@ -485,8 +486,8 @@ class TestE2EReturnCodesEditL2vpn:
         response = requests.post(api_url, json=payload)
         assert response.status_code == 201, response.text
 
-        # allow time for SDX-Controller to propagate changes
-        time.sleep(5)
+        # wait for SDX-Controller to propagate changes
+        wait_all_l2vpns("up", count=2)
 
         response = requests.get(api_url)
         assert response.status_code == 200, response.text
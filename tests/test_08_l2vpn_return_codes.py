@@ -1,6 +1,5 @@
 import json
 import re
-import time
 from datetime import datetime, timedelta
 import uuid
 
@@ -8,47 +7,42 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.waiters import wait_all_l2vpns, wait_l2vpn
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
+UNIS = [
+    "urn:sdx:port:ampath.net:Ampath3:50",
+    "urn:sdx:port:tenet.ac.za:Tenet03:50",
+]
 
+# VLAN of the L2VPN of setup_method, _add_l2vpn() uses the next ones
+VLAN = 600
+
+# tests counting all the L2VPNs need an exclusive lease; the others only
+# use VLAN, so they can run along test_07 (VLANs 100-500)
+@pytest.mark.api_only
+@pytest.mark.lease(ports=UNIS, vlans=(VLAN, VLAN + 2))
 class TestE2EReturnCodesListL2vpn:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-
-    @classmethod
-    def teardown_class(cls):
-        cls.net.stop()
    
     @classmethod
     def setup_method(cls):
-        api_url = SDX_CONTROLLER + '/l2vpn/1.0'
-        response = requests.get(api_url)
-        assert response.status_code == 200, response.text
-        response_json = response.json()
-        for l2vpn in response_json:
-            response = requests.delete(api_url+f'/{l2vpn}')
-        # allow a few seconds so that SDX-Controller can propagate changes
-        time.sleep(3)
+        # L2VPNs of the previous tests were removed by the lease fixture
         # Create an L2VPN to list later
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         cls.payload = {
             "name": "Test L2VPN request",
             "endpoints": [
-                {"port_id": "urn:sdx:port:ampath.net:Ampath3:50","vlan": "100"},
-                {"port_id": "urn:sdx:port:tenet.ac.za:Tenet03:50","vlan": "100"}
+                {"port_id": "urn:sdx:port:ampath.net:Ampath3:50","vlan": str(VLAN)},
+                {"port_id": "urn:sdx:port:tenet.ac.za:Tenet03:50","vlan": str(VLAN)}
             ]
         }
         response = requests.post(api_url, json=cls.payload)
         assert response.status_code == 201, response.text
         cls.key = response.json()["service_id"]
-        # allow a few seconds so that SDX-Controller can propagate changes
-        time.sleep(5)
+        # wait until SDX-Controller propagates changes
+        wait_l2vpn(cls.key, "up")
 
     def _add_l2vpn(self, n = 2):
         '''Auxiliar function'''
@@ -57,8 +51,8 @@ class TestE2EReturnCodesListL2vpn:
             payload = {
                 "name": f"Test L2VPN request within loop i={i}",
                 "endpoints": [
-                    {"port_id": "urn:sdx:port:ampath.net:Ampath3:50","vlan": str(i+1)},
-                    {"port_id": "urn:sdx:port:tenet.ac.za:Tenet03:50","vlan": str(i+1)}
+                    {"port_id": "urn:sdx:port:ampath.net:Ampath3:50","vlan": str(VLAN+i+1)},
+                    {"port_id": "urn:sdx:port:tenet.ac.za:Tenet03:50","vlan": str(VLAN+i+1)}
                 ]
             }
             response = requests.post(api_url, json=payload)
@@ -86,6 +80,7 @@ class TestE2EReturnCodesListL2vpn:
         response = requests.get(f"{api_url}/{key}")
         assert response.status_code == 404, response.text
   
+    @pytest.mark.lease(exclusive=True)
     def test_030_list_multiple_l2vpn(self):
         """
         Test the return code for listing multiple SDX L2VPN
@@ -97,6 +92,7 @@ class TestE2EReturnCodesListL2vpn:
         data = response.json()
         assert len(data) == 1
 
+    @pytest.mark.lease(exclusive=True)
     def test_031_list_multiple_l2vpn_multiple_existing(self):
         """
         Test the return code for listing multiple SDX L2VPN
@@ -105,7 +101,7 @@ class TestE2EReturnCodesListL2vpn:
         self._add_l2vpn()
 
         # wait for changes to be propagated
-        time.sleep(5)
+        wait_all_l2vpns("up", count=3)
 
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         response = requests.get(api_url)
@@ -13,7 +13,18 @@ from datetime import datetime, timedelta
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.waiters import (
+    wait_evc_count,
+    wait_l2vpn,
+    wait_l2vpns_removed,
+    wait_l2vpns_settled,
+    wait_link_status,
+    wait_ping,
+    wait_port_status,
+    wait_port_vlan_range,
+    wait_topology,
+    wait_topology_up,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
 API_URL = SDX_CONTROLLER + '/l2vpn/1.0'
@@ -35,26 +46,11 @@ UNI2HOST = {
 class TestE2ETopologyUseCases:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        """Set up the test environment with all OXPs."""
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-        
-        # Give time for topology to be fully established
-        time.sleep(15)
-
-    @classmethod
-    def teardown_class(cls):
-        """Clean up the test environment."""
-        cls.net.stop()
-
     @classmethod
     def setup_method(cls):
         """Reset network configuration before each test."""
-        # give enough time so that previous L2VPN gets created or topology update gets sent
-        time.sleep(3)
+        # wait until previous L2VPNs get created
+        wait_l2vpns_settled()
 
         api_url = SDX_CONTROLLER + '/l2vpn/1.0'
         response = requests.get(api_url)
@@ -65,10 +61,10 @@ class TestE2ETopologyUseCases:
             assert response.status_code == 200, response.text
 
         # wait for L2VPN to be actually deleted
-        time.sleep(2)
+        wait_l2vpns_removed()
 
         cls.net.config_all_links_up()
-        time.sleep(5)  # Allow time for topology to stabilize
+        wait_topology_up()  # Wait for topology to stabilize
 
     def create_new_l2vpn(self, vlan='100', node1='Ampath1', node2='Tenet01'):
         l2vpn_payload = {
@@ -89,7 +85,7 @@ class TestE2ETopologyUseCases:
         l2vpn_id = response.json().get("service_id")
 
         # Wait for L2VPN to be provisioned
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up")
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -108,8 +104,9 @@ class TestE2ETopologyUseCases:
         h2.cmd(f"ip addr add {add2}/24 dev vlan{vlan}")
 
         # test connectivity
+        wait_ping(h1, add2)
         assert ', 0% packet loss,' in h1.cmd(f"ping -c4 {add2}")
-        return {'id':l2vpn_id, 'data':l2vpn_data, 'h':h1, 'ping_str':f"ping -c4 {add2}"}
+        return {'id':l2vpn_id, 'data':l2vpn_data, 'h':h1, 'addr':add2, 'ping_str':f"ping -c4 {add2}"}
 
     @pytest.mark.xfail(reason="The status of the L2VPN doesn't change to down after setting the link to down")
     def test_010_intra_domain_link_down(self):
@@ -137,7 +134,8 @@ class TestE2ETopologyUseCases:
         self.net.net.configLinkStatus('Tenet01', 'Tenet03', 'down')
         
         # Step 3: Wait for topology update to propagate
-        time.sleep(5)
+        wait_link_status("urn:sdx:link:tenet.ac.za:Tenet01/2_Tenet03/2", "down")
+        wait_l2vpn(l2vpn_id, "down", timeout=10, raise_on_timeout=False)
         
         # Step 4: Verify topology is updated with link status down
         response = requests.get(API_URL_TOPO)
@@ -189,7 +187,8 @@ class TestE2ETopologyUseCases:
         self.net.net.configLinkStatus('Tenet01', 'Tenet02', 'down')
         
         # Step 3: Wait for topology update to propagate
-        time.sleep(5)
+        wait_link_status("urn:sdx:link:tenet.ac.za:Tenet01/1_Tenet02/1", "down")
+        wait_ping(l2vpn_data['h'], l2vpn_data['addr'], timeout=10, raise_on_timeout=False)
         
         # Step 4: Verify topology is updated with link status down
         response = requests.get(API_URL_TOPO)
@@ -228,7 +227,8 @@ class TestE2ETopologyUseCases:
         Ampath1 = self.net.net.get('Ampath1')
         Ampath1.intf('Ampath1-eth40').ifconfig('down') 
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up", check=lambda l2vpn: l2vpn['current_path'] != first_path)
+        wait_ping(l2vpn_data['h'], l2vpn_data['addr'])
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -243,7 +243,9 @@ class TestE2ETopologyUseCases:
         ### Reset 
         Ampath1.intf('Ampath1-eth40').ifconfig('up') 
 
-        time.sleep(5)
+        wait_port_status("urn:sdx:port:ampath.net:Ampath1:40", "up")
+        wait_l2vpn(l2vpn_id, "up")
+        wait_ping(l2vpn_data['h'], l2vpn_data['addr'])
 
         data = requests.get(API_URL).json()
         assert data[l2vpn_id]["status"] == "up"
@@ -267,7 +269,8 @@ class TestE2ETopologyUseCases:
         Tenet01.intf('Tenet01-eth41').ifconfig('down') 
         Tenet02.intf('Tenet02-eth41').ifconfig('down') 
 
-        time.sleep(5)
+        for port_id in ["urn:sdx:port:tenet.ac.za:Tenet01:41", "urn:sdx:port:tenet.ac.za:Tenet02:41"]:
+            wait_port_status(port_id, "down", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL_TOPO)
         assert response.status_code == 200, response.text
@@ -285,7 +288,9 @@ class TestE2ETopologyUseCases:
         Tenet01.intf('Tenet01-eth41').ifconfig('up') 
         Tenet02.intf('Tenet02-eth41').ifconfig('up') 
 
-        time.sleep(5)
+        for port_id in ["urn:sdx:port:tenet.ac.za:Tenet01:41", "urn:sdx:port:tenet.ac.za:Tenet02:41"]:
+            wait_port_status(port_id, "up", timeout=10, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "up", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL_TOPO)
         assert response.status_code == 200, response.text
@@ -320,7 +325,7 @@ class TestE2ETopologyUseCases:
         Tenet01 = self.net.net.get('Tenet01')
         Tenet01.intf('Tenet01-eth50').ifconfig('down') 
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "down")
 
         data = requests.get(API_URL).json()
         assert data[l2vpn_id]["status"] == "down"  
@@ -331,7 +336,8 @@ class TestE2ETopologyUseCases:
         ### Reset 
         Tenet01.intf('Tenet01-eth50').ifconfig('up') 
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up")
+        wait_ping(l2vpn_data['h'], l2vpn_data['addr'])
 
         data = requests.get(API_URL).json()
         assert data[l2vpn_id]["status"] == "up"
@@ -358,7 +364,7 @@ class TestE2ETopologyUseCases:
         
         config = self.net.change_node_status(node_name)
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "down", timeout=10, raise_on_timeout=False)
         
         # status of the node should be down
         response_topology = requests.get(API_URL_TOPO)
@@ -382,8 +388,8 @@ class TestE2ETopologyUseCases:
         }
         response_newl2vpn = requests.post(API_URL, json=new_l2vpn_payload)
 
-        # allow time to propagate changes
-        time.sleep(5)
+        # wait for changes to be propagated
+        wait_l2vpns_settled(timeout=10, raise_on_timeout=False)
 
         ### Reset (before any assertion to avoid failures)
         self.net.change_node_status(node_name, config)
@@ -399,7 +405,10 @@ class TestE2ETopologyUseCases:
 
         assert response_newl2vpn.status_code != 201, str(response_newl2vpn)
 
-        time.sleep(5)
+        wait_topology(
+            lambda topo: all(n['status'] == "up" for n in topo['nodes'] if n['name'] == node_name),
+            desc=f"{node_name} status up",
+        )
 
         # status of the node should be up
         response_topology = requests.get(API_URL_TOPO)
@@ -428,7 +437,7 @@ class TestE2ETopologyUseCases:
         Tenet01 = self.net.net.get('Tenet01')
         Tenet01.intf('Tenet01-eth2').ifconfig('down') 
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "down", timeout=10, raise_on_timeout=False)
 
         # Verify L2VPN status is down after link goes down
         response = requests.get(API_URL)
@@ -439,7 +448,7 @@ class TestE2ETopologyUseCases:
         # Bring the inter-domain port back up
         Tenet01.intf('Tenet01-eth2').ifconfig('up') 
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up", timeout=10, raise_on_timeout=False)
 
         # Verify L2VPN status is up after link comes back up
         response = requests.get(API_URL)
@@ -464,7 +473,7 @@ class TestE2ETopologyUseCases:
         ampath_node = self.net.net.get('Ampath1')
         ampath_node.intf('Ampath1-eth50').ifconfig('down')
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "down")
 
         # Verify L2VPN status is down
         response = requests.get(API_URL)
@@ -476,7 +485,8 @@ class TestE2ETopologyUseCases:
         # Simulate UNI port coming back up
         ampath_node.intf('Ampath1-eth50').ifconfig('up')
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up")
+        wait_ping(l2vpn_data['h'], l2vpn_data['addr'])
 
         # Verify L2VPN status is up again
         response = requests.get(API_URL)
@@ -502,7 +512,7 @@ class TestE2ETopologyUseCases:
         Ampath2 = self.net.net.get('Ampath2')
         Ampath2.intf('Ampath2-eth50').ifconfig('down') 
         
-        time.sleep(5)
+        wait_port_status(port, "down")
 
         # Create a L2VPN that is not associated with the port
         l2vpn_data = self.create_new_l2vpn(vlan='700')
@@ -514,7 +524,7 @@ class TestE2ETopologyUseCases:
 
         # Update port UP to trigger topology update
         Ampath2.intf('Ampath2-eth50').ifconfig('up') 
-        time.sleep(5)
+        wait_port_status(port, "up")
 
         # Verify no L2VPN was created or modified
         final_data = requests.get(API_URL).json()
@@ -541,7 +551,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[1,4000]])
 
         # step 2: create a L2VPN within the vlan range: should be ok
         l2vpn_data = self.create_new_l2vpn(vlan='1000')
@@ -563,7 +573,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
         
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[100,200]], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "error", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL_TOPO)
         data = response.json()
@@ -592,7 +603,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[1,4000]], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "up", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL_TOPO)
         data = response.json()
@@ -631,7 +643,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[100,200]], timeout=15, raise_on_timeout=False)
         
         response = requests.get(API_URL_TOPO)
         data = response.json()
@@ -677,7 +689,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[1,4000]])
 
         l2vpn_data = self.create_new_l2vpn(vlan='1020')
         l2vpn_id = l2vpn_data['id']
@@ -695,7 +707,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:40", [[100,200]], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "up", check=lambda l2vpn: l2vpn["current_path"] != l2vpn_data["data"]["current_path"], timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL_TOPO)
         data = response.json()
@@ -732,7 +745,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:tenet.ac.za:Tenet03:2", [[1,4000]], timeout=15, raise_on_timeout=False)
 
         l2vpn_data = self.create_new_l2vpn(vlan='3104', node1='Ampath1', node2='Tenet03')
         l2vpn_id = l2vpn_data['id']
@@ -766,7 +779,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[100,200]], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "error", timeout=10, raise_on_timeout=False)
           
         response = requests.get(API_URL_TOPO)
         data = response.json()
@@ -794,7 +808,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[1000,2000]], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "up", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -826,7 +841,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "error", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -845,7 +861,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:50", [[1,4000]])
 
         # now we can assert
         assert l2vpn_response.get("status") == "error", l2vpn_response
@@ -875,7 +891,8 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:40", [], timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "error", timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -894,7 +911,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port_vlan_range("urn:sdx:port:ampath.net:Ampath1:40", [[1,4000]])
 
         # now we can assert
         assert l2vpn_response.get("status") == "error", l2vpn_response
@@ -961,7 +978,11 @@ class TestE2ETopologyUseCases:
         l2vpn_id = response.json().get("service_id")
         
         # Wait for L2VPN to be provisioned
-        time.sleep(5)
+        wait_l2vpn(
+            l2vpn_id, status=None,
+            check=lambda l2vpn: l2vpn["status"] != "under provisioning",
+            timeout=15, raise_on_timeout=False,
+        )
 
         # before any extra check, remove the alien EVC to avoid error propagation
         response = requests.delete(f"{api_url_tenet_evc}/{alien_evc_id}")
@@ -1007,6 +1028,7 @@ class TestE2ETopologyUseCases:
         data = response.json()
         l2vpn_invalid_id = data.get("service_id")
 
+        # observe for a while to make sure the invalid L2VPN does not show up
         time.sleep(5)
 
         response = requests.get(API_URL)
@@ -1078,6 +1100,7 @@ class TestE2ETopologyUseCases:
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200
 
+        # observe for a while to make sure the invalid VLAN range is not applied
         time.sleep(5)
 
         response = requests.get(API_URL_TOPO)
@@ -1101,7 +1124,8 @@ class TestE2ETopologyUseCases:
         ampath2 = self.net.net.get('Ampath2')
         ampath2.intf(test_intf_name).ifconfig('down')
 
-        time.sleep(5)
+        wait_port_status("urn:sdx:port:ampath.net:Ampath2:40", "down", timeout=15, raise_on_timeout=False)
+        wait_l2vpn(l2vpn_id, "up", check=lambda l2vpn: l2vpn["current_path"] != first_path, timeout=10, raise_on_timeout=False)
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -1120,7 +1144,7 @@ class TestE2ETopologyUseCases:
 
         ampath2.intf(test_intf_name).ifconfig('up')
 
-        time.sleep(5)
+        wait_port_status("urn:sdx:port:ampath.net:Ampath2:40", "up")
 
         # Verifications
         found = False
@@ -1152,7 +1176,9 @@ class TestE2ETopologyUseCases:
         data = response.json()
         l2vpn_id = data.get("service_id")
 
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up")
+        wait_evc_count("ampath", 1)
+        wait_evc_count("sax", 1)
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
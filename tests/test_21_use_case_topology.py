@@ -8,12 +8,19 @@ changes, and topology element removals.
 
 import json
 import re
-import time
 from datetime import datetime, timedelta
 import pytest
 import requests
 
-from tests.helpers import NetworkTest
+from tests.waiters import (
+    topology_links,
+    topology_ports,
+    wait_kytos_sdx_topology,
+    wait_l2vpn,
+    wait_ping,
+    wait_port,
+    wait_topology,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
 API_URL = SDX_CONTROLLER + '/l2vpn/1.0'
@@ -36,20 +43,10 @@ UNI2HOST = {
 class TestE2ETopologyUseCases:
     net = None
 
-    @classmethod
-    def setup_method(cls):
-        """Set up the test environment with all OXPs before each test."""
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-        
-        # Give time for topology to be fully established
-        time.sleep(15)
-
     @classmethod
     def teardown_method(cls):
-        """Clean up the test environment."""
-        cls.net.stop()
+        """Undo the links, ports and metadata removed by the test."""
+        cls.net.reset()
 
     def create_new_l2vpn(self, vlan='100', node1='Ampath1', node2='Tenet01'):
         l2vpn_payload = {
@@ -70,7 +67,7 @@ class TestE2ETopologyUseCases:
         l2vpn_id = response.json().get("service_id")
 
         # Wait for L2VPN to be provisioned
-        time.sleep(5)
+        wait_l2vpn(l2vpn_id, "up")
 
         response = requests.get(API_URL)
         assert response.status_code == 200, response.text
@@ -89,8 +86,9 @@ class TestE2ETopologyUseCases:
         h2.cmd(f"ip addr add {add2}/24 dev vlan{vlan}")
 
         # test connectivity
+        wait_ping(h1, add2)
         assert ', 0% packet loss,' in h1.cmd(f"ping -c4 {add2}")
-        return {'id':l2vpn_id, 'data':l2vpn_data, 'h':h1, 'ping_str':f"ping -c4 {add2}"}
+        return {'id':l2vpn_id, 'data':l2vpn_data, 'h':h1, 'addr':add2, 'ping_str':f"ping -c4 {add2}"}
 
     @pytest.mark.xfail(reason="L2VPN remains up after a link is removed from topology and no alternate path exists")
     def test_080_link_missing(self):
@@ -132,16 +130,21 @@ class TestE2ETopologyUseCases:
 
         # Disabling link
         self.net.net.configLinkStatus('Tenet01', 'Tenet03', 'down')
-        api_url_disable = f'{api_url_tenet}/{link_id}/disable'
-        response = requests.post(api_url_disable)
+        response = self.net.kytos_request('tenet', 'POST', f'links/{link_id}/disable')
         assert response.status_code == 201, response.text
     
         # Deleting link
-        api_url = f'{api_url_tenet}/{link_id}'
-        response = requests.delete(api_url)
+        response = self.net.kytos_request('tenet', 'DELETE', f'links/{link_id}')
         assert response.status_code == 200, response.text
-            
-        time.sleep(15) 
+
+        wait_topology(
+            lambda topo: float(topo["version"]) > initial_version
+            and link_name not in topology_links(topo),
+            desc=f"link {link_name} to be removed",
+            timeout=20,
+            raise_on_timeout=False,
+        )
+        wait_l2vpn(l2vpn_id, "down", timeout=10, raise_on_timeout=False)
     
         # Verify topology version increased
         updated_topology = requests.get(API_URL_TOPO).json()
@@ -211,16 +214,19 @@ class TestE2ETopologyUseCases:
 
         # Disabling link
         self.net.net.configLinkStatus('Tenet01', 'Tenet02', 'down')
-        api_url_disable = f'{api_url_tenet}/{link_id}/disable'
-        response = requests.post(api_url_disable)
+        response = self.net.kytos_request('tenet', 'POST', f'links/{link_id}/disable')
         assert response.status_code == 201, response.text
     
         # Deleting link
-        api_url = f'{api_url_tenet}/{link_id}'
-        response = requests.delete(api_url)
+        response = self.net.kytos_request('tenet', 'DELETE', f'links/{link_id}')
         assert response.status_code == 200, response.text
-            
-        time.sleep(15) 
+
+        wait_topology(
+            lambda topo: float(topo["version"]) > initial_version
+            and link_name not in topology_links(topo),
+            desc=f"link {link_name} to be removed",
+        )
+        wait_l2vpn(l2vpn_id, "up")
     
         # Verify topology version increased
         updated_topology = requests.get(API_URL_TOPO).json()
@@ -264,27 +270,28 @@ class TestE2ETopologyUseCases:
         assert port_found
 
         interfaces_id = "cc:00:00:00:00:00:00:08:50"
-        tenet_api = KYTOS_API % 'tenet'
-        api_url_tenet_interface = f'{tenet_api}/topology/v3/interfaces'
         
         # Disabling interfaces
         node.cmd(f'ip link set dev {endp} down')
-        api_url = f'{api_url_tenet_interface}/{interfaces_id}/disable'
-        response = requests.post(api_url)
+        response = self.net.kytos_request('tenet', 'POST', f'interfaces/{interfaces_id}/disable')
         assert response.status_code == 200, response.text
 
         # Deleting interfaces
-        api_url = f'{api_url_tenet_interface}/{interfaces_id}'
-        response = requests.delete(api_url)
+        response = self.net.kytos_request('tenet', 'DELETE', f'interfaces/{interfaces_id}')
         assert response.status_code == 200, response.text
         
-        time.sleep(5)
-        
         # Force to send the topology to the SDX-LC
         sdx_api = KYTOS_SDX_API % 'tenet'
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200
 
+        wait_topology(
+            lambda topo: port_id_missing not in topology_ports(topo),
+            desc=f"port {port_id_missing} to be removed",
+            timeout=15,
+            raise_on_timeout=False,
+        )
+
         # Verify the topology to confirm interface is not listed anymore.
         response = requests.get(API_URL_TOPO)
         assert response.status_code == 200, response.text
@@ -326,19 +333,24 @@ class TestE2ETopologyUseCases:
                 assert link['status'] == 'up'
                 break
         
-        ampath_api = KYTOS_API % 'ampath'
-        api_url_ampath = f'{ampath_api}/topology/v3'
-        response = requests.delete(f"{api_url_ampath}/interfaces/{interfaces_id}/metadata/sdx_nni")
+        response = self.net.kytos_request('ampath', 'DELETE', f"interfaces/{interfaces_id}/metadata/sdx_nni")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        nni_removed = lambda port: port["nni"] == ""
+        port_id = "urn:sdx:port:ampath.net:Ampath1:40"
+        wait_kytos_sdx_topology(
+            "ampath",
+            lambda topo: nni_removed(topology_ports(topo)[port_id]),
+            timeout=15,
+            raise_on_timeout=False,
+        )
 
         # Force to send the topology to the SDX-LC
         sdx_api = KYTOS_SDX_API % 'ampath'
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port(port_id, nni_removed, timeout=15, raise_on_timeout=False)
 
         response = requests.get(f"{sdx_api}/topology/2.0.0")
         kytos_topo = response.json()
@@ -396,19 +408,24 @@ class TestE2ETopologyUseCases:
                 assert link['status'] == 'up'
                 break
         
-        ampath_api = KYTOS_API % 'ampath'
-        api_url_ampath = f'{ampath_api}/topology/v3'
-        response = requests.delete(f"{api_url_ampath}/interfaces/{interfaces_id}/metadata/sdx_nni")
+        response = self.net.kytos_request('ampath', 'DELETE', f"interfaces/{interfaces_id}/metadata/sdx_nni")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        nni_removed = lambda port: port["nni"] == ""
+        port_id = "urn:sdx:port:ampath.net:Ampath1:40"
+        wait_kytos_sdx_topology(
+            "ampath",
+            lambda topo: nni_removed(topology_ports(topo)[port_id]),
+            timeout=15,
+            raise_on_timeout=False,
+        )
 
         # Force to send the topology to the SDX-LC
         sdx_api = KYTOS_SDX_API % 'ampath'
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port(port_id, nni_removed, timeout=15, raise_on_timeout=False)
 
         response = requests.get(f"{sdx_api}/topology/2.0.0")
         kytos_topo = response.json()
@@ -449,19 +466,29 @@ class TestE2ETopologyUseCases:
         # removed!
         sax_port_name = 'Sax01-eth40'
         sax_intf_id = "dd:00:00:00:00:00:00:04:40"
-        sax_api = KYTOS_API % 'sax'
-        api_url_sax = f'{sax_api}/topology/v3'
-        response = requests.delete(f"{api_url_sax}/interfaces/{sax_intf_id}/metadata/sdx_nni")
+        response = self.net.kytos_request('sax', 'DELETE', f"interfaces/{sax_intf_id}/metadata/sdx_nni")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        port_id = "urn:sdx:port:sax.net:Sax01:40"
+        wait_kytos_sdx_topology(
+            "sax",
+            lambda topo: nni_removed(topology_ports(topo)[port_id]),
+            timeout=15,
+            raise_on_timeout=False,
+        )
 
         # Force to send the topology to the SDX-LC
         sdx_api = KYTOS_SDX_API % 'sax'
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200, response.text
 
-        time.sleep(5)
+        wait_port(port_id, nni_removed, timeout=15, raise_on_timeout=False)
+        wait_topology(
+            lambda topo: all(link["name"] != link_name for link in topo["links"]),
+            desc=f"link {link_name} to be removed",
+            timeout=15,
+            raise_on_timeout=False,
+        )
 
         response = requests.get(f"{sdx_api}/topology/2.0.0")
         kytos_topo = response.json()
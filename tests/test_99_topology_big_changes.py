@@ -1,6 +1,5 @@
 import json
 import re
-import time
 from datetime import datetime, timedelta
 from pytest_unordered import unordered
 
@@ -8,42 +7,44 @@ import pytest
 from random import randrange
 import requests
 
-from tests.helpers import NetworkTest
+from tests.topo_watcher import TopologyWatcher
+from tests.waiters import (
+    get_json,
+    wait_kytos_sdx_topology,
+    wait_until,
+)
 
 SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
 KYTOS_TOPO_API = "http://%s:8181/api/kytos/topology/v3"
 KYTOS_SDX_API  = "http://%s:8181/api/kytos/sdx"
 KYTOS_API = 'http://%s:8181/api/kytos'
 
+@pytest.mark.fresh_network
 class TestE2ETopologyBigChanges:
     net = None
 
-    @classmethod
-    def setup_class(cls):
-        cls.net = NetworkTest(["ampath", "sax", "tenet"])
-        cls.net.wait_switches_connect()
-        cls.net.run_setup_topo()
-
-    @classmethod
-    def teardown_class(cls):
-        cls.net.stop()
-
     def test_040_add_intra_link_check_topology(self):
         """ Add an intra-domain Link and see how SDX controller exports the topology"""
         api_url = SDX_CONTROLLER + '/topology'
         response = requests.get(api_url)
         data = response.json()
         len_links_controller = len(data["links"])
+        watcher = TopologyWatcher()
 
         new_link = self.net.net.addLink('Tenet02', 'Tenet03', port1=3, port2=3)
         new_link.intf1.node.attach(new_link.intf1.name)
         new_link.intf2.node.attach(new_link.intf2.name)
+        new_intfs = {new_link.intf1.name, new_link.intf2.name}
 
-        # give time so that messages are propagated
-        time.sleep(15)
+        # wait until the new interfaces are known by Kytos
+        tenet_topo_api = KYTOS_TOPO_API % 'tenet'
+        wait_until(
+            lambda: get_json(f"{tenet_topo_api}/interfaces")["interfaces"],
+            lambda intfs: new_intfs <= {intf["name"] for intf in intfs.values()},
+            desc=f"interfaces {new_intfs} on tenet",
+        )
     
         # Enable interfaces and links
-        tenet_topo_api = KYTOS_TOPO_API % 'tenet'
         response = requests.get(f"{tenet_topo_api}/switches")
         assert response.status_code == 200
         switches = response.json()["switches"]
@@ -54,7 +55,15 @@ class TestE2ETopologyBigChanges:
             response = requests.post(f"{tenet_topo_api}/interfaces/switch/{sw_id}/enable")
             assert response.status_code == 200, response.text
 
-        time.sleep(10)   # Allow time for Kytos to discover the new link
+        # wait for Kytos to discover the new link
+        wait_until(
+            lambda: get_json(f"{tenet_topo_api}/links")["links"],
+            lambda links: any(
+                {link["endpoint_a"]["name"], link["endpoint_b"]["name"]} == new_intfs
+                for link in links.values()
+            ),
+            desc=f"link {new_intfs} on tenet",
+        )
 
         response = requests.get(f"{tenet_topo_api}/links")
         assert response.status_code == 200
@@ -63,15 +72,23 @@ class TestE2ETopologyBigChanges:
             response = requests.post(f"{tenet_topo_api}/links/{link_id}/enable")
             assert response.status_code == 201
     
-        # give time for Kytos to process topology update
-        time.sleep(5)
-
+        # wait for Kytos to process topology update
         sdx_api = KYTOS_SDX_API % 'tenet'
+        new_ports = {"urn:sdx:port:tenet.ac.za:Tenet02:3", "urn:sdx:port:tenet.ac.za:Tenet03:3"}
+        wait_kytos_sdx_topology(
+            "tenet",
+            lambda topo: any(
+                set(link["ports"]) == new_ports and link["status"] == "up"
+                for link in topo["links"]
+            ),
+            desc="new link Tenet02/3_Tenet03/3 exported by tenet",
+        )
+
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200
 
-        # give time so that messages are propagated
-        time.sleep(15)
+        # wait until the SDX-Controller gets the new link
+        watcher.wait_propagated("tenet")
 
         response = requests.get(api_url)
         data = response.json()
@@ -126,6 +143,7 @@ class TestE2ETopologyBigChanges:
        response = requests.get(api_url)
        data = response.json()
        len_links_controller = len(data['links'])
+       watcher = TopologyWatcher()
 
        sdx_api = KYTOS_SDX_API % 'tenet'
        response = requests.get(f"{sdx_api}/topology/2.0.0")
@@ -165,8 +183,12 @@ class TestE2ETopologyBigChanges:
        data = response.json()
        assert link_id not in data["links"]
 
-       # give time so that messages are propagated
-       time.sleep(5)
+       # wait until the link is no longer exported by Kytos
+       wait_kytos_sdx_topology(
+           "tenet",
+           lambda topo: len(topo["links"]) == len_links_kytos_sdx_api-1,
+           raise_on_timeout=False,
+       )
        
        # Force to send the topology to the SDX-LC
        response = requests.post(f"{sdx_api}/topology/2.0.0")
@@ -176,8 +198,8 @@ class TestE2ETopologyBigChanges:
        data = response.json()
        assert len(data['links']) == len_links_kytos_sdx_api-1
 
-       # give time so that messages are propagated
-       time.sleep(15)
+       # wait until the SDX-Controller removes the link
+       watcher.wait_propagated("tenet")
     
        # Verify absence of link with SDX_CONTROLLER
        api_url = SDX_CONTROLLER + '/topology'
@@ -415,6 +437,7 @@ class TestE2ETopologyBigChanges:
         data = response.json()
         ports = {port["id"]: port for node in data["nodes"] for port in node["ports"]}
         len_ports_controller = len(ports)
+        watcher = TopologyWatcher()
 
         sdx_api = KYTOS_SDX_API % 'ampath'
         response = requests.get(f"{sdx_api}/topology/2.0.0")
@@ -429,8 +452,13 @@ class TestE2ETopologyBigChanges:
         new_link.intf1.node.attach(new_link.intf1.name)
         new_link.intf2.node.attach(new_link.intf2.name)
 
-        # give time so that messages are propagated
-        time.sleep(15)
+        # wait until the new ports are exported by Kytos
+        wait_kytos_sdx_topology(
+            "ampath",
+            lambda topo: {'Ampath1-eth60', 'Ampath2-eth60'} <= {
+                port['name'] for node in topo['nodes'] for port in node['ports']
+            },
+        )
 
         response = requests.post(f"{sdx_api}/topology/2.0.0")
         assert response.status_code == 200
@@ -442,8 +470,8 @@ class TestE2ETopologyBigChanges:
         assert 'Ampath1-eth60' in ports, str(ports)
         assert 'Ampath2-eth60' in ports, str(ports)
 
-        # give time so that messages are propagated
-        time.sleep(15)
+        # wait until the SDX-Controller gets the new ports
+        watcher.wait_propagated("ampath")
 
         response = requests.get(api_url)
         data = response.json()
@@ -0,0 +1,160 @@
+"""Watch topology versions along the OXP -> SDX-LC -> SDX-Controller pipeline.
+
+Each OXP (Kytos + sdx napp) exports its topology with a `version`, the SDX-LC
+keeps the last topology it received from the OXP and the SDX-Controller merges
+all of them in an aggregate topology with its own `version`. The watcher
+records those versions and blocks until a new OXP version has reached the
+SDX-Controller, measuring how long each hop took.
+
+Usage:
+
+    watcher = TopologyWatcher()
+    ... change something on the ampath OXP ...
+    hops = watcher.wait_propagated("ampath")
+"""
+import logging
+import time
+
+from tests.waiters import (
+    DEFAULT_TIMEOUT,
+    OXPS,
+    get_json,
+    get_kytos_sdx_topology,
+    get_topology,
+    wait_until,
+)
+
+SDX_LC_API = 'http://%s-lc:8080/SDX-LC/2.0.0'
+
+logger = logging.getLogger(__name__)
+
+# propagation lags measured during the test session, reported by conftest
+PROPAGATION_LAGS = []
+
+
+def _version(topology):
+    return float(topology["version"])
+
+
+def _domain(topology):
+    """Return the domain of an OXP topology (urn:sdx:topology:<domain>)."""
+    return topology["id"].split(":")[-1]
+
+
+def domain_view(topology, domain):
+    """Project the nodes, ports and intra-domain links of `domain`.
+
+    The projection only keeps attributes that the SDX-Controller preserves
+    when merging the OXP topology, so it can be compared on both sides.
+    """
+    nodes = [node for node in topology["nodes"] if f":{domain}:" in node["id"]]
+    return {
+        "nodes": sorted(node["id"] for node in nodes),
+        "ports": {
+            port["id"]: port["status"] for node in nodes for port in node["ports"]
+        },
+        "links": {
+            link["id"]: link["status"] for link in topology["links"]
+            if link["id"].startswith(f"urn:sdx:link:{domain}:")
+        },
+    }
+
+
+def get_lc_topology(oxp):
+    return get_json(f"{SDX_LC_API % oxp}/topology")
+
+
+class TopologyWatcher:
+    """Record topology versions and wait for OXP updates to propagate."""
+
+    def __init__(self, oxps=OXPS):
+        self.oxps = list(oxps)
+        self.versions = {}
+        self.record()
+
+    def _safe_version(self, fetch, *args):
+        try:
+            return _version(fetch(*args))
+        except Exception:
+            return None
+
+    def record(self):
+        """Record the current version of each OXP and of the aggregate topology."""
+        self.versions = {"controller": self._safe_version(get_topology)}
+        for oxp in self.oxps:
+            self.versions[oxp] = self._safe_version(get_kytos_sdx_topology, oxp)
+        return dict(self.versions)
+
+    def wait_oxp(self, oxp, **kwargs):
+        """Wait until the OXP exports a version different from the recorded one."""
+        kwargs.setdefault("desc", f"{oxp} topology version != {self.versions.get(oxp)}")
+        topology = wait_until(
+            lambda: get_kytos_sdx_topology(oxp),
+            lambda topo: _version(topo) != self.versions.get(oxp),
+            **kwargs,
+        )
+        return _version(topology)
+
+    def wait_propagated(self, oxp, version=None, timeout=DEFAULT_TIMEOUT):
+        """Block until `version` of the OXP topology reached the SDX-Controller.
+
+        If `version` is not given, wait for the OXP to export a new version
+        first. The SDX-LC hop is only measured if its API is reachable. The
+        controller hop is considered done when the aggregate version moved
+        forward and the domain part of the aggregate topology matches what
+        the OXP exports. Returns the per-hop lag (in seconds).
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        if version is None:
+            version = self.wait_oxp(oxp, timeout=timeout)
+        oxp_topology = get_kytos_sdx_topology(oxp)
+        domain = _domain(oxp_topology)
+        kytos_at = time.monotonic()
+
+        controller_version = self.versions.get("controller") or 0
+        expected = domain_view(oxp_topology, domain)
+        seen = {}
+
+        def fetch():
+            # the SDX-LC hop is measured on a best-effort basis
+            if "lc" not in seen:
+                lc_version = self._safe_version(get_lc_topology, oxp)
+                if lc_version is not None and lc_version >= float(version):
+                    seen["lc"] = time.monotonic()
+            return get_topology()
+
+        topology = wait_until(
+            fetch,
+            lambda topo: _version(topo) > controller_version
+            and domain_view(topo, domain) == expected,
+            timeout=max(deadline - time.monotonic(), 0),
+            desc=f"{oxp} topology version {version} on the SDX-Controller",
+        )
+        controller_at = time.monotonic()
+        lc_at = seen.get("lc")
+
+        hops = {
+            "oxp": oxp,
+            "version": version,
+            "controller_version": _version(topology),
+            "kytos": kytos_at - start,
+            "kytos_to_lc": lc_at - kytos_at if lc_at else None,
+            "lc_to_controller": controller_at - (lc_at or kytos_at),
+            "total": controller_at - start,
+        }
+        PROPAGATION_LAGS.append(hops)
+        logger.info("topology propagation %s", format_lag(hops))
+        self.versions[oxp] = float(version)
+        self.versions["controller"] = hops["controller_version"]
+        return hops
+
+
+def format_lag(hops):
+    def fmt(value):
+        return "n/a" if value is None else f"{value:.2f}s"
+    return (
+        f"{hops['oxp']} v{hops['version']} -> controller v{hops['controller_version']}:"
+        f" kytos={fmt(hops['kytos'])} kytos->lc={fmt(hops['kytos_to_lc'])}"
+        f" lc->controller={fmt(hops['lc_to_controller'])} total={fmt(hops['total'])}"
+    )
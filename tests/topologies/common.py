@@ -0,0 +1,488 @@
+"""Helpers shared by the topologies.
+
+KytosProvisioner and provision_topo()/push_topology() provision the Kytos
+OXPs and expected_topology() lists what each OXP should then discover.
+TopologyBuilder names and wires the switches after OXP_PROFILES into a
+description that build_net() turns into a Mininet network (BatchLink
+creates the veths in batches), and shape_intf() limits a port to its
+PORT_SPEEDS rate.
+"""
+import logging
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from mininet.link import Link
+from mininet.net import Mininet
+from mininet.node import RemoteController, OVSSwitch
+from requests.adapters import HTTPAdapter
+
+from tests.waiters import wait_topology, wait_until
+
+KYTOS_TOPO_API = "http://%s:8181/api/kytos/topology/v3"
+KYTOS_SDX_API = "http://%s:8181/api/kytos/sdx"
+MAX_WORKERS = 4
+REQUEST_TIMEOUT = 30
+
+logger = logging.getLogger(__name__)
+
+
+class KytosProvisioner:
+    """Run Kytos API calls concurrently across the OXPs.
+
+    Each OXP gets its own keep-alive session and a bounded worker pool, so
+    the calls to one OXP do not wait for the others and a single OXP is never
+    flooded with more than `max_workers` requests in flight. Every call is
+    timed and logged.
+    """
+
+    def __init__(self, oxps, max_workers=MAX_WORKERS):
+        self.sessions = {}
+        self.pools = {}
+        for oxp in oxps:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount("http://", adapter)
+            self.sessions[oxp] = session
+            self.pools[oxp] = ThreadPoolExecutor(max_workers, thread_name_prefix=f"kytos-{oxp}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.shutdown(wait=True)
+        for session in self.sessions.values():
+            session.close()
+
+    def request(self, oxp, method, url, **kwargs):
+        """Send a request to the OXP through its session and log how long it took."""
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        start = time.monotonic()
+        response = self.sessions[oxp].request(method, url, **kwargs)
+        logger.debug(
+            "%s %s %s -> %s in %.1f ms", oxp, method, url,
+            response.status_code, (time.monotonic() - start) * 1000,
+        )
+        return response
+
+    def get(self, oxp, url, **kwargs):
+        return self.request(oxp, "GET", url, **kwargs)
+
+    def post(self, oxp, url, **kwargs):
+        return self.request(oxp, "POST", url, **kwargs)
+
+    def run(self, jobs, desc="provisioning"):
+        """Run jobs concurrently and return their results in order.
+
+        `jobs` is an iterable of (oxp, func, *args) tuples. func(*args) runs
+        on the worker pool of the OXP. All jobs are waited for and the first
+        exception raised by any of them is re-raised.
+        """
+        start = time.monotonic()
+        futures = [self.pools[oxp].submit(func, *args) for oxp, func, *args in jobs]
+        results, error = [], None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                results.append(None)
+                error = error or exc
+        logger.info("%s: %d calls in %.2f s", desc, len(futures), time.monotonic() - start)
+        if error is not None:
+            raise error
+        return results
+
+
+# naming, addressing and default location of the switches of each OXP
+OXP_PROFILES = {
+    "ampath": {
+        "domain": "ampath.net", "prefix": "Ampath", "dpid": "aa", "listen_port": 10000,
+        "location": (25.77, -80.19), "address": "Miami", "iso3166_2_lvl4": "US-FL",
+    },
+    "sax": {
+        "domain": "sax.net", "prefix": "Sax", "dpid": "dd", "listen_port": 11000,
+        "location": (-3.73, -38.52), "address": "Fortaleza", "iso3166_2_lvl4": "BR-CE",
+    },
+    "tenet": {
+        "domain": "tenet.ac.za", "prefix": "Tenet", "dpid": "cc", "listen_port": 12000,
+        "location": (-33.92, 18.42), "address": "CapeTown", "iso3166_2_lvl4": "ZA-WC",
+    },
+}
+UNI_PORT = 50
+MAX_SWITCHES = 999
+MAX_INTF_NAME = 15
+# Mbit/s of the SDX port types
+PORT_SPEEDS = {
+    "100FE": 100,
+    "1GE": 1000,
+    "10GE": 10000,
+    "25GE": 25000,
+    "40GE": 40000,
+    "50GE": 50000,
+    "100GE": 100000,
+    "400GE": 400000,
+}
+
+
+class TopologyBuilder:
+    """Build a topology description (see build_net()) switch by switch.
+
+    Switches are named, numbered and addressed after their OXP profile
+    (Ampath1, dpid aa00000000000001, ...), each one gets `hosts` hosts on
+    ports 50, 51, ... and the links use the next free port of each switch.
+    Links between OXPs get the sdx_nni metadata on both ends.
+    """
+
+    def __init__(self, hosts=1):
+        self.hosts_per_switch = hosts
+        self.switches, self.hosts, self.links = [], [], []
+        self.metadata = {}
+        self._switches = {}
+        self._next_port = {}
+
+    def add_switch(self, oxp, lat, lng, address=None, iso3166_2_lvl4=None):
+        profile = OXP_PROFILES[oxp]
+        metadata = self.metadata.setdefault(oxp, {})
+        num = sum(1 for sw in self.switches if sw["oxp"] == oxp) + 1
+        if num > MAX_SWITCHES:
+            raise ValueError(f"{oxp} can not have more than {MAX_SWITCHES} switches")
+        name = f"{profile['prefix']}{num}"
+        switch = {
+            "name": name,
+            "oxp": oxp,
+            "dpid": f"{profile['dpid']}{num:014x}",
+            "listen_port": profile["listen_port"] + num,
+        }
+        self.switches.append(switch)
+        self._switches[name] = switch
+        self._next_port[name] = 1
+        metadata[f"switches/{dpid_to_id(switch['dpid'])}"] = {
+            "lat": lat,
+            "lng": lng,
+            "address": address or profile["address"],
+            "iso3166_2_lvl4": iso3166_2_lvl4 or profile["iso3166_2_lvl4"],
+        }
+        for h in range(self.hosts_per_switch):
+            num = len(self.hosts) + 1
+            self.hosts.append({
+                "name": f"h{num}",
+                "mac": "00:00:00:%02x:%02x:%02x" % (num >> 16, (num >> 8) & 0xff, num & 0xff),
+                "switch": name,
+                "port": UNI_PORT + h,
+            })
+        return name
+
+    def _alloc_port(self, name):
+        port = self._next_port[name]
+        self._next_port[name] = port + 1
+        if UNI_PORT <= port < UNI_PORT + self.hosts_per_switch:
+            return self._alloc_port(name)
+        if len(f"{name}-eth{port}") > MAX_INTF_NAME:
+            raise ValueError(f"Too many links on {name}: interface names are limited to {MAX_INTF_NAME} chars")
+        return port
+
+    def add_link(self, sw1, sw2):
+        port1, port2 = self._alloc_port(sw1), self._alloc_port(sw2)
+        self.links.append({"node1": sw1, "port1": port1, "node2": sw2, "port2": port2})
+        switch1, switch2 = self._switches[sw1], self._switches[sw2]
+        if switch1["oxp"] != switch2["oxp"]:
+            for (sw, port), (peer, peer_port) in [
+                ((switch1, port1), (switch2, port2)),
+                ((switch2, port2), (switch1, port1)),
+            ]:
+                self.metadata[sw["oxp"]][f"interfaces/{dpid_to_id(sw['dpid'])}:{port}"] = {
+                    "sdx_nni": f"{OXP_PROFILES[peer['oxp']]['domain']}:{peer['name']}:{peer_port}",
+                }
+        return port1, port2
+
+    def description(self, **extra):
+        return {
+            **extra,
+            "switches": self.switches,
+            "hosts": self.hosts,
+            "links": self.links,
+            "metadata": self.metadata,
+        }
+
+
+def parse_params(text):
+    """Parse topology params given as "key=value,key=value" (e.g. from the CLI)."""
+    params = {}
+    for item in filter(None, (text or "").split(",")):
+        key, _, value = item.partition("=")
+        params[key.strip()] = int(value) if value.strip().lstrip("-").isdigit() else value.strip()
+    return params
+
+
+def dpid_to_id(dpid):
+    """aa00000000000001 -> aa:00:00:00:00:00:00:01 (the Kytos switch id)"""
+    return ":".join(dpid[i:i + 2] for i in range(0, len(dpid), 2))
+
+
+class BatchLink(Link):
+    """A Mininet link whose veth pair is created later, by create_veths()."""
+
+    @staticmethod
+    def makeIntfPair(*args, **kwargs):
+        pass
+
+
+def create_veths(links):
+    """Create the veth pairs of BatchLinks with a single `ip -batch`.
+
+    Both ends are created in the root namespace with the MAC addresses
+    Mininet picked, ends of nodes living in a namespace (the hosts) are moved
+    into it and the others (the switch ports) are set up. Hosts bring their
+    interfaces up when configured by Mininet.build().
+    """
+    commands = []
+    for link in links:
+        commands.append(
+            f"link add name {link.intf1.name} address {link.intf1.mac} "
+            f"type veth peer name {link.intf2.name} address {link.intf2.mac}"
+        )
+        for intf in (link.intf1, link.intf2):
+            if intf.node.inNamespace:
+                commands.append(f"link set dev {intf.name} netns {intf.node.pid}")
+            else:
+                commands.append(f"link set dev {intf.name} up")
+    result = subprocess.run(
+        ["ip", "-batch", "-"], input="\n".join(commands) + "\n",
+        capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise Exception(f"Error creating veth pairs: {result.stderr}")
+
+
+def shape_intf(intf, mbps):
+    """Limit the egress rate of an interface, as TCLink(bw=mbps) does."""
+    intf.cmd(f"tc qdisc del dev {intf} root")
+    intf.cmd(f"tc qdisc add dev {intf} root handle 5:0 htb default 1")
+    intf.cmd(f"tc class add dev {intf} parent 5:0 classid 5:1 htb rate {mbps}Mbit burst 15k")
+
+
+def build_net(description, controllers):
+    """Create the Mininet network of a topology description.
+
+    `description` has the switches (name, oxp, dpid, listen_port), hosts
+    (name, mac, switch, port) and links (node1, port1, node2, port2) of the
+    topology, `controllers` maps each OXP to its Kytos address. The
+    description is kept in `net.description` for setup_topo.
+
+    Adding links and starting switches one at a time runs several ip/ovs-vsctl
+    commands per element, so the veth pairs are created with one `ip -batch`
+    and the bridges, ports and controllers with a few ovs-vsctl transactions
+    (OVSSwitch batch startup). The duration of each phase is kept in
+    `net.build_times`.
+    """
+    build_times = {}
+    start = time.monotonic()
+
+    def phase(name):
+        nonlocal start
+        now = time.monotonic()
+        build_times[name] = now - start
+        start = now
+
+    net = Mininet(topo=None, build=False, controller=RemoteController, switch=OVSSwitch)
+    ctrls = {}
+    for oxp in sorted({sw["oxp"] for sw in description["switches"]}):
+        ctrls[oxp] = net.addController(f"{oxp}_ctrl", controller=RemoteController, ip=controllers[oxp], port=6653)
+        ctrls[oxp].start()
+    for sw in description["switches"]:
+        net.addSwitch(sw["name"], listenPort=sw["listen_port"], dpid=sw["dpid"], oxp=sw["oxp"], batch=True)
+    for host in description["hosts"]:
+        net.addHost(host["name"], mac=host["mac"])
+    phase("nodes")
+
+    # interfaces are brought up by create_veths()/build(), not one by one
+    options = {"cls": BatchLink, "params1": {"up": None}, "params2": {"up": None}}
+    for host in description["hosts"]:
+        net.addLink(host["name"], host["switch"], port1=1, port2=host["port"], **options)
+    for link in description["links"]:
+        net.addLink(link["node1"], link["node2"], port1=link["port1"], port2=link["port2"], **options)
+    create_veths(net.links)
+    phase("links")
+
+    switches = [net.get(sw["name"]) for sw in description["switches"]]
+    for sw, desc in zip(switches, description["switches"]):
+        sw.start([ctrls[desc["oxp"]]])
+    OVSSwitch.batchStartup(switches)
+    phase("switches")
+
+    net.build()
+    phase("hosts")
+    logger.info(
+        "Built %d switches, %d links: %s", len(switches), len(net.links),
+        ", ".join(f"{name} {duration:.2f}s" for name, duration in build_times.items()),
+    )
+    net.build_times = build_times
+    net.description = description
+    return net
+
+
+def expected_topology(net):
+    """Return the switches and links each OXP should discover, from the Mininet net.
+
+    Switches are assigned to an OXP through the `oxp` param given to
+    addSwitch(). Links between switches of the same OXP are intra-domain
+    links (discovered by Kytos through LLDP), the others are inter-domain
+    links (announced through the sdx_nni metadata).
+    """
+    switches, links, inter_links = {}, {}, []
+    for sw in net.switches:
+        switches.setdefault(sw.params["oxp"], []).append(sw.name)
+    for link in net.links:
+        node1, node2 = link.intf1.node, link.intf2.node
+        oxp1, oxp2 = node1.params.get("oxp"), node2.params.get("oxp")
+        if oxp1 is None or oxp2 is None:
+            continue
+        if oxp1 == oxp2:
+            links.setdefault(oxp1, []).append({link.intf1.name, link.intf2.name})
+        else:
+            inter_links.append({link.intf1.name, link.intf2.name})
+    return switches, links, inter_links
+
+
+def provision_topo(controllers, net, metadata, push=True):
+    """Enable the topology on the Kytos OXPs and push it to the SDX-Controller.
+
+    `controllers` maps each OXP to its Kytos address and `metadata` maps each
+    OXP to the switch/interface metadata to post (location, sdx_nni). With
+    push=False the OXPs are left ready, but their topology is not sent (see
+    push_topology()).
+    """
+    topo_apis = {oxp: KYTOS_TOPO_API % ctrl for oxp, ctrl in controllers.items()}
+    sdx_apis = {oxp: KYTOS_SDX_API % ctrl for oxp, ctrl in controllers.items()}
+    expected_switches, expected_links, expected_inter_links = expected_topology(net)
+
+    with KytosProvisioner(topo_apis) as kytos:
+
+        def get_switches(oxp):
+            response = kytos.get(oxp, f"{topo_apis[oxp]}/switches")
+            assert response.status_code == 200
+            switches = response.json()["switches"]
+            assert len(switches) == len(expected_switches[oxp])
+            return switches
+
+        def enable_switch(oxp, sw_id):
+            response = kytos.post(oxp, f"{topo_apis[oxp]}/switches/{sw_id}/enable")
+            assert response.status_code == 201, response.text
+            response = kytos.post(oxp, f"{topo_apis[oxp]}/interfaces/switch/{sw_id}/enable")
+            assert response.status_code == 200, response.text
+
+        def wait_links(oxp):
+            return wait_until(
+                lambda: kytos.get(oxp, f"{topo_apis[oxp]}/links").json()["links"],
+                lambda links: all(
+                    any(
+                        {link["endpoint_a"]["name"], link["endpoint_b"]["name"]} == endpoints
+                        for link in links.values()
+                    )
+                    for endpoints in expected_links.get(oxp, [])
+                ),
+                desc=f"{oxp} to discover links {expected_links.get(oxp)}",
+            )
+
+        def enable_link(oxp, link_id):
+            response = kytos.post(oxp, f"{topo_apis[oxp]}/links/{link_id}/enable")
+            assert response.status_code == 201
+
+        def post_metadata(oxp, item, value):
+            response = kytos.post(oxp, f"{topo_apis[oxp]}/{item}/metadata", json=value)
+            assert 200 <= response.status_code < 300, response.text
+
+        def wait_sdx_topology(oxp):
+            num_nnis = sum(1 for item in metadata[oxp] if item.startswith("interfaces/"))
+            wait_until(
+                lambda: kytos.get(oxp, f"{sdx_apis[oxp]}/topology/2.0.0").json(),
+                lambda topo: len(topo["links"]) == len(expected_links.get(oxp, []))
+                and all(link["status"] == "up" for link in topo["links"])
+                and sum(
+                    1 for node in topo["nodes"] for port in node["ports"]
+                    if port["nni"].startswith("urn:sdx:port:")
+                ) == num_nnis,
+                desc=f"{oxp} SDX topology to be ready",
+            )
+
+        oxps = list(topo_apis)
+        all_switches = kytos.run([(oxp, get_switches, oxp) for oxp in oxps], "get switches")
+        kytos.run(
+            [
+                (oxp, enable_switch, oxp, sw_id)
+                for oxp, switches in zip(oxps, all_switches) for sw_id in switches
+            ],
+            "enable switches and interfaces",
+        )
+
+        # wait for link discovery (LLDP)
+        all_links = kytos.run([(oxp, wait_links, oxp) for oxp in oxps], "link discovery")
+        kytos.run(
+            [
+                (oxp, enable_link, oxp, link_id)
+                for oxp, links in zip(oxps, all_links) for link_id in links
+            ],
+            "enable links",
+        )
+
+        kytos.run(
+            [
+                (oxp, post_metadata, oxp, item, value)
+                for oxp, items in metadata.items() for item, value in items.items()
+            ],
+            "post metadata",
+        )
+
+        # wait for Kytos to process topology events: the SDX topology exported
+        # by each OXP has the NNIs configured and all intra-domain links up
+        kytos.run([(oxp, wait_sdx_topology, oxp) for oxp in oxps], "SDX topology readiness")
+
+    if push:
+        push_topology(controllers, net)
+    return True
+
+
+def push_topology(controllers, net, **kwargs):
+    """Send the topology of the OXPs to the SDX-LCs and wait for the SDX-Controller.
+
+    The wait ends once the SDX-Controller topology has every node, port and
+    link of the Mininet net.
+    """
+    sdx_apis = {oxp: KYTOS_SDX_API % ctrl for oxp, ctrl in controllers.items()}
+    expected_switches, expected_links, expected_inter_links = expected_topology(net)
+
+    with KytosProvisioner(sdx_apis) as kytos:
+
+        def send_topology(oxp):
+            response = kytos.post(oxp, f"{sdx_apis[oxp]}/topology/2.0.0")
+            assert response.ok, response.text
+
+        # send topology to SDX-LC
+        kytos.run([(oxp, send_topology, oxp) for oxp in sdx_apis], "send topology")
+
+    # converter imports this module
+    from tests.topologies.converter import port_id
+
+    # wait for SDX-Controller to process topology events
+    num_nodes = sum(len(switches) for switches in expected_switches.values())
+    num_links = sum(len(links) for links in expected_links.values()) + len(expected_inter_links)
+    expected_ports = {
+        port_id(sw, intf)
+        for sw in net.switches for intf in sw.intfList()
+        if intf.name != "lo" and intf.link is not None
+    }
+    kwargs.setdefault(
+        "desc",
+        f"SDX-Controller topology with {num_nodes} nodes, {len(expected_ports)} ports and {num_links} links",
+    )
+    return wait_topology(
+        lambda topo: len(topo["nodes"]) == num_nodes
+        and len(topo["links"]) == num_links
+        and {port["id"] for node in topo["nodes"] for port in node["ports"]} >= expected_ports,
+        **kwargs,
+    )
@@ -0,0 +1,160 @@
+"""Derive the SDX 2.0.0 topology each OXP is expected to export.
+
+The expected topology of an OXP (what Kytos returns on
+/api/kytos/sdx/topology/2.0.0) is built from the Mininet network and the
+metadata posted by setup_topo, so any topology (including generated ones)
+can be checked against the model, without hand-maintained fixtures:
+
+- one node per switch of the OXP, located by the switch metadata
+- one port per switch interface: the nni of a port is the id of its
+  intra-domain link, the sdx_nni metadata of the interface (inter-domain
+  links) or empty (UNIs)
+- one link per intra-domain link
+
+The OXP name and domain come from env/<oxp>.env (OXPO_NAME/OXPO_URL).
+Results are cached per topology definition.
+"""
+import copy
+import hashlib
+import json
+from pathlib import Path
+
+from tests.topologies.common import dpid_to_id
+
+ENV_DIR = Path(__file__).parents[2] / "env"
+MODEL_VERSION = "2.0.0"
+SERVICES = ["l2vpn-ptp"]
+VLAN_RANGE = [[1, 4094]]
+
+_cache = {}
+
+
+def read_env(name):
+    """Return the variables set by env/<name>.env (values are not expanded)."""
+    env = {}
+    for line in (ENV_DIR / f"{name}.env").read_text().splitlines():
+        if line.strip().startswith("#"):
+            continue
+        key, _, value = line.replace("export ", "", 1).partition("=")
+        env[key.strip()] = value.strip().strip('"')
+    return env
+
+
+def oxp_info(oxp):
+    """Return the name and domain of an OXP, as configured in its env file."""
+    env = read_env(oxp)
+    return {"name": env["OXPO_NAME"], "domain": env["OXPO_URL"]}
+
+
+def port_id(switch, intf):
+    """Return the SDX port id of the interface `intf` of a Mininet switch."""
+    domain = oxp_info(switch.params["oxp"])["domain"]
+    return f"urn:sdx:port:{domain}:{switch.name}:{switch.ports[intf]}"
+
+
+def definition(net, metadata):
+    """Describe the parts of the topology the conversion depends on."""
+    switches = sorted((sw.name, sw.params["oxp"], sw.dpid) for sw in net.switches)
+    links = sorted(
+        sorted([(l.intf1.node.name, l.intf1.name), (l.intf2.node.name, l.intf2.name)])
+        for l in net.links
+    )
+    return {"switches": switches, "links": links, "metadata": metadata}
+
+
+def sdx_port(domain, node, port, name, nni):
+    """Return the SDX port `port` (named `name`) of the node `node`."""
+    node_id = f"urn:sdx:node:{domain}:{node}"
+    return {
+        "id": f"urn:sdx:port:{domain}:{node}:{port}",
+        "name": name,
+        "node": node_id,
+        "type": "10GE",
+        "status": "up",
+        "state": "enabled",
+        "mtu": 1500,
+        "nni": nni,
+        "services": {"l2vpn-ptp": {"vlan_range": copy.deepcopy(VLAN_RANGE)}},
+        "entities": [],
+        "private": ["status"],
+    }
+
+
+def sdx_link(domain, endpoints):
+    """Return the SDX intra-domain link between two (node, port) endpoints."""
+    (sw1, port1), (sw2, port2) = sorted(endpoints, key=lambda ep: f"{ep[0]}/{ep[1]}")
+    name = f"{sw1}/{port1}_{sw2}/{port2}"
+    return {
+        "name": name,
+        "id": f"urn:sdx:link:{domain}:{name}",
+        "ports": [f"urn:sdx:port:{domain}:{sw1}:{port1}", f"urn:sdx:port:{domain}:{sw2}:{port2}"],
+        "type": "intra",
+        "bandwidth": 10,
+        "residual_bandwidth": 100,
+        "latency": 0,
+        "packet_loss": 0,
+        "availability": 100,
+        "status": "up",
+        "state": "enabled",
+        "private": ["packet_loss"],
+    }
+
+
+def convert_oxp(net, oxp, metadata):
+    """Return the SDX 2.0.0 topology the OXP is expected to export."""
+    info = oxp_info(oxp)
+    domain = info["domain"]
+    nodes, links = [], {}
+    for sw in net.switches:
+        if sw.params.get("oxp") != oxp:
+            continue
+        sw_id = dpid_to_id(sw.dpid)
+        location = metadata.get(f"switches/{sw_id}", {})
+        ports = []
+        for intf in sw.intfList():
+            if intf.name == "lo" or intf.link is None:
+                continue
+            port = sw.ports[intf]
+            peer = intf.link.intf2 if intf.link.intf1 is intf else intf.link.intf1
+            nni = ""
+            if peer.node.params.get("oxp") == oxp:
+                endpoints = [(sw.name, port), (peer.node.name, peer.node.ports[peer])]
+                link = sdx_link(domain, endpoints)
+                links[link["id"]] = link
+                nni = link["id"]
+            elif peer.node.params.get("oxp") is not None:
+                sdx_nni = metadata.get(f"interfaces/{sw_id}:{port}", {}).get("sdx_nni")
+                nni = f"urn:sdx:port:{sdx_nni}" if sdx_nni else ""
+            ports.append(sdx_port(domain, sw.name, port, intf.name, nni))
+        nodes.append({
+            "name": sw.name,
+            "id": f"urn:sdx:node:{domain}:{sw.name}",
+            "location": {
+                "address": location.get("address", ""),
+                "latitude": float(location.get("lat", 0)),
+                "longitude": float(location.get("lng", 0)),
+                "iso3166_2_lvl4": location.get("iso3166_2_lvl4", ""),
+                "private": [],
+            },
+            "ports": ports,
+            "status": "up",
+            "state": "enabled",
+        })
+    return {
+        "name": info["name"],
+        "id": f"urn:sdx:topology:{domain}",
+        "model_version": MODEL_VERSION,
+        "nodes": nodes,
+        "links": list(links.values()),
+        "services": list(SERVICES),
+    }
+
+
+def convert(net, metadata):
+    """Return the expected topology of each OXP, in the order of `metadata`."""
+    key = hashlib.sha256(
+        json.dumps(definition(net, metadata), sort_keys=True).encode()
+    ).hexdigest()
+    if key not in _cache:
+        _cache[key] = [convert_oxp(net, oxp, metadata[oxp]) for oxp in metadata]
+    return copy.deepcopy(_cache[key])
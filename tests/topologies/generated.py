@@ -0,0 +1,141 @@
+"""Parametric topologies, to measure how the SDX stack scales.
+
+The topology is generated from a few params:
+
+    oxps         number of OXPs (the first ones of ampath, sax, tenet)
+    switches     switches per OXP
+    shape        intra-domain shape: ring, mesh, tree or random
+    degree       average node degree of the random shape
+    inter_links  inter-domain links, spread over the OXP pairs
+                 (ampath-sax, sax-tenet). Default: 2 per pair
+    hosts        hosts per switch
+    seed         seed of the random shape
+
+Params are given to create_topo() (e.g. NetworkTest(..., topo_params=...))
+or through the TOPO_PARAMS environment variable ("switches=20,shape=mesh").
+DPIDs, OpenFlow listen ports, NNI metadata and locations are derived from
+them, following the naming of simple3oxps: the hosts of a switch are on
+ports 50, 51, ... (Ampath1-eth50 is the UNI of the first host of Ampath1)
+and the links, intra-domain or NNIs, take the other ports in order from 1,
+so a switch with many links also has link ports above the host ones.
+"""
+import math
+import os
+import random
+
+from tests.topologies.common import (
+    MAX_SWITCHES,
+    OXP_PROFILES,
+    TopologyBuilder,
+    build_net,
+    parse_params,
+    provision_topo,
+)
+from tests.topologies.converter import convert
+
+OXPS = list(OXP_PROFILES)
+SHAPES = ["ring", "mesh", "tree", "random"]
+DEFAULT_PARAMS = {
+    "oxps": 3,
+    "switches": 4,
+    "shape": "ring",
+    "degree": 3,
+    "inter_links": None,
+    "hosts": 1,
+    "seed": 0,
+}
+
+
+def get_params(**params):
+    """Return the generator params: defaults < TOPO_PARAMS env < `params`."""
+    result = dict(DEFAULT_PARAMS)
+    result.update(parse_params(os.environ.get("TOPO_PARAMS")))
+    result.update(params)
+    unknown = set(result) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown topology params: {sorted(unknown)}")
+    if not 1 <= result["oxps"] <= len(OXPS):
+        raise ValueError(f"oxps must be between 1 and {len(OXPS)}")
+    if not 1 <= result["switches"] <= MAX_SWITCHES:
+        raise ValueError(f"switches must be between 1 and {MAX_SWITCHES}")
+    if result["shape"] not in SHAPES:
+        raise ValueError(f"shape must be one of {SHAPES}")
+    if result["inter_links"] is None:
+        result["inter_links"] = 2 * (result["oxps"] - 1)
+    if result["oxps"] == 1 and result["inter_links"]:
+        raise ValueError("inter_links needs at least 2 oxps")
+    return result
+
+
+def intra_edges(count, shape, degree=3, seed=0):
+    """Return the intra-domain links, as (i, j) switch indexes, of a shape."""
+    if count < 2:
+        return []
+    if shape == "ring":
+        edges = [(i, i + 1) for i in range(count - 1)]
+        if count > 2:
+            edges.append((count - 1, 0))
+        return edges
+    if shape == "mesh":
+        return [(i, j) for i in range(count) for j in range(i + 1, count)]
+    if shape == "tree":
+        return [((i - 1) // 2, i) for i in range(1, count)]
+    # random: a random spanning tree plus random links up to the degree
+    rand = random.Random(seed)
+    edges = {(rand.randrange(i), i) for i in range(1, count)}
+    target = min(count * degree // 2, count * (count - 1) // 2)
+    while len(edges) < target:
+        i, j = sorted(rand.sample(range(count), 2))
+        edges.add((i, j))
+    return sorted(edges)
+
+
+def _locate(center, index, count):
+    """Spread the switches of an OXP over a circle around its location."""
+    angle = 2 * math.pi * index / count
+    radius = 0.5 + count / 50
+    return (
+        f"{center[0] + radius * math.sin(angle):.2f}",
+        f"{center[1] + radius * math.cos(angle):.2f}",
+    )
+
+
+def generate(**params):
+    """Return the description of a generated topology (see build_net())."""
+    params = get_params(**params)
+    oxps = OXPS[:params["oxps"]]
+    count = params["switches"]
+    builder = TopologyBuilder(hosts=params["hosts"])
+    names = {}
+    for oxp in oxps:
+        location = OXP_PROFILES[oxp]["location"]
+        names[oxp] = [builder.add_switch(oxp, *_locate(location, i, count)) for i in range(count)]
+        for i, j in intra_edges(count, params["shape"], params["degree"], params["seed"]):
+            builder.add_link(names[oxp][i], names[oxp][j])
+
+    # inter-domain links: the k-th link of an OXP pair connects the k-th switches
+    pairs = list(zip(oxps, oxps[1:]))
+    for k in range(params["inter_links"]):
+        (oxp1, oxp2), nth = pairs[k % len(pairs)], k // len(pairs)
+        builder.add_link(names[oxp1][nth % count], names[oxp2][nth % count])
+
+    return builder.description(params=params)
+
+
+def create_topo(*controllers_ip, **params):
+    """Create a generated topology, the OXPs use the controllers in order."""
+    description = generate(**params)
+    oxps = OXPS[:description["params"]["oxps"]]
+    if len(controllers_ip) < len(oxps):
+        raise ValueError(f"{len(oxps)} OXPs need {len(oxps)} controllers")
+    return build_net(description, dict(zip(oxps, controllers_ip)))
+
+
+def setup_topo(*controllers_ip, net):
+    """Enable the generated topology on the OXPs and push it to the SDX-Controller."""
+    oxps = list(net.description["metadata"])
+    return provision_topo(dict(zip(oxps, controllers_ip)), net, net.description["metadata"])
+
+
+def get_converted_topologies(net):
+    return convert(net, net.description["metadata"])
@@ -0,0 +1,93 @@
+"""SDX topologies of synthetic OXPs, with no Kytos nor Mininet behind them.
+
+The stack only runs three Kytos OXPs, so scale tests of the SDX-Controller
+use synthetic domains instead (benchmarks.mock_oxp). Domain i is named
+<prefix>NN.net and has `switches` switches (<Prefix>NNs1, ...) connected in
+a generated shape (see generated.intra_edges()), a UNI on port 50 of every
+switch, and `inter_links` links to the next domain, so the domains form a
+chain. Topologies are in the format exported by Kytos (see converter.py).
+"""
+from tests.topologies.common import UNI_PORT, dpid_to_id
+from tests.topologies.converter import MODEL_VERSION, SERVICES, sdx_link, sdx_port
+from tests.topologies.generated import intra_edges
+
+
+def domain_name(prefix, index):
+    return f"{prefix}{index:02d}"
+
+
+def generate(count, switches=2, shape="ring", inter_links=1, prefix="mock", seed=0):
+    """Return the synthetic OXPs, as {oxp: {"name", "domain", "topology", "interfaces"}}.
+
+    `interfaces` maps the id of each port to its Kytos interface id.
+    """
+    oxps = [domain_name(prefix, i) for i in range(1, count + 1)]
+    # (oxp, switch number) -> {port: nni}
+    ports = {(oxp, num): {UNI_PORT: ""} for oxp in oxps for num in range(1, switches + 1)}
+    next_port = {}
+
+    def alloc_port(oxp, num):
+        port = next_port.get((oxp, num), 1)
+        next_port[(oxp, num)] = port + 1
+        return alloc_port(oxp, num) if port == UNI_PORT else port
+
+    def node(oxp, num):
+        return f"{oxp.capitalize()}s{num}"
+
+    links = {oxp: [] for oxp in oxps}
+    for oxp in oxps:
+        for i, j in intra_edges(switches, shape, seed=seed):
+            port1, port2 = alloc_port(oxp, i + 1), alloc_port(oxp, j + 1)
+            links[oxp].append(((i + 1, port1), (j + 1, port2)))
+    for oxp1, oxp2 in zip(oxps, oxps[1:]):
+        for k in range(inter_links):
+            num = k % switches + 1
+            port1, port2 = alloc_port(oxp1, num), alloc_port(oxp2, num)
+            ports[(oxp1, num)][port1] = f"urn:sdx:port:{oxp2}.net:{node(oxp2, num)}:{port2}"
+            ports[(oxp2, num)][port2] = f"urn:sdx:port:{oxp1}.net:{node(oxp1, num)}:{port1}"
+
+    result = {}
+    for index, oxp in enumerate(oxps, start=1):
+        domain = f"{oxp}.net"
+        sdx_links = {}
+        for endpoints in links[oxp]:
+            link = sdx_link(domain, [(node(oxp, num), port) for num, port in endpoints])
+            sdx_links[link["id"]] = link
+            for num, port in endpoints:
+                ports[(oxp, num)][port] = link["id"]
+        nodes, interfaces = [], {}
+        for num in range(1, switches + 1):
+            name = node(oxp, num)
+            dpid = f"{index:02x}{num:014x}"
+            node_ports = []
+            for port, nni in sorted(ports[(oxp, num)].items()):
+                node_ports.append(sdx_port(domain, name, port, f"{name}-eth{port}", nni))
+                interfaces[node_ports[-1]["id"]] = f"{dpid_to_id(dpid)}:{port}"
+            nodes.append({
+                "name": name,
+                "id": f"urn:sdx:node:{domain}:{name}",
+                "location": {
+                    "address": name,
+                    "latitude": round(-60 + 120 * index / (count + 1), 2),
+                    "longitude": round(-180 + 360 * num / (switches + 1), 2),
+                    "iso3166_2_lvl4": "US-FL",
+                    "private": [],
+                },
+                "ports": node_ports,
+                "status": "up",
+                "state": "enabled",
+            })
+        result[oxp] = {
+            "name": f"{oxp.capitalize()}-OXP",
+            "domain": domain,
+            "interfaces": interfaces,
+            "topology": {
+                "name": f"{oxp.capitalize()}-OXP",
+                "id": f"urn:sdx:topology:{domain}",
+                "model_version": MODEL_VERSION,
+                "nodes": nodes,
+                "links": list(sdx_links.values()),
+                "services": list(SERVICES),
+            },
+        }
+    return result
@@ -0,0 +1,156 @@
+"""Topologies of real research networks, loaded from GraphML/GML files.
+
+Files of the Internet Topology Zoo (http://www.topology-zoo.org), or any
+GraphML/GML graph, are mapped onto the OXPs of the stack (ampath, sax,
+tenet) from a few params:
+
+    file         path of the .graphml or .gml file (relative to the repo root)
+    oxps         number of OXPs to spread the nodes on
+    domain_attr  node attribute telling the domain of a node (e.g. Country).
+                 Without it, the nodes are split into bands of longitude
+    mapping      domain of each attribute value, as value:oxp|value:oxp.
+                 Without it, the sorted values are dealt to the OXPs in turn
+    hosts        hosts per switch
+
+Params are given to create_topo() or through the TOPO_PARAMS environment
+variable ("file=zoo/Geant2012.graphml,domain_attr=Country"). Each node
+becomes a switch of its OXP, located by its Latitude/Longitude and addressed
+by its label. Edges inside an OXP become intra-domain links, edges between
+OXPs become inter-domain links (NNIs); self-loops are dropped.
+"""
+import os
+from pathlib import Path
+
+import networkx as nx
+
+from tests.topologies.common import (
+    OXP_PROFILES,
+    TopologyBuilder,
+    build_net,
+    parse_params,
+    provision_topo,
+)
+from tests.topologies.converter import convert
+
+OXPS = list(OXP_PROFILES)
+ROOT_DIR = Path(__file__).parents[2]
+DEFAULT_PARAMS = {
+    "file": None,
+    "oxps": 3,
+    "domain_attr": None,
+    "mapping": None,
+    "hosts": 1,
+}
+
+
+def get_params(**params):
+    """Return the loader params: defaults < TOPO_PARAMS env < `params`."""
+    result = dict(DEFAULT_PARAMS)
+    result.update(parse_params(os.environ.get("TOPO_PARAMS")))
+    result.update(params)
+    unknown = set(result) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown topology params: {sorted(unknown)}")
+    if not result["file"]:
+        raise ValueError("file is required")
+    if not 1 <= result["oxps"] <= len(OXPS):
+        raise ValueError(f"oxps must be between 1 and {len(OXPS)}")
+    return result
+
+
+def parse_mapping(text, oxps):
+    """Parse a "value:oxp|value:oxp" mapping of attribute values to OXPs."""
+    mapping = {}
+    for item in (text or "").split("|"):
+        if not item.strip():
+            continue
+        value, _, oxp = item.rpartition(":")
+        if oxp.strip() not in oxps:
+            raise ValueError(f"Invalid mapping {item!r}: OXP must be one of {oxps}")
+        mapping[value.strip()] = oxp.strip()
+    return mapping
+
+
+def read_graph(path):
+    """Read a GraphML or GML file, keeping parallel edges."""
+    path = Path(path)
+    if not path.is_absolute():
+        path = ROOT_DIR / path
+    if path.suffix == ".gml":
+        try:
+            # nodes named by their label, the address of the switches
+            graph = nx.read_gml(path)
+        except nx.NetworkXError:
+            # labels are not always unique, ids are (the label stays an attribute)
+            graph = nx.read_gml(path, label="id")
+    else:
+        graph = nx.read_graphml(path)
+    if not graph.is_multigraph():
+        graph = nx.MultiGraph(graph)
+    return graph
+
+
+def _coordinates(data):
+    try:
+        return float(data["Latitude"]), float(data["Longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def assign_oxps(graph, oxps, domain_attr=None, mapping=None):
+    """Return the OXP of each node of the graph."""
+    nodes = list(graph.nodes)
+    if domain_attr:
+        values = {node: str(graph.nodes[node].get(domain_attr, "")) for node in nodes}
+        mapping = parse_mapping(mapping, oxps)
+        if not mapping:
+            mapping = {value: oxps[i % len(oxps)] for i, value in enumerate(sorted(set(values.values())))}
+        unmapped = sorted(set(values.values()) - set(mapping))
+        if unmapped:
+            raise ValueError(f"No OXP for {domain_attr} values {unmapped}")
+        return {node: mapping[values[node]] for node in nodes}
+    # bands of longitude, west to east: nodes without coordinates go last
+    ordered = sorted(nodes, key=lambda node: (_coordinates(graph.nodes[node]) or (0, float("inf")))[1])
+    return {node: oxps[i * len(oxps) // len(ordered)] for i, node in enumerate(ordered)}
+
+
+def load(**params):
+    """Return the description of a topology file (see build_net())."""
+    params = get_params(**params)
+    graph = read_graph(params["file"])
+    oxps = OXPS[:params["oxps"]]
+    domains = assign_oxps(graph, oxps, params["domain_attr"], params["mapping"])
+    builder = TopologyBuilder(hosts=params["hosts"])
+    names = {}
+    for oxp in oxps:
+        for node in graph.nodes:
+            if domains[node] != oxp:
+                continue
+            data = graph.nodes[node]
+            lat, lng = _coordinates(data) or OXP_PROFILES[oxp]["location"]
+            address = str(data.get("label", node)).replace(" ", "")
+            names[node] = builder.add_switch(oxp, f"{lat:.2f}", f"{lng:.2f}", address)
+    for node1, node2 in graph.edges():
+        if node1 != node2:
+            builder.add_link(names[node1], names[node2])
+    return builder.description(params=params)
+
+
+def create_topo(*controllers_ip, **params):
+    """Create the topology of a file, the OXPs use the controllers in order."""
+    description = load(**params)
+    oxps = OXPS[:description["params"]["oxps"]]
+    if len(controllers_ip) < len(oxps):
+        raise ValueError(f"{len(oxps)} OXPs need {len(oxps)} controllers")
+    return build_net(description, dict(zip(oxps, controllers_ip)))
+
+
+def setup_topo(*controllers_ip, net):
+    """Enable the topology on the OXPs and push it to the SDX-Controller."""
+    metadata = net.description["metadata"]
+    controllers = {oxp: ip for oxp, ip in zip(OXPS, controllers_ip) if oxp in metadata}
+    return provision_topo(controllers, net, metadata)
+
+
+def get_converted_topologies(net):
+    return convert(net, net.description["metadata"])
@@ -0,0 +1,271 @@
+"""Event-driven waiters used by the end-to-end tests instead of fixed sleeps.
+
+Every waiter polls an API (SDX-Controller, Kytos mef_eline, a Mininet host)
+with an interval that starts small and grows up to a cap, and returns the
+observed state as soon as the expected condition holds. If the condition is
+not met before the timeout, WaitTimeout (an AssertionError) is raised with a
+snapshot of the last observed state, so failures remain easy to diagnose.
+"""
+import json
+import time
+
+import requests
+
+SDX_CONTROLLER = 'http://sdx-controller:8080/SDX-Controller'
+API_URL = SDX_CONTROLLER + '/l2vpn/1.0'
+API_URL_TOPO = SDX_CONTROLLER + '/topology'
+KYTOS_API = 'http://%s:8181/api/kytos'
+KYTOS_SDX_API = KYTOS_API + '/sdx'
+OXPS = ["ampath", "sax", "tenet"]
+
+DEFAULT_TIMEOUT = 60
+REQUEST_TIMEOUT = 10
+SNAPSHOT_MAX_LEN = 4000
+
+# called as listener(host, address, at) once wait_ping() succeeds (see
+# tests/l2vpn_tracer.py)
+PING_LISTENERS = []
+
+
+class WaitTimeout(AssertionError):
+    """Raised when a waited condition does not hold before the timeout."""
+
+
+def _snapshot(value):
+    try:
+        text = json.dumps(value, default=str, sort_keys=True)
+    except (TypeError, ValueError):
+        text = repr(value)
+    if len(text) > SNAPSHOT_MAX_LEN:
+        text = text[:SNAPSHOT_MAX_LEN] + f"... ({len(text)} chars)"
+    return text
+
+
+def wait_until(
+    fetch,
+    check=bool,
+    timeout=DEFAULT_TIMEOUT,
+    interval=0.2,
+    max_interval=3,
+    backoff=1.5,
+    desc=None,
+    raise_on_timeout=True,
+):
+    """Poll fetch() until check(value) holds and return the value.
+
+    The delay between polls starts at `interval` and is multiplied by
+    `backoff` after each attempt, up to `max_interval`. Errors raised while
+    fetching or checking (HTTP errors, missing keys, failed asserts) count
+    as "not yet" and are reported in the timeout message.
+
+    With raise_on_timeout=False the last observed value is returned instead
+    of raising, which is useful when the test still has to restore the
+    environment before asserting.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = interval
+    attempts = 0
+    value = error = None
+    while True:
+        attempts += 1
+        try:
+            value = fetch()
+            error = None
+            if check(value):
+                return value
+        except (
+            AssertionError,
+            LookupError,
+            TypeError,
+            ValueError,
+            requests.RequestException,
+        ) as exc:
+            error = exc
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        time.sleep(min(delay, deadline - now))
+        delay = min(delay * backoff, max_interval)
+
+    if not raise_on_timeout:
+        return value
+    msg = (
+        f"Timeout after {time.monotonic() - start:.1f}s ({attempts} attempts)"
+        f" waiting for {desc or getattr(check, '__name__', 'condition')}."
+    )
+    if error is not None:
+        msg += f" Last error: {error!r}."
+    msg += f" Last state: {_snapshot(value)}"
+    raise WaitTimeout(msg)
+
+
+def get_json(url):
+    response = requests.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_l2vpns():
+    return get_json(API_URL)
+
+
+def get_l2vpn(service_id):
+    return get_json(f"{API_URL}/{service_id}")[service_id]
+
+
+def get_topology():
+    return get_json(API_URL_TOPO)
+
+
+def get_evcs(oxp):
+    return get_json(f"{KYTOS_API % oxp}/mef_eline/v2/evc/")
+
+
+def get_kytos_sdx_topology(oxp):
+    return get_json(f"{KYTOS_SDX_API % oxp}/topology/2.0.0")
+
+
+def topology_ports(topology):
+    """Map port id -> port for all ports of an SDX topology."""
+    return {port["id"]: port for node in topology["nodes"] for port in node["ports"]}
+
+
+def topology_links(topology):
+    """Map link id -> link for all links of an SDX topology."""
+    return {link["id"]: link for link in topology["links"]}
+
+
+def count_evcs_with_tag(evcs, value, uni="uni_a"):
+    """Count EVCs whose `uni` (uni_a or uni_z) is tagged with `value`."""
+    return sum(
+        1 for evc in evcs.values()
+        if evc.get(uni, {}).get("tag", {}).get("value") == value
+    )
+
+
+def wait_l2vpn(service_id, status="up", check=None, **kwargs):
+    """Wait until the L2VPN has the given status (and check(l2vpn) holds)."""
+    def converged(l2vpn):
+        if status is not None and l2vpn.get("status") != status:
+            return False
+        return check is None or check(l2vpn)
+    kwargs.setdefault("desc", f"L2VPN {service_id} status={status}")
+    return wait_until(lambda: get_l2vpn(service_id), converged, **kwargs)
+
+
+def wait_l2vpns(check, **kwargs):
+    """Wait until check(l2vpns) holds on the full L2VPN listing."""
+    return wait_until(get_l2vpns, check, **kwargs)
+
+
+def wait_all_l2vpns(status="up", count=None, **kwargs):
+    """Wait until every L2VPN (exactly `count` of them, if given) has `status`."""
+    def converged(l2vpns):
+        if count is not None and len(l2vpns) != count:
+            return False
+        return all(l2vpn.get("status") == status for l2vpn in l2vpns.values())
+    kwargs.setdefault("desc", f"all L2VPNs status={status} count={count}")
+    return wait_l2vpns(converged, **kwargs)
+
+
+def wait_l2vpns_settled(**kwargs):
+    """Wait until no L2VPN is still under provisioning."""
+    kwargs.setdefault("desc", "no L2VPN under provisioning")
+    return wait_l2vpns(
+        lambda l2vpns: all(
+            l2vpn.get("status") != "under provisioning" for l2vpn in l2vpns.values()
+        ),
+        **kwargs,
+    )
+
+
+def wait_l2vpns_removed(oxps=OXPS, **kwargs):
+    """Wait until the SDX-Controller and the OXPs have no L2VPN/EVC left."""
+    kwargs.setdefault("desc", "L2VPN list to be empty")
+    wait_l2vpns(lambda l2vpns: len(l2vpns) == 0, **kwargs)
+    kwargs.pop("desc")
+    for oxp in oxps:
+        wait_evcs(oxp, lambda evcs: len(evcs) == 0, desc=f"{oxp} EVCs removed", **kwargs)
+
+
+def wait_evcs(oxp, check, **kwargs):
+    """Wait until check(evcs) holds on the mef_eline EVCs of an OXP."""
+    kwargs.setdefault("desc", f"{oxp} EVCs")
+    return wait_until(lambda: get_evcs(oxp), check, **kwargs)
+
+
+def wait_evc_count(oxp, count, **kwargs):
+    kwargs.setdefault("desc", f"{oxp} to have {count} EVCs")
+    return wait_evcs(oxp, lambda evcs: len(evcs) == count, **kwargs)
+
+
+def wait_topology(check, **kwargs):
+    """Wait until check(topology) holds on the SDX-Controller topology."""
+    return wait_until(get_topology, check, **kwargs)
+
+
+def wait_topology_up(**kwargs):
+    """Wait until the SDX-Controller topology has links and all links/ports are up."""
+    kwargs.setdefault("desc", "all topology links and ports up")
+    return wait_topology(
+        lambda topo: topo["links"]
+        and all(link["status"] == "up" for link in topo["links"])
+        and all(port["status"] == "up" for port in topology_ports(topo).values()),
+        **kwargs,
+    )
+
+
+def wait_kytos_sdx_topology(oxp, check, **kwargs):
+    """Wait until check(topology) holds on the SDX topology exported by an OXP."""
+    kwargs.setdefault("desc", f"{oxp} SDX topology")
+    return wait_until(lambda: get_kytos_sdx_topology(oxp), check, **kwargs)
+
+
+def wait_port(port_id, check, **kwargs):
+    """Wait until check(port) holds on a port of the SDX-Controller topology."""
+    kwargs.setdefault("desc", f"port {port_id}")
+    return wait_topology(lambda topo: check(topology_ports(topo)[port_id]), **kwargs)
+
+
+def wait_port_status(port_id, status, **kwargs):
+    kwargs.setdefault("desc", f"port {port_id} status={status}")
+    return wait_port(port_id, lambda port: port["status"] == status, **kwargs)
+
+
+def wait_port_vlan_range(port_id, vlan_range, **kwargs):
+    """Wait until the l2vpn_ptp vlan_range of a port matches `vlan_range`."""
+    kwargs.setdefault("desc", f"port {port_id} vlan_range={vlan_range}")
+    return wait_port(
+        port_id,
+        lambda port: port["services"]["l2vpn_ptp"]["vlan_range"] == vlan_range,
+        **kwargs,
+    )
+
+
+def wait_link_status(link_id, status, **kwargs):
+    kwargs.setdefault("desc", f"link {link_id} status={status}")
+    return wait_topology(
+        lambda topo: topology_links(topo)[link_id]["status"] == status, **kwargs
+    )
+
+
+def wait_topology_version(version, **kwargs):
+    """Wait until the SDX-Controller topology version is greater than `version`."""
+    kwargs.setdefault("desc", f"topology version > {version}")
+    return wait_topology(lambda topo: float(topo["version"]) > float(version), **kwargs)
+
+
+def wait_ping(host, address, ping="ping", **kwargs):
+    """Wait until a single ping from a Mininet host to `address` succeeds."""
+    kwargs.setdefault("desc", f"{host.name} -> {address} reachable")
+    output = wait_until(
+        lambda: host.cmd(f"{ping} -c1 -W1 {address}"),
+        lambda output: ', 0% packet loss,' in output,
+        **kwargs,
+    )
+    if ', 0% packet loss,' in output:
+        at = time.time()
+        for listener in PING_LISTENERS:
+            listener(host, address, at)
+    return output